@@ -1,13 +1,19 @@
+import asyncio
+
 from fastapi import APIRouter
 from python_utils.logging.logging import init_logger
 
-from app.schemas.agent import ChatRequest, ChatResponse
+from app.schemas.agent import ChatRequest, ChatResponse, IntentBatchRequest, IntentBatchResponse
 from app.modules.intent_skill import IntentSkill
+from app.modules.rag_skill import RAGSkill
+from app.modules.semantic_intent import SemanticIntentRouter
 
 # Initialize modules and logger
 logger = init_logger()
 router = APIRouter()
 intent_skill = IntentSkill()
+intent_router = SemanticIntentRouter(intent_skill)
+rag_skill = RAGSkill()
 
 @router.post("/chat")
 async def chat(request: ChatRequest):
@@ -23,7 +29,7 @@ async def chat(request: ChatRequest):
     logger.info(f"Received chat request: {request.user_query}")
 
     # Step 1: Classify intent
-    intent_classification = intent_skill.classify_intent(request.user_query)
+    intent_classification = await intent_router.classify(request.user_query)
     
     logger.info(f"Intent classification: {intent_classification.intent}")
     logger.info(f"Reasoning: {intent_classification.reasoning}")
@@ -44,3 +50,21 @@ async def chat(request: ChatRequest):
 
     # Step 3: Return response
     return ChatResponse(response=response)
+
+@router.post("/intent/batch")
+async def classify_intent_batch(request: IntentBatchRequest) -> IntentBatchResponse:
+    '''
+    Description: Classify many queries at once, e.g. to replay traffic logs when tuning thresholds
+
+    Args:
+        request (IntentBatchRequest): The queries to classify
+
+    Returns:
+        IntentBatchResponse: One classification per query, in input order
+    '''
+    logger.info(f"Received intent batch request: {len(request.user_queries)} queries")
+
+    # CPU bound, so keep it off the event loop that serves /chat
+    classifications = await asyncio.to_thread(intent_skill.classify_batch, request.user_queries)
+
+    return IntentBatchResponse(classifications=classifications)
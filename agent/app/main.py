@@ -1,15 +1,25 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from python_utils.logging.logging import init_logger
 
 from app.api.v1.router import api_router
+from app.api.v1.endpoints.agent import intent_router, rag_skill
 
 # Initialize loger
 logger = init_logger()
 
 logger.info('Starting application...')
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Close the gateway connections the intent router and RAG skill opened
+    await intent_router.close()
+    await rag_skill.close()
+
 # Intialize FastAPI
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Connect routers to main application
 app.include_router(api_router, prefix="/v1")
@@ -4,7 +4,12 @@ Intent Skill Module
 This module is responsible for determining the intent of a user's message.
 '''
 
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import numpy as np
 from python_utils.logging.logging import init_logger
+from app.modules.pattern_matcher import WeightedKeywordMatcher
 from app.schemas.config import AgentConfig
 from app.schemas.intent_config import IntentClassification
 
@@ -28,6 +33,11 @@ class IntentSkill:
         self.command_patterns = config.intent_skills.command_patterns
         self.thresholds = config.intent_skills.thresholds
         self.scoring_weights = config.intent_skills.scoring_weights
+        self.word_boundaries = config.intent_skills.word_boundaries
+
+        # Compile all keywords once so scoring is a single pass per query
+        self.matcher = self._compile_matcher()
+        logger.info(f"Compiled {len(self.matcher.weights)} intent keywords")
 
     def classify_intent(self, user_query: str) -> IntentClassification:
         '''
@@ -42,8 +52,7 @@ class IntentSkill:
         logger.info(f"Classifying intent for query: '{user_query}'")
         
         # Step 1: Score KB and realtime indicators
-        kb_score = self._score_kb_indicators(user_query)
-        realtime_score = self._score_realtime_indicators(user_query)
+        kb_score, realtime_score = self._score_query(user_query)
         
         # Step 2: Determine winning intent
         intent = self._determine_winning_intent(kb_score, realtime_score)
@@ -59,109 +68,157 @@ class IntentSkill:
             realtime_score=realtime_score,
             reasoning=reasoning
         )
-        
 
-    def _score_kb_indicators(self, user_query: str) -> float:
+    def classify_batch(self, user_queries: List[str]) -> List[IntentClassification]:
         '''
-        Description: Score the KB indicators. Indicators includes:
-        - Camping
-        - Reservations
-        - Dinner plans
-        - Itinerary
+        Description: Classify many queries at once. Scores come from a sparse query x keyword
+        matrix multiplied by the keyword weights, and the winning-intent rules are applied
+        to whole score arrays. Results match classify_intent query for query.
 
         Args:
-            user_query (str): The user's query
+            user_queries (List[str]): The user queries
 
         Returns:
-            kb_score (float): The score of the KB indicators
+            List[IntentClassification]: One classification per query, in input order
         '''
-        
-        # convert query to lowercase
-        user_query = user_query.lower()
+        logger.info(f"Classifying intent for {len(user_queries)} queries")
 
-        # Start scoring
-        kb_score = 0.0
+        # Step 1: Score KB and realtime indicators for every query
+        kb_scores, realtime_scores = self._score_queries(user_queries)
 
-        # Score query against direct indicators + patterns
-        for indicator in self.kb_indicators:
-            if indicator in user_query:
-                kb_score += 1.0
+        # Step 2: Determine winning intents
+        intents = self._determine_winning_intents(kb_scores, realtime_scores)
 
-        for pattern_word, pattern_value in self.kb_patterns.items():
-            if pattern_word in user_query:
-                kb_score += pattern_value
+        # Step 3: Build results with the same reasoning as the single-query path
+        classifications = [
+            IntentClassification(
+                intent=intent,
+                kb_score=kb_score,
+                realtime_score=realtime_score,
+                reasoning=f"KB score: {kb_score:.2f}, Realtime score: {realtime_score:.2f}, Thresholds: KB={self.thresholds.kb_threshold}, Realtime={self.thresholds.realtime_threshold}"
+            )
+            for intent, kb_score, realtime_score in zip(intents, kb_scores.tolist(), realtime_scores.tolist())
+        ]
 
-        for question_word in self.question_words:
-            if question_word in user_query:
-                kb_score += 0.25
+        logger.info(f"Batch intent classification result: {dict(Counter(intents))}")
 
-        # Short query bonus - shorter queries often need KB info
-        query_length = len(user_query.split())
-        if query_length <= 3:
-            kb_score += 0.5
+        return classifications
 
-        # Cross-penalty: penalize when realtime indicators appear
-        for realtime_indicator in self.realtime_indicators:
-            if realtime_indicator in user_query:
-                kb_score -= 0.5
+    def _compile_matcher(self) -> WeightedKeywordMatcher:
+        '''
+        Description: Compile every indicator, pattern, question word and command into one matcher.
+        Each keyword carries a (kb, realtime) weight equal to everything the keyword contributes
+        across all lists, including cross-penalties, so one pass over the query scores both intents.
 
-        # Ensure non-negative score
-        kb_score = max(0.0, kb_score)
+        Returns:
+            matcher (WeightedKeywordMatcher): compiled matcher
+        '''
+        weights: Dict[str, List[float]] = {}
 
-        return kb_score     
-        
+        def add(keyword: str, kb: float = 0.0, realtime: float = 0.0):
+            weight = weights.setdefault(keyword.lower(), [0.0, 0.0])
+            weight[0] += kb
+            weight[1] += realtime
+
+        # KB: direct indicators + patterns + question words, penalized by realtime indicators
+        for indicator in self.kb_indicators:
+            add(indicator, kb=1.0, realtime=-0.5)
+        for pattern_word, pattern_value in self.kb_patterns.items():
+            add(pattern_word, kb=pattern_value)
+        for question_word in self.question_words:
+            add(question_word, kb=0.25)
+
+        # Realtime: direct indicators + patterns + commands, penalized by KB indicators
+        for indicator in self.realtime_indicators:
+            add(indicator, realtime=1.0, kb=-0.5)
+        for pattern_word, pattern_value in self.realtime_patterns.items():
+            add(pattern_word, realtime=pattern_value)
+        for command_pattern in self.command_patterns:
+            add(command_pattern, realtime=0.5)
+
+        return WeightedKeywordMatcher(
+            {keyword: tuple(weight) for keyword, weight in weights.items()},
+            word_boundaries=self.word_boundaries
+        )
 
-    def _score_realtime_indicators(self, user_query: str) -> float:
+    def _score_query(self, user_query: str) -> Tuple[float, float]:
         '''
-        Description: Score the realtime indicators. Indicators includes:
-        - Time Sensitivity
-        - Status
-        - Weather
-        - Traffic
-        - Live data
+        Description: Score the KB and realtime indicators in a single pass over the query.
+        KB indicators include camping, reservations, dinner plans and itinerary. Realtime
+        indicators include time sensitivity, status, weather, traffic and live data.
 
         Args:
             user_query (str): The user's query
 
         Returns:
-            realtime_score (float): The score of the realtime indicators
+            (kb_score, realtime_score) (Tuple[float, float]): The scores of the KB and realtime indicators
         '''
-        
+
         # convert query to lowercase
         user_query = user_query.lower()
 
-        # Start scoring
-        realtime_score = 0.0
-
-        # Score query against direct indicators
-        for indicator in self.realtime_indicators:
-            if indicator in user_query:
-                realtime_score += 1.0
-
-        # Score query against realtime patterns
-        for pattern_word, pattern_value in self.realtime_patterns.items():
-            if pattern_word in user_query:
-                realtime_score += pattern_value
-
-        # Command pattern bonus - commands often need realtime data
-        for command_pattern in self.command_patterns:
-            if command_pattern in user_query:
-                realtime_score += 0.5
+        # Score query against every keyword at once
+        kb_score, realtime_score = self.matcher.score(user_query)
 
-        # Very short query bonus - very short queries might be status checks
+        # Short query bonus - shorter queries often need KB info,
+        # very short queries might be status checks
         query_length = len(user_query.split())
+        if query_length <= 3:
+            kb_score += 0.5
         if query_length <= 2:
             realtime_score += 0.5
 
-        # Cross-penalty: penalize when KB indicators appear
-        for kb_indicator in self.kb_indicators:
-            if kb_indicator in user_query:
-                realtime_score -= 0.5
+        # Ensure non-negative scores
+        return max(0.0, kb_score), max(0.0, realtime_score)
 
-        # Ensure non-negative score
-        realtime_score = max(0.0, realtime_score)
+    def _score_queries(self, user_queries: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Description: Vectorized version of _score_query
 
-        return realtime_score
+        Args:
+            user_queries (List[str]): The user queries
+
+        Returns:
+            (kb_scores, realtime_scores) (Tuple[np.ndarray, np.ndarray]): One score per query
+        '''
+        user_queries = [user_query.lower() for user_query in user_queries]
+
+        scores = self.matcher.score_batch(user_queries)
+        kb_scores = scores[:, 0]
+        realtime_scores = scores[:, 1]
+
+        # Short query bonuses
+        query_lengths = np.array([len(user_query.split()) for user_query in user_queries])
+        kb_scores = kb_scores + np.where(query_lengths <= 3, 0.5, 0.0)
+        realtime_scores = realtime_scores + np.where(query_lengths <= 2, 0.5, 0.0)
+
+        # Ensure non-negative scores
+        return np.maximum(kb_scores, 0.0), np.maximum(realtime_scores, 0.0)
+
+    def _determine_winning_intents(self, kb_scores: np.ndarray, realtime_scores: np.ndarray) -> List[str]:
+        '''
+        Description: Vectorized version of _determine_winning_intent. Rules are checked in the same order.
+
+        Args:
+            kb_scores (np.ndarray): KB score per query
+            realtime_scores (np.ndarray): Realtime score per query
+
+        Returns:
+            winning_intents (List[str]): The winning intent per query
+        '''
+        kb_meets = kb_scores >= self.thresholds.kb_threshold
+        realtime_meets = realtime_scores >= self.thresholds.realtime_threshold
+
+        conditions = [
+            (realtime_scores > kb_scores) & realtime_meets,
+            (kb_scores > realtime_scores) & kb_meets,
+            (kb_scores == realtime_scores) & kb_meets & realtime_meets,
+            kb_meets & ~realtime_meets,
+            realtime_meets & ~kb_meets
+        ]
+        choices = ["realtime", "kb", "realtime", "kb", "realtime"]
+
+        return np.select(conditions, choices, default="general").tolist()
 
     def _determine_winning_intent(self, kb_score: float, realtime_score: float) -> str:
         '''
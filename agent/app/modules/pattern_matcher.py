@@ -0,0 +1,169 @@
+'''
+Pattern Matcher Module
+
+Aho-Corasick automaton that finds every configured keyword in a query with a
+single pass over the text, regardless of how many keywords are configured.
+'''
+
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str], word_boundaries: bool = False):
+        '''
+        Description: Compile keywords into an Aho-Corasick automaton
+
+        Args:
+            keywords (Iterable[str]): keywords to search for, matched case-insensitively
+            word_boundaries (bool): only count matches that are not part of a larger word
+        '''
+        self.word_boundaries = word_boundaries
+        self.keywords: List[str] = []
+
+        # Node 0 is the root. goto[node][char] -> node, outputs[node] -> keyword ids ending here
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+
+        for keyword in dict.fromkeys(k.lower() for k in keywords if k):
+            self._add(keyword)
+        self._build_failure_links()
+
+    def _add(self, keyword: str):
+        node = 0
+        for char in keyword:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = next_node
+
+        self._outputs[node].append(len(self.keywords))
+        self.keywords.append(keyword)
+
+    def _build_failure_links(self):
+        # Breadth-first so a node's failure target is always resolved before its children
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+
+                # Inherit matches that end at the failure target (suffixes of this keyword)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    @staticmethod
+    def _is_word_char(char: str) -> bool:
+        return char.isalnum() or char == "_"
+
+    def find(self, text: str) -> Set[str]:
+        '''
+        Description: Find every keyword present in the text
+
+        Args:
+            text (str): text to search, already lowercased
+
+        Returns:
+            matches (Set[str]): keywords found at least once
+        '''
+        found: Set[int] = set()
+        node = 0
+
+        for end, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+
+            for keyword_id in self._outputs[node]:
+                if keyword_id in found:
+                    continue
+                if self.word_boundaries and not self._on_boundary(text, end, len(self.keywords[keyword_id])):
+                    continue
+                found.add(keyword_id)
+
+        return {self.keywords[keyword_id] for keyword_id in found}
+
+    def _on_boundary(self, text: str, end: int, length: int) -> bool:
+        start = end - length + 1
+        before_ok = start == 0 or not self._is_word_char(text[start - 1])
+        after_ok = end + 1 == len(text) or not self._is_word_char(text[end + 1])
+        return before_ok and after_ok
+
+class WeightedKeywordMatcher:
+    '''
+    Keyword matcher where each keyword carries a weight vector. A query's
+    score is the sum of the weights of the distinct keywords it contains.
+    '''
+
+    def __init__(self, weights: Dict[str, Tuple[float, ...]], word_boundaries: bool = False):
+        self.weights = {keyword.lower(): weight for keyword, weight in weights.items()}
+        self.matcher = KeywordMatcher(self.weights.keys(), word_boundaries=word_boundaries)
+        self.dimensions = len(next(iter(self.weights.values()), ()))
+
+        # Column j of the feature matrix is keyword j; row j here is its weight vector
+        self.feature_index = {keyword: i for i, keyword in enumerate(self.matcher.keywords)}
+        self.weight_matrix = np.array(
+            [self.weights[keyword] for keyword in self.matcher.keywords],
+            dtype=np.float64
+        ).reshape(len(self.matcher.keywords), self.dimensions)
+
+    def score(self, text: str) -> Tuple[float, ...]:
+        '''
+        Description: Sum the weight vectors of every keyword found in the text
+
+        Args:
+            text (str): text to score, already lowercased
+
+        Returns:
+            scores (Tuple[float, ...]): one summed score per weight dimension
+        '''
+        totals = [0.0] * self.dimensions
+        for keyword in self.matcher.find(text):
+            for i, value in enumerate(self.weights[keyword]):
+                totals[i] += value
+        return tuple(totals)
+
+    def feature_matrix(self, texts: List[str]) -> sparse.csr_matrix:
+        '''
+        Description: Build a sparse texts x keywords presence matrix
+
+        Args:
+            texts (List[str]): texts to featurize, already lowercased
+
+        Returns:
+            features (sparse.csr_matrix): 1.0 where the keyword appears in the text
+        '''
+        indptr = [0]
+        indices: List[int] = []
+        for text in texts:
+            indices.extend(self.feature_index[keyword] for keyword in self.matcher.find(text))
+            indptr.append(len(indices))
+
+        data = np.ones(len(indices), dtype=np.float64)
+        return sparse.csr_matrix(
+            (data, np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+            shape=(len(texts), len(self.matcher.keywords))
+        )
+
+    def score_batch(self, texts: List[str]) -> np.ndarray:
+        '''
+        Description: Score many texts at once as features @ weights
+
+        Args:
+            texts (List[str]): texts to score, already lowercased
+
+        Returns:
+            scores (np.ndarray): (n_texts, dimensions) summed weights
+        '''
+        return np.asarray(self.feature_matrix(texts) @ self.weight_matrix)
@@ -1,76 +1,75 @@
 ''' RAG Skill '''
 
-import os
-from dotenv import load_dotenv
+import asyncio
+from typing import List, Optional
 
-from pinecone import Pinecone, ServerlessSpec
+import httpx
+import numpy as np
 from python_utils.logging.logging import init_logger
 
+from app.modules.retrieval import MetadataFilter, RetrievalBackend, build_backend
 from app.schemas.agent import ChatResponse
+from app.schemas.rag_skill import RetrievedChunk
 from app import agent_config
 
 # Initialize configs
 MODEL_GATEWAY = agent_config.model_gateway
 RAG_SKILL_CONFIG = agent_config.rag_skill
+RETRIEVAL_CONFIG = RAG_SKILL_CONFIG.retrieval
 
 # Initialize logger
 logger = init_logger()
 
 class RAGSkill:
-    def __init__(self, index_name: str = "rag-engine"):
-        self.index_name = index_name
-        self.pinecone_db = None
-        self.index = None
-        self._initialize_pinecone()
-    
-    def _initialize_pinecone(self):
-        """Initialize Pinecone connection and create index if needed"""
-        # Initialize Pinecone API key
-        try:
-            load_dotenv()
-        except ImportError:
-            logger.warning("Tried to load dotenv. Failed. Hopefully running in k8s.")
-        
-        PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
-        
-        if PINECONE_API_KEY is None:
-            logger.error('Missing Pinecone API key')
-            raise ValueError("Missing Pinecone API key. Please set PINECONE_API_KEY variable.")
-        
-        # Initialize Pinecone
-        self.pinecone_db = Pinecone(api_key=PINECONE_API_KEY)
-        
-        # Create index if it doesn't exist
-        if self.index_name not in self.pinecone_db.list_indexes().names():
-            logger.info(f"Creating Pinecone index: {self.index_name}")
-            self.pinecone_db.create_index(
-                name=self.index_name,
-                dimension=1536,  # 1536 for text-embedding-3-small, 3072 for text-embedding-3-large
-                metric="cosine",
-                spec=ServerlessSpec(
-                    cloud="aws",
-                    region="us-east-1"
-                )
-            )
-            logger.info(f"Successfully created Pinecone index: {self.index_name}")
-        
-        # Get the index
-        self.index = self.pinecone_db.Index(self.index_name)
-        logger.info(f"Connected to Pinecone index: {self.index_name}")
-
-    def query_index(self, user_query: str) -> str:
+    def __init__(self):
+        logger.info(f"Initialize RAG skill with {RETRIEVAL_CONFIG.backend} retrieval backend")
+        # Built on first query, so the app starts without the index being reachable
+        self.backend: Optional[RetrievalBackend] = None
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def query_index(
+        self,
+        user_query: str,
+        top_k: Optional[int] = None,
+        filters: Optional[MetadataFilter] = None
+    ) -> List[RetrievedChunk]:
         '''
-        Description: Querying the Pinecone DB for most relevent chunks.
+        Description: Querying the vector index for most relevent chunks.
 
         Args:
             user_query (str): The user's query
+            top_k (int): number of chunks to return, defaults to rag_skill.retrieval.top_k
+            filters (MetadataFilter): metadata field -> accepted value(s), e.g. {"sheet": "Itinerary"}
 
         Returns:
-            chunks (list[str]): The most relevant chunks
+            chunks (List[RetrievedChunk]): The most relevant chunks, best first
+        '''
+        query_vector = await self._embed_query(user_query)
+        if self.backend is None:
+            self.backend = await asyncio.to_thread(build_backend, RETRIEVAL_CONFIG)
+        return self.backend.query(query_vector, top_k or RETRIEVAL_CONFIG.top_k, filters)
+
+    async def _embed_query(self, user_query: str) -> np.ndarray:
+        if self.client is None:
+            self.client = httpx.AsyncClient(timeout=10.0)
+
+        response = await self.client.post(
+            url=f"{MODEL_GATEWAY}/v1/embedding/embeddings",
+            json={"text": user_query, "model_name": RETRIEVAL_CONFIG.embedding_model}
+        )
+        response.raise_for_status()
+
+        return np.asarray(response.json()["embedding"], dtype=np.float32)
+
+    async def close(self):
+        '''
+        Description: Close the gateway connection pool. Called once at app shutdown.
         '''
-        pass
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
 
-    def generate_response(self, user_query: str) -> ChatResponse:
+    async def generate_response(self, user_query: str) -> ChatResponse:
         '''
         Description: Generating a response using the LLM.
 
@@ -80,8 +79,8 @@ class RAGSkill:
         Returns:
             response (ChatResponse): The response for RagSkill
         '''
-        # Step 1: Get chunks from Pinecone DB
-        chunks = self.query_index(user_query)
+        # Step 1: Get chunks from the vector index
+        chunks = await self.query_index(user_query)
         logger.info(f"Found {len(chunks)} chunks")
 
         # Step 2: Send to LLM
@@ -0,0 +1,282 @@
+'''
+Retrieval Backends
+
+RAGSkill talks to one of these through RetrievalBackend.query:
+
+- LocalRetrievalBackend memory-maps the vectors exported by the rag service's
+  sync and scores them in-process, no network hop per query.
+- IVFRetrievalBackend uses the same files plus the IVF lists the rag service
+  can build, and only scores the nprobe lists closest to the query.
+- PineconeRetrievalBackend queries the hosted Pinecone index, creating it
+  first if it doesn't exist yet.
+
+On-disk layout of a local index directory:
+    vectors.npy       (n_vectors, dimensions) float32, rows L2-normalized
+    metadata.jsonl    one {"id": ..., "metadata": {...}} object per row, same order
+    ivf_centroids.npy (n_lists, dimensions) float32, optional
+    ivf_offsets.npy   (n_lists + 1,) int64, list i is rows offsets[i]:offsets[i + 1], optional
+'''
+
+import json
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from pinecone import Pinecone, ServerlessSpec
+from python_utils.logging.logging import init_logger
+
+from app.schemas.rag_skill import RetrievalConfig, RetrievedChunk
+
+# Initialize logger
+logger = init_logger()
+
+# Metadata filters: field -> value, or field -> list of accepted values
+MetadataFilter = Dict[str, Any]
+
+class RetrievalBackend(ABC):
+    @abstractmethod
+    def query(self, query_vector: np.ndarray, top_k: int, filters: Optional[MetadataFilter] = None) -> List[RetrievedChunk]:
+        '''
+        Description: Find the stored vectors most similar to the query vector
+
+        Args:
+            query_vector (np.ndarray): embedding of the user's query
+            top_k (int): maximum number of chunks to return
+            filters (MetadataFilter): only consider vectors whose metadata matches every field
+
+        Returns:
+            chunks (List[RetrievedChunk]): best match first
+        '''
+
+class LocalRetrievalBackend(RetrievalBackend):
+    def __init__(self, index_path: str):
+        index_dir = Path(index_path)
+        logger.info(f"Loading local vector index: {index_dir}")
+
+        # Memory-mapped so the OS page cache holds the vectors and startup doesn't copy them
+        self.vectors = np.load(index_dir / "vectors.npy", mmap_mode="r")
+
+        self.ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        with open(index_dir / "metadata.jsonl", "r") as f:
+            for line in f:
+                record = json.loads(line)
+                self.ids.append(record["id"])
+                self.metadata.append(record["metadata"])
+
+        if len(self.ids) != self.vectors.shape[0]:
+            raise ValueError(f"Local index is inconsistent: {self.vectors.shape[0]} vectors, {len(self.ids)} metadata rows")
+
+        # field -> value -> sorted row numbers, built the first time a field is filtered on
+        self._postings: Dict[str, Dict[Any, np.ndarray]] = {}
+
+        logger.info(f"Loaded local vector index: {self.vectors.shape}")
+
+    def query(self, query_vector: np.ndarray, top_k: int, filters: Optional[MetadataFilter] = None) -> List[RetrievedChunk]:
+        query_vector = self._normalize_query(query_vector)
+        rows = self._filter_rows(filters) if filters else None
+
+        # Rows are pre-normalized, so the dot product is the cosine similarity.
+        # Gathering rows copies them, so only do it when the filter is selective.
+        if rows is None:
+            scores = self.vectors @ query_vector
+        elif rows.size * 4 < self.vectors.shape[0]:
+            scores = self.vectors[rows] @ query_vector
+        else:
+            scores = (self.vectors @ query_vector)[rows]
+
+        return self._top_k(scores, rows, top_k)
+
+    @staticmethod
+    def _normalize_query(query_vector: np.ndarray) -> np.ndarray:
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        return query_vector / (np.linalg.norm(query_vector) or 1.0)
+
+    def _top_k(self, scores: np.ndarray, rows: Optional[np.ndarray], top_k: int) -> List[RetrievedChunk]:
+        '''
+        Description: Turn candidate scores into the best top_k chunks
+
+        Args:
+            scores (np.ndarray): one score per candidate
+            rows (np.ndarray): row number of each candidate, or None when candidates are all rows
+            top_k (int): maximum number of chunks to return
+
+        Returns:
+            chunks (List[RetrievedChunk]): best match first
+        '''
+        top_k = min(top_k, scores.shape[0])
+        if top_k <= 0:
+            return []
+
+        # O(n) selection of the top-k, then sort only those k
+        best = np.argpartition(scores, -top_k)[-top_k:]
+        best = best[np.argsort(scores[best])[::-1]]
+
+        chunks = []
+        for position in best:
+            row = int(rows[position]) if rows is not None else int(position)
+            metadata = self.metadata[row]
+            chunks.append(RetrievedChunk(
+                id=self.ids[row],
+                score=float(scores[position]),
+                content=str(metadata.get("content", "")),
+                metadata=metadata
+            ))
+        return chunks
+
+    def _filter_rows(self, filters: MetadataFilter) -> np.ndarray:
+        '''
+        Description: Intersect the posting lists of every filter field
+
+        Returns:
+            rows (np.ndarray): sorted row numbers matching all filters
+        '''
+        rows = None
+        for field, accepted in filters.items():
+            postings = self._field_postings(field)
+            values = accepted if isinstance(accepted, (list, tuple, set)) else [accepted]
+
+            matches = [postings[value] for value in values if value in postings]
+            field_rows = np.unique(np.concatenate(matches)) if matches else np.empty(0, dtype=np.int64)
+
+            rows = field_rows if rows is None else np.intersect1d(rows, field_rows, assume_unique=True)
+            if rows.size == 0:
+                break
+
+        return rows
+
+    def _field_postings(self, field: str) -> Dict[Any, np.ndarray]:
+        postings = self._postings.get(field)
+        if postings is None:
+            grouped: Dict[Any, List[int]] = {}
+            for row, metadata in enumerate(self.metadata):
+                value = metadata.get(field)
+                if value is not None and not isinstance(value, (dict, list)):
+                    grouped.setdefault(value, []).append(row)
+
+            postings = {value: np.array(rows, dtype=np.int64) for value, rows in grouped.items()}
+            self._postings[field] = postings
+        return postings
+
+class IVFRetrievalBackend(LocalRetrievalBackend):
+    def __init__(self, index_path: str, nprobe: int):
+        super().__init__(index_path)
+        index_dir = Path(index_path)
+
+        self.centroids = np.load(index_dir / "ivf_centroids.npy", mmap_mode="r")
+        self.offsets = np.load(index_dir / "ivf_offsets.npy")
+        self.nprobe = nprobe
+
+        if self.offsets[-1] != self.vectors.shape[0]:
+            raise ValueError(f"IVF lists cover {self.offsets[-1]} rows, index has {self.vectors.shape[0]}")
+
+        logger.info(f"Loaded IVF index: {self.centroids.shape[0]} lists, nprobe={nprobe}")
+
+    def query(
+        self,
+        query_vector: np.ndarray,
+        top_k: int,
+        filters: Optional[MetadataFilter] = None,
+        nprobe: Optional[int] = None
+    ) -> List[RetrievedChunk]:
+        '''
+        Description: Approximate search over the nprobe lists whose centroids are closest to the query.
+        Higher nprobe trades latency for recall; nprobe >= n_lists is an exact search.
+        '''
+        query_vector = self._normalize_query(query_vector)
+        nprobe = min(nprobe or self.nprobe, self.centroids.shape[0])
+
+        # Pick the closest lists, each list is a contiguous block of rows
+        centroid_scores = self.centroids @ query_vector
+        probed = np.sort(np.argpartition(centroid_scores, -nprobe)[-nprobe:])
+        rows = np.concatenate([np.arange(self.offsets[i], self.offsets[i + 1]) for i in probed])
+
+        if filters:
+            rows = np.intersect1d(rows, self._filter_rows(filters), assume_unique=True)
+
+            # A selective filter can leave too few rows in the probed lists, fall back to an exact filtered search
+            if rows.size < top_k:
+                return super().query(query_vector, top_k, filters)
+            scores = self.vectors[rows] @ query_vector
+        else:
+            # Score each probed list as a contiguous slice instead of gathering scattered rows
+            scores = np.concatenate([self.vectors[self.offsets[i]:self.offsets[i + 1]] @ query_vector for i in probed])
+
+        return self._top_k(scores, rows, top_k)
+
+class PineconeRetrievalBackend(RetrievalBackend):
+    def __init__(self, index_name: str):
+        try:
+            load_dotenv()
+        except ImportError:
+            logger.warning("Tried to load dotenv. Failed. Hopefully running in k8s.")
+
+        PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
+
+        if PINECONE_API_KEY is None:
+            logger.error('Missing Pinecone API key')
+            raise ValueError("Missing Pinecone API key. Please set PINECONE_API_KEY variable.")
+
+        pinecone_db = Pinecone(api_key=PINECONE_API_KEY)
+
+        # Create index if it doesn't exist
+        if index_name not in pinecone_db.list_indexes().names():
+            logger.info(f"Creating Pinecone index: {index_name}")
+            pinecone_db.create_index(
+                name=index_name,
+                dimension=1536,  # 1536 for text-embedding-3-small, 3072 for text-embedding-3-large
+                metric="cosine",
+                spec=ServerlessSpec(
+                    cloud="aws",
+                    region="us-east-1"
+                )
+            )
+            logger.info(f"Successfully created Pinecone index: {index_name}")
+
+        self.index = pinecone_db.Index(index_name)
+        logger.info(f"Connected to Pinecone index: {index_name}")
+
+    def query(self, query_vector: np.ndarray, top_k: int, filters: Optional[MetadataFilter] = None) -> List[RetrievedChunk]:
+        # Translate the simple equality filters into Pinecone's filter language
+        pinecone_filter = None
+        if filters:
+            pinecone_filter = {
+                field: {"$in": list(accepted)} if isinstance(accepted, (list, tuple, set)) else {"$eq": accepted}
+                for field, accepted in filters.items()
+            }
+
+        response = self.index.query(
+            vector=np.asarray(query_vector, dtype=np.float32).tolist(),
+            top_k=top_k,
+            filter=pinecone_filter,
+            include_metadata=True
+        )
+
+        return [
+            RetrievedChunk(
+                id=match.id,
+                score=match.score,
+                content=str((match.metadata or {}).get("content", "")),
+                metadata=match.metadata or {}
+            )
+            for match in response.matches
+        ]
+
+def build_backend(retrieval_config: RetrievalConfig) -> RetrievalBackend:
+    '''
+    Description: Create the retrieval backend selected in config
+
+    Args:
+        retrieval_config (RetrievalConfig): the rag_skill.retrieval config
+
+    Returns:
+        backend (RetrievalBackend): ready-to-query backend
+    '''
+    if retrieval_config.backend == "local":
+        return LocalRetrievalBackend(retrieval_config.local_index_path)
+    if retrieval_config.backend == "ivf":
+        return IVFRetrievalBackend(retrieval_config.local_index_path, retrieval_config.nprobe)
+    return PineconeRetrievalBackend(retrieval_config.pinecone_index)
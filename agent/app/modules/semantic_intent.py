@@ -0,0 +1,179 @@
+'''
+Semantic Intent Module
+
+Routes queries by comparing their embedding against one centroid vector per
+intent, built from the configured exemplar queries. Falls back to the keyword
+IntentSkill whenever the semantic match is not confident.
+'''
+
+import asyncio
+from collections import OrderedDict
+from typing import List, Optional
+
+import httpx
+import numpy as np
+from python_utils.logging.logging import init_logger
+
+from app import agent_config
+from app.modules.intent_skill import IntentSkill
+from app.schemas.intent_config import IntentClassification
+
+# Initialize configs
+MODEL_GATEWAY = agent_config.model_gateway
+SEMANTIC_INTENT_CONFIG = agent_config.semantic_intent
+
+# Initialize logger
+logger = init_logger()
+
+# Raw little-endian float32 matrix, shape sent as a header
+BINARY_MEDIA_TYPE = "application/octet-stream"
+
+class SemanticIntentRouter:
+    def __init__(self, keyword_skill: IntentSkill):
+        logger.info(f"Initialize semantic intent router")
+
+        self.config = SEMANTIC_INTENT_CONFIG
+        self.keyword_skill = keyword_skill
+        self.client: Optional[httpx.AsyncClient] = None
+
+        # (n_intents, dimensions) unit-norm centroids, built on first use
+        self.intents: List[str] = [intent for intent, texts in self.config.exemplars.items() if texts]
+        self.centroids: Optional[np.ndarray] = None
+        self._centroid_lock = asyncio.Lock()
+
+        # normalized query -> unit-norm embedding, least recently used first
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    async def classify(self, user_query: str) -> IntentClassification:
+        '''
+        Description: Classify the intent of the user's query by embedding similarity, falling
+        back to keyword scoring when disabled, when the gateway fails, or when the best intent
+        is below min_similarity or within min_margin of the runner-up
+
+        Args:
+            user_query (str): The user's query
+
+        Returns:
+            IntentClassification: The classified intent with scores and reasoning
+        '''
+        if not self.config.enabled or len(self.intents) < 2:
+            return self.keyword_skill.classify_intent(user_query)
+
+        try:
+            await self._ensure_centroids()
+            query_vector = await self._embed_query(user_query)
+            if query_vector.shape != (self.centroids.shape[1],):
+                raise ValueError(f"query embedding has shape {query_vector.shape}, centroids have {self.centroids.shape[1]} dimensions")
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            # Network errors, and gateway responses missing a field or with the wrong shape
+            logger.warning(f"Semantic intent unavailable, using keyword scoring: {e}")
+            return self.keyword_skill.classify_intent(user_query)
+
+        # Cosine similarity against every centroid in one matrix-vector product
+        similarities = self.centroids @ query_vector
+        ranked = np.argsort(similarities)[::-1]
+        best, runner_up = similarities[ranked[0]], similarities[ranked[1]]
+
+        if best < self.config.min_similarity or best - runner_up < self.config.min_margin:
+            logger.info(f"Low semantic confidence (best: {best:.3f}, margin: {best - runner_up:.3f}), using keyword scoring")
+            return self.keyword_skill.classify_intent(user_query)
+
+        scores = dict(zip(self.intents, similarities.tolist()))
+        intent = self.intents[ranked[0]]
+        reasoning = f"Semantic similarity: {', '.join(f'{name}={score:.3f}' for name, score in scores.items())}, Margin: {best - runner_up:.3f}"
+
+        logger.info(f"Semantic intent classification result: {intent} ({reasoning})")
+
+        return IntentClassification(
+            intent=intent,
+            kb_score=scores.get("kb", 0.0),
+            realtime_score=scores.get("realtime", 0.0),
+            reasoning=reasoning
+        )
+
+    async def _ensure_centroids(self):
+        '''
+        Description: Embed every exemplar once and reduce each intent to a unit-norm centroid
+        '''
+        if self.centroids is not None:
+            return
+
+        async with self._centroid_lock:
+            if self.centroids is not None:
+                return
+
+            texts = [text for intent in self.intents for text in self.config.exemplars[intent]]
+            logger.info(f"Embedding {len(texts)} intent exemplars. Model: {self.config.model_name}")
+
+            response = await self._get_client().post(
+                url=f"{MODEL_GATEWAY}/v1/embedding/embeddings/batch",
+                json={"texts": texts, "model_name": self.config.model_name},
+                headers={"Accept": f"{BINARY_MEDIA_TYPE}; dtype=float32"}
+            )
+            response.raise_for_status()
+
+            shape = tuple(int(dim) for dim in response.headers["X-Embedding-Shape"].split(","))
+            exemplars = self._normalize(np.frombuffer(response.content, dtype="<f4").reshape(shape))
+
+            centroids = []
+            start = 0
+            for intent in self.intents:
+                count = len(self.config.exemplars[intent])
+                centroids.append(exemplars[start:start + count].mean(axis=0))
+                start += count
+
+            self.centroids = self._normalize(np.vstack(centroids)).astype(np.float32)
+            logger.info(f"Built intent centroids: {self.centroids.shape}")
+
+    async def _embed_query(self, user_query: str) -> np.ndarray:
+        '''
+        Description: Embed the query, serving repeats from the in-process LRU cache
+
+        Args:
+            user_query (str): The user's query
+
+        Returns:
+            query_vector (np.ndarray): unit-norm float32 embedding
+        '''
+        key = " ".join(user_query.lower().split())
+
+        vector = self._query_cache.get(key)
+        if vector is not None:
+            self._query_cache.move_to_end(key)
+            self.cache_hits += 1
+            return vector
+
+        self.cache_misses += 1
+        response = await self._get_client().post(
+            url=f"{MODEL_GATEWAY}/v1/embedding/embeddings",
+            json={"text": key, "model_name": self.config.model_name}
+        )
+        response.raise_for_status()
+
+        vector = self._normalize(np.asarray(response.json()["embedding"], dtype=np.float32))
+
+        self._query_cache[key] = vector
+        if len(self._query_cache) > self.config.cache_size:
+            self._query_cache.popitem(last=False)
+
+        return vector
+
+    async def close(self):
+        '''
+        Description: Close the gateway connection pool. Called once at app shutdown.
+        '''
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(timeout=10.0)
+        return self.client
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
@@ -1,9 +1,21 @@
 ''' Agent Schema '''
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List
+
+from app.schemas.intent_config import IntentClassification
 
 class ChatRequest(BaseModel):
     user_query: str
 
 class ChatResponse(BaseModel):
-    response: str
\ No newline at end of file
+    response: str
+
+# Largest batch /intent/batch accepts; replay bigger logs in several requests
+MAX_BATCH_QUERIES = 10000
+
+class IntentBatchRequest(BaseModel):
+    user_queries: List[str] = Field(max_length=MAX_BATCH_QUERIES)
+
+class IntentBatchResponse(BaseModel):
+    classifications: List[IntentClassification]
@@ -2,11 +2,12 @@ import yaml
 
 from pydantic import BaseModel
 
-from app.schemas.intent_config import IntentSkill
+from app.schemas.intent_config import IntentSkill, SemanticIntentConfig
 from app.schemas.rag_skill import RagSkillConfig
 
 class AgentConfig(BaseModel):
     intent_skills: IntentSkill
+    semantic_intent: SemanticIntentConfig = SemanticIntentConfig()
     rag_skill: RagSkillConfig
     model_gateway: str
 
@@ -18,12 +18,21 @@ class ScoringWeights(BaseModel):
 class IntentSkill(BaseModel):
     kb_indicators: List[str]
     realtime_indicators: List[str]
-    kb_patterns: Dict[str, int]
-    realtime_patterns: Dict[str, int]
+    kb_patterns: Dict[str, float]
+    realtime_patterns: Dict[str, float]
     question_words: List[str]
     command_patterns: List[str]
     thresholds: Thresholds
     scoring_weights: ScoringWeights
+    word_boundaries: bool = False
+
+class SemanticIntentConfig(BaseModel):
+    enabled: bool = False
+    model_name: str = "text-embedding-3-small"
+    min_similarity: float = 0.35
+    min_margin: float = 0.05
+    cache_size: int = 10000
+    exemplars: Dict[Literal["kb", "realtime", "general"], List[str]] = {}
 
 class IntentClassification(BaseModel):
     intent: Literal["kb", "realtime", "general"]
@@ -1,11 +1,28 @@
 ''' RAG Skill Schema '''
 
+from typing import Any, Dict, Literal
+
 from pydantic import BaseModel
 
+class RetrievalConfig(BaseModel):
+    backend: Literal["local", "ivf", "pinecone"] = "pinecone"
+    embedding_model: str = "text-embedding-3-small"
+    top_k: int = 5
+    local_index_path: str = "data/local_index"
+    nprobe: int = 8
+    pinecone_index: str = "rag-engine"
+
+class RetrievedChunk(BaseModel):
+    id: str
+    score: float
+    content: str
+    metadata: Dict[str, Any]
+
 class RagSkillConfig(BaseModel):
     model: str
     temperature: float
     max_tokens: int
     top_p: float
     frequency_penalty: float
-    presence_penalty: float
\ No newline at end of file
+    presence_penalty: float
+    retrieval: RetrievalConfig = RetrievalConfig()
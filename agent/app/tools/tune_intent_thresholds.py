@@ -0,0 +1,280 @@
+'''
+Intent Threshold Tuning
+
+Replays a labeled query corpus against IntentSkill and sweeps a grid of
+thresholds and pattern weight scales, reporting accuracy per configuration
+and emitting the best one as YAML for agent/app/configs/config.yaml.
+
+Each query is featurized once into six group sums (KB indicators, KB pattern
+weight, question words, realtime indicators, realtime pattern weight,
+commands). Every configuration's scores are then a linear combination of
+those sums, so the sweep is pure array arithmetic.
+
+Corpus format, one JSON object per line:
+    {"query": "what's the weather right now", "intent": "realtime"}
+
+Usage (from the agent directory):
+    python -m app.tools.tune_intent_thresholds --corpus labeled.jsonl --output best.yaml
+'''
+
+import argparse
+import json
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import yaml
+
+from app.modules.intent_skill import IntentSkill
+from app.modules.pattern_matcher import WeightedKeywordMatcher
+
+INTENTS = ["kb", "realtime", "general"]
+
+# Group feature columns
+KB_INDICATORS, KB_PATTERNS, QUESTIONS, RT_INDICATORS, RT_PATTERNS, COMMANDS = range(6)
+
+def load_corpus(path: str) -> Tuple[List[str], np.ndarray]:
+    '''
+    Description: Load a labeled JSONL corpus
+
+    Args:
+        path (str): path to the corpus
+
+    Returns:
+        (queries, labels) (Tuple[List[str], np.ndarray]): queries and label indices into INTENTS
+    '''
+    queries, labels = [], []
+    with open(path, "r") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record["intent"] not in INTENTS:
+                raise ValueError(f"Line {line_number}: unknown intent {record['intent']!r}, expected one of {INTENTS}")
+            queries.append(record["query"])
+            labels.append(INTENTS.index(record["intent"]))
+
+    return queries, np.array(labels, dtype=np.int8)
+
+def group_features(intent_skill: IntentSkill, queries: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Description: Featurize queries once into per-group sums and short-query flags
+
+    Args:
+        intent_skill (IntentSkill): skill whose keyword lists are being tuned
+        queries (List[str]): the queries
+
+    Returns:
+        (groups, short_kb, short_realtime): (n, 6) group sums and the two short query bonus flags
+    '''
+    weights: Dict[str, List[float]] = {}
+
+    def add(keyword: str, column: int, value: float = 1.0):
+        weights.setdefault(keyword.lower(), [0.0] * 6)[column] += value
+
+    for indicator in intent_skill.kb_indicators:
+        add(indicator, KB_INDICATORS)
+    for pattern_word, pattern_value in intent_skill.kb_patterns.items():
+        add(pattern_word, KB_PATTERNS, pattern_value)
+    for question_word in intent_skill.question_words:
+        add(question_word, QUESTIONS)
+    for indicator in intent_skill.realtime_indicators:
+        add(indicator, RT_INDICATORS)
+    for pattern_word, pattern_value in intent_skill.realtime_patterns.items():
+        add(pattern_word, RT_PATTERNS, pattern_value)
+    for command_pattern in intent_skill.command_patterns:
+        add(command_pattern, COMMANDS)
+
+    matcher = WeightedKeywordMatcher(
+        {keyword: tuple(weight) for keyword, weight in weights.items()},
+        word_boundaries=intent_skill.word_boundaries
+    )
+
+    lowered = [query.lower() for query in queries]
+    groups = matcher.score_batch(lowered)
+    lengths = np.array([len(query.split()) for query in lowered])
+
+    return groups, (lengths <= 3).astype(np.float64), (lengths <= 2).astype(np.float64)
+
+def _scores(groups: np.ndarray, short_kb: np.ndarray, short_realtime: np.ndarray, kb_scales: np.ndarray, realtime_scales: np.ndarray):
+    '''
+    Description: KB and realtime scores for every pattern scale, using the same weights as IntentSkill
+
+    Returns:
+        (kb, realtime) (Tuple[np.ndarray, np.ndarray]): (n, len(kb_scales)) and (n, len(realtime_scales)) scores
+    '''
+    # Parts of the score that do not depend on the pattern scales
+    kb_base = groups[:, KB_INDICATORS] + 0.25 * groups[:, QUESTIONS] + 0.5 * short_kb - 0.5 * groups[:, RT_INDICATORS]
+    realtime_base = groups[:, RT_INDICATORS] + 0.5 * groups[:, COMMANDS] + 0.5 * short_realtime - 0.5 * groups[:, KB_INDICATORS]
+
+    # Clamped like IntentSkill
+    kb = np.maximum(kb_base[:, None] + groups[:, KB_PATTERNS][:, None] * kb_scales[None, :], 0.0)
+    realtime = np.maximum(realtime_base[:, None] + groups[:, RT_PATTERNS][:, None] * realtime_scales[None, :], 0.0)
+    return kb, realtime
+
+def _predict(kb: np.ndarray, realtime: np.ndarray, kb_thresholds: np.ndarray, realtime_thresholds: np.ndarray) -> np.ndarray:
+    '''
+    Description: Winning intent index for broadcastable score and threshold arrays.
+    Same rule order as IntentSkill._determine_winning_intent.
+    '''
+    kb_meets = kb >= kb_thresholds
+    realtime_meets = realtime >= realtime_thresholds
+
+    return np.select(
+        [
+            (realtime > kb) & realtime_meets,
+            (kb > realtime) & kb_meets,
+            (kb == realtime) & kb_meets & realtime_meets,
+            kb_meets & ~realtime_meets,
+            realtime_meets & ~kb_meets
+        ],
+        [np.int8(1), np.int8(0), np.int8(1), np.int8(0), np.int8(1)],
+        default=np.int8(2)
+    )
+
+def sweep(
+    groups: np.ndarray,
+    short_kb: np.ndarray,
+    short_realtime: np.ndarray,
+    labels: np.ndarray,
+    kb_scales: np.ndarray,
+    realtime_scales: np.ndarray,
+    kb_thresholds: np.ndarray,
+    realtime_thresholds: np.ndarray,
+    max_cells: int = 4_000_000
+) -> np.ndarray:
+    '''
+    Description: Accuracy for every (kb_scale, realtime_scale, kb_threshold, realtime_threshold) combination
+
+    Returns:
+        accuracy (np.ndarray): shape (len(kb_scales), len(realtime_scales), len(kb_thresholds), len(realtime_thresholds))
+    '''
+    kb_all, realtime_all = _scores(groups, short_kb, short_realtime, kb_scales, realtime_scales)
+
+    correct = np.zeros((len(kb_scales), len(realtime_scales), len(kb_thresholds), len(realtime_thresholds)))
+
+    # One KB scale and a slice of queries at a time keeps the (chunk, Sr, Tk, Tr) working set bounded
+    chunk = max(1, max_cells // (len(realtime_scales) * len(kb_thresholds) * len(realtime_thresholds)))
+    for i in range(len(kb_scales)):
+        for start in range(0, len(labels), chunk):
+            rows = slice(start, start + chunk)
+            predicted = _predict(
+                kb_all[rows, i][:, None, None, None],
+                realtime_all[rows, :, None, None],
+                kb_thresholds[None, None, :, None],
+                realtime_thresholds[None, None, None, :]
+            )
+            correct[i] += (predicted == labels[rows, None, None, None]).sum(axis=0)
+
+    return correct / max(len(labels), 1)
+
+def confusion_matrix(
+    groups: np.ndarray,
+    short_kb: np.ndarray,
+    short_realtime: np.ndarray,
+    labels: np.ndarray,
+    kb_scale: float,
+    realtime_scale: float,
+    kb_threshold: float,
+    realtime_threshold: float
+) -> np.ndarray:
+    '''
+    Description: Confusion matrix (rows = label, columns = prediction) for one configuration
+    '''
+    kb, realtime = _scores(groups, short_kb, short_realtime, np.array([kb_scale]), np.array([realtime_scale]))
+    predicted = _predict(kb[:, 0], realtime[:, 0], kb_threshold, realtime_threshold)
+
+    counts = np.bincount(labels.astype(np.int64) * len(INTENTS) + predicted, minlength=len(INTENTS) ** 2)
+    return counts.reshape(len(INTENTS), len(INTENTS))
+
+def parse_range(values: List[float]) -> np.ndarray:
+    start, stop, step = values
+    return np.round(np.arange(start, stop + step / 2, step), 6)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep IntentSkill thresholds and pattern weights over a labeled corpus")
+    parser.add_argument("--corpus", required=True, help="labeled JSONL corpus with query and intent fields")
+    parser.add_argument("--kb-thresholds", type=float, nargs=3, default=[0.0, 5.0, 0.125], metavar=("START", "STOP", "STEP"))
+    parser.add_argument("--realtime-thresholds", type=float, nargs=3, default=[0.0, 5.0, 0.125], metavar=("START", "STOP", "STEP"))
+    parser.add_argument("--kb-pattern-scales", type=float, nargs=3, default=[0.0, 3.0, 0.125], metavar=("START", "STOP", "STEP"))
+    parser.add_argument("--realtime-pattern-scales", type=float, nargs=3, default=[0.0, 3.0, 0.125], metavar=("START", "STOP", "STEP"))
+    parser.add_argument("--top", type=int, default=10, help="number of best configurations to report")
+    parser.add_argument("--report", help="optional CSV path with accuracy for every configuration")
+    parser.add_argument("--output", help="optional YAML path for the best intent_skills settings")
+    args = parser.parse_args()
+
+    intent_skill = IntentSkill()
+    queries, labels = load_corpus(args.corpus)
+
+    kb_scales = parse_range(args.kb_pattern_scales)
+    realtime_scales = parse_range(args.realtime_pattern_scales)
+    kb_thresholds = parse_range(args.kb_thresholds)
+    realtime_thresholds = parse_range(args.realtime_thresholds)
+
+    # Featurize once, then sweep
+    start = time.perf_counter()
+    groups, short_kb, short_realtime = group_features(intent_skill, queries)
+    featurize_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    accuracy = sweep(groups, short_kb, short_realtime, labels, kb_scales, realtime_scales, kb_thresholds, realtime_thresholds)
+    sweep_seconds = time.perf_counter() - start
+
+    print(f"Queries: {len(queries)}, configurations: {accuracy.size}")
+    print(f"Featurized in {featurize_seconds:.2f}s, swept in {sweep_seconds:.2f}s ({accuracy.size / max(sweep_seconds, 1e-9) * 60:,.0f} configs/minute)")
+
+    # Current config for reference
+    current = sweep(
+        groups, short_kb, short_realtime, labels,
+        np.array([1.0]), np.array([1.0]),
+        np.array([intent_skill.thresholds.kb_threshold]), np.array([intent_skill.thresholds.realtime_threshold])
+    ).item()
+    print(f"Current config accuracy: {current:.4f}")
+
+    grids = (kb_scales, realtime_scales, kb_thresholds, realtime_thresholds)
+    order = np.argsort(accuracy, axis=None)[::-1][: args.top]
+    print(f"{'accuracy':>9} {'kb_scale':>9} {'rt_scale':>9} {'kb_thr':>8} {'rt_thr':>8}")
+    for flat_index in order:
+        i, j, k, l = np.unravel_index(flat_index, accuracy.shape)
+        print(f"{accuracy[i, j, k, l]:>9.4f} {kb_scales[i]:>9.3f} {realtime_scales[j]:>9.3f} {kb_thresholds[k]:>8.3f} {realtime_thresholds[l]:>8.3f}")
+
+    if args.report:
+        mesh = np.meshgrid(*grids, indexing="ij")
+        table = np.column_stack([grid.ravel() for grid in mesh] + [accuracy.ravel()])
+        np.savetxt(args.report, table, delimiter=",", fmt="%.6g", header="kb_scale,realtime_scale,kb_threshold,realtime_threshold,accuracy", comments="")
+        print(f"Wrote {len(table)} configurations to {args.report}")
+
+    i, j, k, l = np.unravel_index(order[0], accuracy.shape)
+    best_kb_scale, best_realtime_scale = float(kb_scales[i]), float(realtime_scales[j])
+    best_kb_threshold, best_realtime_threshold = float(kb_thresholds[k]), float(realtime_thresholds[l])
+
+    matrix = confusion_matrix(
+        groups, short_kb, short_realtime, labels,
+        best_kb_scale, best_realtime_scale, best_kb_threshold, best_realtime_threshold
+    )
+    print("Confusion matrix for the best config (rows = label, columns = prediction):")
+    print(f"{'':>10}" + "".join(f"{intent:>10}" for intent in INTENTS))
+    for label, row in zip(INTENTS, matrix):
+        print(f"{label:>10}" + "".join(f"{count:>10}" for count in row))
+
+    best_config = {
+        "intent_skills": {
+            "kb_patterns": {word: round(value * best_kb_scale, 4) for word, value in intent_skill.kb_patterns.items()},
+            "realtime_patterns": {word: round(value * best_realtime_scale, 4) for word, value in intent_skill.realtime_patterns.items()},
+            "thresholds": {
+                "kb_threshold": best_kb_threshold,
+                "realtime_threshold": best_realtime_threshold
+            }
+        }
+    }
+
+    best_yaml = yaml.safe_dump(best_config, sort_keys=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(best_yaml)
+        print(f"Wrote best config to {args.output}")
+    else:
+        print(best_yaml)
+
+if __name__ == "__main__":
+    main()
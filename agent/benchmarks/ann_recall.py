@@ -0,0 +1,52 @@
+'''
+Recall@k vs. latency for the IVF retrieval backend against exact search
+
+Build an index with IVF lists first, e.g. from the rag directory:
+    PYTHONPATH=. python benchmarks/build_synthetic_index.py /tmp/ann_index --vectors 100000 --ivf
+
+Then from the agent directory:
+    PYTHONPATH=. python benchmarks/ann_recall.py /tmp/ann_index --nprobe 1 2 4 8 16 32
+'''
+
+import argparse
+import time
+
+import numpy as np
+
+from app.modules.retrieval import IVFRetrievalBackend
+
+def per_query_us(func, queries) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='IVF recall/latency sweep')
+    parser.add_argument('index_path')
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--top-k', type=int, default=10)
+    args = parser.parse_args()
+
+    backend = IVFRetrievalBackend(args.index_path, nprobe=args.nprobe[0])
+    queries = np.load(f'{args.index_path}/queries.npy')
+    n_lists = backend.centroids.shape[0]
+
+    # Exact search over the same rows is the ground truth
+    exact = lambda q: super(IVFRetrievalBackend, backend).query(q, args.top_k)
+    truth = [{chunk.id for chunk in exact(query)} for query in queries]
+    exact_us = per_query_us(exact, queries)
+
+    print(f'{backend.vectors.shape[0]} vectors, {n_lists} lists, top_k={args.top_k}')
+    print(f'{"nprobe":>8} {"recall@k":>9} {"us/query":>10} {"speedup":>8}')
+    print(f'{"exact":>8} {1.0:>9.3f} {exact_us:>10.1f} {1.0:>8.1f}')
+
+    for nprobe in args.nprobe:
+        search = lambda q: backend.query(q, args.top_k, nprobe=nprobe)
+        hits = sum(len(expected & {chunk.id for chunk in search(query)}) for expected, query in zip(truth, queries))
+        recall = hits / (len(queries) * args.top_k)
+        ivf_us = per_query_us(search, queries)
+        print(f'{min(nprobe, n_lists):>8} {recall:>9.3f} {ivf_us:>10.1f} {exact_us / ivf_us:>8.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+'''
+Golden check and microbenchmark for the compiled intent matcher
+
+1. Scores a golden set of queries with the compiled matcher and with the
+   original per-keyword substring scan, and fails if any score differs.
+2. Grows the indicator lists with synthetic keywords and reports per-query
+   cost of both scorers.
+
+Usage (from the agent directory):
+    PYTHONPATH=. python benchmarks/intent_matcher.py
+'''
+
+import argparse
+import random
+import string
+import time
+
+from app.modules.intent_skill import IntentSkill
+
+GOLDEN_QUERIES = [
+    "weather",
+    "what's the weather right now at yosemite",
+    "show me my campsite reservation",
+    "when is dinner plans tonight",
+    "is the trail open today",
+    "what should I pack for camping",
+    "book a campsite for our vacation",
+    "current traffic on I-5",
+    "tell me the itinerary",
+    "recommend the best trip plan",
+    "I know the schedule",
+    "check status",
+    "stock price now",
+    "how busy is the park right now",
+    "packing list",
+    "hello",
+    "",
+    "Is it urgent to reserve ASAP?",
+    "live real-time updates please",
+    "why is the close time different from the plan"
+]
+
+def legacy_scores(skill: IntentSkill, user_query: str):
+    ''' The original scoring: one substring scan per keyword per list '''
+    user_query = user_query.lower()
+    query_length = len(user_query.split())
+
+    kb_score = 0.0
+    kb_score += sum(1.0 for indicator in skill.kb_indicators if indicator in user_query)
+    kb_score += sum(value for word, value in skill.kb_patterns.items() if word in user_query)
+    kb_score += sum(0.25 for word in skill.question_words if word in user_query)
+    if query_length <= 3:
+        kb_score += 0.5
+    kb_score -= sum(0.5 for indicator in skill.realtime_indicators if indicator in user_query)
+
+    realtime_score = 0.0
+    realtime_score += sum(1.0 for indicator in skill.realtime_indicators if indicator in user_query)
+    realtime_score += sum(value for word, value in skill.realtime_patterns.items() if word in user_query)
+    realtime_score += sum(0.5 for command in skill.command_patterns if command in user_query)
+    if query_length <= 2:
+        realtime_score += 0.5
+    realtime_score -= sum(0.5 for indicator in skill.kb_indicators if indicator in user_query)
+
+    return max(0.0, kb_score), max(0.0, realtime_score)
+
+def check_golden(skill: IntentSkill):
+    mismatches = 0
+    for query in GOLDEN_QUERIES:
+        expected = legacy_scores(skill, query)
+        actual = skill._score_query(query)
+        if expected != actual:
+            mismatches += 1
+            print(f'MISMATCH {query!r}: legacy={expected} compiled={actual}')
+
+    print(f'golden set: {len(GOLDEN_QUERIES) - mismatches}/{len(GOLDEN_QUERIES)} identical')
+    if mismatches:
+        raise SystemExit(1)
+
+def per_query_us(func, queries, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            func(query)
+    return (time.perf_counter() - start) / (repeat * len(queries)) * 1e6
+
+def benchmark(sizes, repeat: int):
+    rng = random.Random(0)
+    print(f'{"keywords":>10} {"legacy us":>10} {"compiled us":>12}')
+
+    for size in sizes:
+        skill = IntentSkill()
+        synthetic = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))) for _ in range(size)]
+
+        # Spread synthetic keywords over the KB and realtime indicator lists
+        skill.kb_indicators = skill.kb_indicators + synthetic[: size // 2]
+        skill.realtime_indicators = skill.realtime_indicators + synthetic[size // 2:]
+        skill.matcher = skill._compile_matcher()
+
+        legacy = per_query_us(lambda q: legacy_scores(skill, q), GOLDEN_QUERIES, repeat)
+        compiled = per_query_us(skill._score_query, GOLDEN_QUERIES, repeat)
+        print(f'{len(skill.matcher.weights):>10} {legacy:>10.1f} {compiled:>12.1f}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Golden check and microbenchmark for intent scoring')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[0, 100, 1000, 5000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    check_golden(IntentSkill())
+    benchmark(args.sizes, args.repeat)
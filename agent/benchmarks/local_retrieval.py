@@ -0,0 +1,73 @@
+'''
+Latency check for the local retrieval backend
+
+Writes a synthetic index in the layout the rag service exports, loads it with
+LocalRetrievalBackend, checks top-k against a full sort, and reports per-query
+latency with and without a metadata filter.
+
+Usage (from the agent directory):
+    PYTHONPATH=. python benchmarks/local_retrieval.py --vectors 5000
+'''
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.modules.retrieval import LocalRetrievalBackend
+
+SHEETS = ["Itinerary", "Packing", "Reservations", "Meals"]
+
+def write_index(index_dir: Path, n_vectors: int, dimensions: int, rng: np.random.Generator) -> np.ndarray:
+    vectors = rng.standard_normal((n_vectors, dimensions), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.save(index_dir / "vectors.npy", vectors)
+
+    with open(index_dir / "metadata.jsonl", "w") as f:
+        for row in range(n_vectors):
+            metadata = {"content": f"row {row}", "sheet": SHEETS[row % len(SHEETS)], "row": row}
+            f.write(json.dumps({"id": f"vec_{row}", "metadata": metadata}) + "\n")
+
+    return vectors
+
+def per_query_us(func, queries) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Local retrieval latency benchmark')
+    parser.add_argument('--vectors', type=int, default=5000)
+    parser.add_argument('--dimensions', type=int, default=1536)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--top-k', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        vectors = write_index(Path(tmp), args.vectors, args.dimensions, rng)
+        backend = LocalRetrievalBackend(tmp)
+        queries = rng.standard_normal((args.queries, args.dimensions), dtype=np.float32)
+
+        # Correctness: argpartition top-k must equal a full sort
+        for query in queries[:20]:
+            expected = np.argsort(vectors @ (query / np.linalg.norm(query)))[::-1][:args.top_k]
+            actual = [int(chunk.id.split("_")[1]) for chunk in backend.query(query, args.top_k)]
+            assert actual == expected.tolist(), (actual, expected)
+
+        filtered = backend.query(queries[0], args.top_k, {"sheet": "Packing"})
+        assert all(chunk.metadata["sheet"] == "Packing" for chunk in filtered)
+
+        unfiltered_us = per_query_us(lambda q: backend.query(q, args.top_k), queries)
+        filtered_us = per_query_us(lambda q: backend.query(q, args.top_k, {"sheet": ["Packing", "Meals"]}), queries)
+
+    print(f'{args.vectors} vectors x {args.dimensions} dims, top_k={args.top_k}')
+    print(f'  unfiltered: {unfiltered_us:8.1f} us/query')
+    print(f'  filtered:   {filtered_us:8.1f} us/query')
+
+if __name__ == '__main__':
+    main()
@@ -1,24 +1,134 @@
 ''' Embedding API Endpoints '''
 
-import os
-from dotenv import load_dotenv
+import base64
+from typing import Dict, List, Optional, Tuple
 
-from fastapi import APIRouter
-from openai import OpenAI
+import numpy as np
+from fastapi import APIRouter, Header, HTTPException, Response
 
 from python_utils.logging.logging import init_logger
-from app.schemas.gateway import EmbeddingRequest, EmbeddingResponse, BatchEmbeddingRequest, BatchEmbeddingResponse
+from app.helper.batcher import embedding_batcher
+from app.helper.cache import embedding_cache
+from app.helper.embedding import embed_texts
+from app.schemas.gateway import (
+    EmbeddingRequest, EmbeddingResponse, BatchEmbeddingRequest, BatchEmbeddingResponse, EncodedEmbeddingResponse
+)
 
 # Initialize logger
 logger = init_logger()
 router = APIRouter()
 
-# Initialize keys
-try:
-    load_dotenv()
-except ImportError:
-    logger.warning("Tried to load dotenv. Failed. Hopefully running in k8s.")
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+# Compact response formats negotiated via the Accept header
+JSON_MEDIA_TYPE = "application/json"
+BASE64_MEDIA_TYPE = "application/vnd.embeddings.base64+json"
+BINARY_MEDIA_TYPE = "application/octet-stream"
+SUPPORTED_DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+''' Helpers '''
+
+def _normalize_text(text: str) -> str:
+    '''
+    Description: Normalize text before embedding. Also the form used for cache keys.
+    '''
+    # Replace empty/whitespace-only texts with a space to satisfy OpenAI API requirements
+    return text.strip() if text.strip() else " "
+
+async def _embed(texts: List[str], model_name: str, coalesce: bool = False) -> List[np.ndarray]:
+    '''
+    Description: Embed normalized texts, serving cache hits locally and sending only the misses upstream
+
+    Args:
+        texts: normalized texts to embed
+        model_name: the embedding model
+        coalesce: send a single miss through the micro-batcher so it shares an upstream call with concurrent requests
+
+    Returns:
+        vectors (List[np.ndarray]): float32 vectors in the same order as texts
+    '''
+    keys = [embedding_cache.make_key(model_name, text) for text in texts]
+    vectors = await embedding_cache.get_many(keys)
+
+    # Deduplicate misses so repeated texts in one batch are embedded once
+    misses: Dict[str, str] = {}
+    for key, text, vector in zip(keys, texts, vectors):
+        if vector is None and key not in misses:
+            misses[key] = text
+
+    logger.info(f"Embedding cache: {len(texts) - sum(v is None for v in vectors)} hits, {len(misses)} unique misses")
+
+    if misses:
+        if coalesce and len(misses) == 1:
+            miss_vectors = [await embedding_batcher.embed(next(iter(misses.values())), model_name)]
+        else:
+            # Large miss sets are split into sub-batches and sent concurrently
+            miss_vectors = await embed_texts(list(misses.values()), model_name)
+
+        fresh: Dict[str, np.ndarray] = {}
+        for key, vector in zip(misses.keys(), miss_vectors):
+            fresh[key] = vector
+            await embedding_cache.set(key, vector)
+
+        # Reassemble in original order
+        vectors = [vector if vector is not None else fresh[key] for key, vector in zip(keys, vectors)]
+
+    return vectors
+
+def _negotiate_format(accept: Optional[str]) -> Tuple[str, str]:
+    '''
+    Description: Pick the response format from the Accept header
+
+    `application/octet-stream` returns raw little-endian vectors, `application/vnd.embeddings.base64+json`
+    returns them base64-encoded in JSON. Either accepts a `dtype=float16` parameter. Anything else is JSON.
+
+    Args:
+        accept: the Accept header
+
+    Returns:
+        (media_type, dtype): the chosen media type and vector dtype
+    '''
+    for media_range in (accept or "").split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        if media_type not in (BASE64_MEDIA_TYPE, BINARY_MEDIA_TYPE):
+            continue
+
+        dtype = "float32"
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "dtype":
+                dtype = value.strip()
+
+        if dtype not in SUPPORTED_DTYPES:
+            raise HTTPException(status_code=406, detail=f"Unsupported dtype: {dtype}")
+        return media_type, dtype
+
+    return JSON_MEDIA_TYPE, "float32"
+
+def _encode_matrix(vectors: List[np.ndarray], media_type: str, dtype: str) -> Response:
+    '''
+    Description: Encode vectors as one little-endian matrix in the negotiated format
+    '''
+    if vectors:
+        matrix = np.vstack(vectors).astype(SUPPORTED_DTYPES[dtype], copy=False)
+    else:
+        matrix = np.empty((0, 0), dtype=SUPPORTED_DTYPES[dtype])
+    shape = list(matrix.shape)
+
+    if media_type == BINARY_MEDIA_TYPE:
+        return Response(
+            content=matrix.tobytes(),
+            media_type=BINARY_MEDIA_TYPE,
+            headers={
+                "X-Embedding-Shape": ",".join(str(dim) for dim in shape),
+                "X-Embedding-Dtype": dtype
+            }
+        )
+
+    encoded = EncodedEmbeddingResponse(
+        data=base64.b64encode(matrix.tobytes()).decode("ascii"),
+        shape=shape,
+        dtype=dtype
+    )
+    return Response(content=encoded.model_dump_json(), media_type=BASE64_MEDIA_TYPE)
 
 ''' API Endpoints '''
 
@@ -34,54 +144,63 @@ async def embeddings(request: EmbeddingRequest) -> EmbeddingResponse:
         embedding_response (EmbeddingResponse): Returns the embedding response
     '''
 
-    # Initialize OpenAI client
-    openai_client = OpenAI(api_key=OPENAI_API_KEY)
-
     # Generate embeddings
     logger.info(f"Generating embeddings. Embedding model: {request.model_name}")
-    embedding_response = openai_client.embeddings.create(
-        input=request.text,
-        model=request.model_name
-    )
+    vectors = await _embed([_normalize_text(request.text)], request.model_name, coalesce=embedding_batcher.config.enabled)
 
     logger.info(f"Successfully generated embeddings. Embedding model: {request.model_name}")
-    return EmbeddingResponse(embedding=embedding_response.data[0].embedding)
+    return EmbeddingResponse(embedding=vectors[0].tolist())
 
-@router.post('/embeddings/batch')
-async def batch_embeddings(request: BatchEmbeddingRequest) -> BatchEmbeddingResponse:
+@router.post('/embeddings/batch', response_model=BatchEmbeddingResponse)
+async def batch_embeddings(request: BatchEmbeddingRequest, accept: Optional[str] = Header(default=None)):
     '''
     Description: Generate embeddings for multiple texts in a single request
 
+    Clients can ask for a compact float32/float16 matrix instead of JSON lists via the Accept header,
+    see _negotiate_format.
+
     Args:
         request (BatchEmbeddingRequest): Request containing multiple texts to embed
 
     Returns:
         batch_embedding_response (BatchEmbeddingResponse): Returns embeddings for all texts
     '''
-
-    # Initialize OpenAI client
-    openai_client = OpenAI(api_key=OPENAI_API_KEY)
+    media_type, dtype = _negotiate_format(accept)
 
     # Generate embeddings for all texts at once
     logger.info(f"Generating batch embeddings for {len(request.texts)} texts. Model: {request.model_name}")
-    
+
     # Validate and clean texts for OpenAI API
     validated_texts = []
     for i, text in enumerate(request.texts):
         if not isinstance(text, str):
             logger.error(f"Text {i} is not a string: {type(text)} - {text}")
             raise ValueError(f"Text {i} must be a string, got {type(text)}")
-        # Replace empty/whitespace-only texts with a space to satisfy OpenAI API requirements
-        validated_texts.append(text.strip() if text.strip() else " ")
-    
-    # Send embedding request to OpenAI
-    embedding_response = openai_client.embeddings.create(
-        input=validated_texts,
-        model=request.model_name
-    )
+        validated_texts.append(_normalize_text(text))
+
+    # Serve cached vectors and send only the misses to OpenAI
+    vectors = await _embed(validated_texts, request.model_name)
+
+    if media_type != JSON_MEDIA_TYPE:
+        logger.info(f"Returning {len(vectors)} embeddings as {media_type} ({dtype}). Model: {request.model_name}")
+        return _encode_matrix(vectors, media_type, dtype)
 
     # Extract embeddings from response
-    embeddings = [data.embedding for data in embedding_response.data]
-    
+    embeddings = [vector.tolist() for vector in vectors]
+
     logger.info(f"Successfully generated batch embeddings for {len(embeddings)} texts. Model: {request.model_name}")
-    return BatchEmbeddingResponse(embeddings=embeddings)
\ No newline at end of file
+    return BatchEmbeddingResponse(embeddings=embeddings)
+
+@router.get('/cache/stats')
+async def cache_stats() -> Dict:
+    '''
+    Description: Hit/miss counters for the embedding cache
+    '''
+    return embedding_cache.snapshot()
+
+@router.get('/batcher/stats')
+async def batcher_stats() -> Dict:
+    '''
+    Description: Achieved batch sizes for coalesced /embeddings requests
+    '''
+    return embedding_batcher.snapshot()
@@ -1,11 +1,18 @@
 ''' Gateway for Large Language Models (LLM) '''
 
-from fastapi import APIRouter, HTTPException
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Header, Response
+from fastapi.responses import StreamingResponse
 from python_utils.logging.logging import init_logger
 
 from app import gateway_config
-from app.schemas.gateway import GatewayRequest, LLMResponse
-from app.helper.inference import inference_anthropic, inference_openai, inference_ollama
+from app.schemas.gateway import GatewayRequest, LLMResponse, LLMStreamDelta
+from app.helper.cache import response_cache
+from app.helper.inference import (
+    inference_anthropic, inference_openai, inference_ollama,
+    stream_anthropic, stream_openai, stream_ollama
+)
 
 # Initialize logger and FastAPI
 logger = init_logger()
@@ -14,12 +21,11 @@ router = APIRouter()
 # initialize configs
 llm_models = gateway_config.llm_models
 
-''' API '''
+''' Helpers '''
 
-@router.post('/generate')
-async def llm_generate(request: GatewayRequest) -> LLMResponse:
+async def _generate(request: GatewayRequest) -> LLMResponse:
     '''
-    Description: Forwards request to LLM
+    Description: Sends the request to the model's vendor
 
     Args:
         request: Request that'll be sent to the LLM
@@ -58,7 +64,6 @@ async def llm_generate(request: GatewayRequest) -> LLMResponse:
                 temperature=request.temperature,
                 max_tokens=request.max_tokens,
                 top_p=request.top_p,
-                top_k=request.top_k,
                 web_search=request.web_search
             )
 
@@ -81,3 +86,125 @@ async def llm_generate(request: GatewayRequest) -> LLMResponse:
     except Exception as e:
         logger.error(f'Error occurred: {e}')
         raise HTTPException(status_code=500, detail="Inference failed")
+
+''' API '''
+
+@router.post('/generate')
+async def llm_generate(
+    request: GatewayRequest,
+    response: Response,
+    cache_control: Optional[str] = Header(default=None)
+) -> LLMResponse:
+    '''
+    Description: Forwards request to LLM. Deterministic requests are served from the response cache.
+
+    Send `Cache-Control: no-cache` to skip the cache lookup and `no-store` to skip storing the result.
+    The `X-Cache` response header reports HIT, MISS or BYPASS.
+
+    Args:
+        request: Request that'll be sent to the LLM
+
+    Returns:
+        llm_response(LLMResponse): returns LLM response
+    '''
+    directives = {d.strip().lower() for d in (cache_control or "").split(",")}
+
+    if not response_cache.is_cacheable(request.temperature, request.web_search):
+        response.headers["X-Cache"] = "BYPASS"
+        return await _generate(request)
+
+    cache_key = response_cache.make_key(request)
+    ttl = response_cache.ttl_for(request.model_name)
+
+    bypassed = "no-cache" in directives
+    if bypassed:
+        response_cache.stats["bypassed"] += 1
+    else:
+        cached = await response_cache.get(cache_key, ttl)
+        if cached is not None:
+            logger.info(f'Response cache hit for model: {request.model_name}')
+            response.headers["X-Cache"] = "HIT"
+            return LLMResponse.model_validate_json(cached)
+
+    llm_response = await _generate(request)
+
+    if "no-store" not in directives:
+        await response_cache.set(cache_key, llm_response.model_dump_json(), ttl)
+
+    # A forced refresh reports BYPASS, so it isn't mistaken for a miss
+    response.headers["X-Cache"] = "BYPASS" if bypassed else "MISS"
+    return llm_response
+
+@router.get('/cache/stats')
+async def cache_stats() -> Dict:
+    '''
+    Description: Hit/miss counters for the response cache
+    '''
+    return response_cache.snapshot()
+
+@router.post('/generate/stream')
+async def llm_generate_stream(request: GatewayRequest) -> StreamingResponse:
+    '''
+    Description: Forwards request to LLM and relays token deltas as Server-Sent Events
+
+    Each event is `data: <LLMStreamDelta json>`. The last event has done=True,
+    and carries an error message if the upstream failed mid-stream.
+
+    Args:
+        request: Request that'll be sent to the LLM
+
+    Returns:
+        StreamingResponse: text/event-stream of LLMStreamDelta events
+    '''
+
+    # Get the vendor of the model
+    vendor = gateway_config.get_vendor(
+        llm_models=llm_models,
+        model_name=request.model_name
+    )
+
+    if vendor == "anthropic":
+        deltas = stream_anthropic(
+            model_name=request.model_name,
+            user_prompt=request.user_prompt,
+            system_prompt=request.system_prompt,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+            top_p=request.top_p,
+            top_k=request.top_k,
+            web_search=request.web_search
+        )
+    elif vendor == "openai":
+        deltas = stream_openai(
+            model_name=request.model_name,
+            user_prompt=request.user_prompt,
+            system_prompt=request.system_prompt,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+            top_p=request.top_p,
+            web_search=request.web_search
+        )
+    # default is local llms
+    else:
+        deltas = stream_ollama(
+            model_name=request.model_name,
+            user_prompt=request.user_prompt,
+            system_prompt=request.system_prompt,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+            top_p=request.top_p,
+            top_k=request.top_k
+        )
+
+    async def event_stream() -> AsyncIterator[str]:
+        # Headers are already sent once streaming starts, so errors are reported in-band
+        try:
+            async for text in deltas:
+                yield f"data: {LLMStreamDelta(delta=text).model_dump_json()}\n\n"
+            yield f"data: {LLMStreamDelta(done=True).model_dump_json()}\n\n"
+
+        except Exception as e:
+            logger.error(f'Error occurred while streaming: {e}')
+            yield f"data: {LLMStreamDelta(done=True, error='Inference failed').model_dump_json()}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
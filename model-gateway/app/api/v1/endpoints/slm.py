@@ -1,19 +1,56 @@
 ''' Gateway for Small Language Models (SLM) '''
 
+import asyncio
 from fastapi import APIRouter, HTTPException
 from python_utils.logging.logging import init_logger
-from typing import Dict
-import httpx
+from typing import Dict, List
 
 from app import gateway_config
-from app.schemas.gateway import GatewayRequest
+from app.helper.clients import client_registry, SLMBackend
+from app.schemas.gateway import GatewayRequest, SLMBatchItem, SLMBatchRequest, SLMBatchResponse
 
 # Initialize logger and FastAPI
 logger = init_logger()
 router = APIRouter()
 
 # initialize configs
-slm_models = gateway_config.slm_models
+slm_pool_config = gateway_config.slm_pool
+
+''' Helpers '''
+
+def _get_backend(model_name: str) -> SLMBackend:
+    # fetch backend and verify valid model
+    backend = client_registry.slm.get(model_name)
+    if backend is None:
+        logger.error(f"Model, {model_name}, not found")
+        raise HTTPException(status_code=400, detail="Model not found")
+    return backend
+
+async def _analyze(backend: SLMBackend, replica: str, prompt: str) -> Dict:
+    '''
+    Description: Send one prompt to a replica over the backend's pooled client
+
+    Args:
+        backend: the SLM backend
+        replica: base URL of the replica to use
+        prompt: the prompt to analyze
+
+    Returns:
+        slm_response (Dict): the SLM's response
+    '''
+    # Build payload
+    request_payload = {
+        "prompt": prompt
+    }
+
+    endpoint = f"{replica}/v1/analyze"
+    slm_response = await backend.client.post(
+        url=endpoint,
+        json=request_payload
+    )
+    slm_response.raise_for_status()
+
+    return slm_response.json()
 
 ''' API '''
 
@@ -32,30 +69,68 @@ async def predict(request: GatewayRequest) -> Dict:
     '''
     logger.info(f"Request received. Model: {request.model_name}")
 
-    # fetch endpoint and verify valid model
-    endpoint = f"{slm_models.get(request.model_name)}/v1/analyze"
-    logger.info(f"Sending SLM request to: {endpoint}")
-    if not endpoint:
-        logger.error(f"Model, {request.model_name}, not found")
-        raise HTTPException(status_code=400, detail="Model not found")
-    
-    # Build payload
-    request_payload = {
-        "prompt": request.prompt
-    }
+    backend = _get_backend(request.model_name)
 
-    # Send request to model
+    # Send request to the least loaded replica
     try:
-        async with httpx.AsyncClient() as client:
-            slm_response = await client.post(
-                url=endpoint,
-                json=request_payload
-            )
-            slm_response.raise_for_status()
-            logger.info(f"Request to {endpoint} was successful.")
-            
-            return slm_response.json()
+        async with backend.replica() as replica:
+            logger.info(f"Sending SLM request to: {replica}")
+            slm_response = await _analyze(backend, replica, request.user_prompt)
+            logger.info(f"Request to {replica} was successful.")
+
+            return slm_response
 
     except Exception as e:
         logger.error(f"Error occured: {e}")
         raise HTTPException(status_code=500, detail="SLM Prediction Server Error")
+
+@router.post('/predict/batch')
+async def predict_batch(request: SLMBatchRequest) -> SLMBatchResponse:
+    '''
+    Description: Forwards many prompts to an SLM in one call
+
+    Prompts are split into chunks of slm_pool.batch_size. Each chunk is pinned to the least loaded
+    replica and its prompts are sent concurrently; up to slm_pool.max_concurrent_batches chunks run
+    at once. A failed prompt is reported on its own item instead of failing the whole batch.
+
+    Args:
+        request: the model name and prompts
+
+    Returns:
+        slm_batch_response (SLMBatchResponse): one result or error per prompt, in input order
+    '''
+    logger.info(f"Batch request received. Model: {request.model_name}, prompts: {len(request.prompts)}")
+
+    backend = _get_backend(request.model_name)
+    batch_size = slm_pool_config.batch_size
+    semaphore = asyncio.Semaphore(slm_pool_config.max_concurrent_batches)
+
+    chunks = [
+        list(range(start, min(start + batch_size, len(request.prompts))))
+        for start in range(0, len(request.prompts), batch_size)
+    ]
+
+    async def run_item(replica: str, index: int) -> SLMBatchItem:
+        try:
+            result = await _analyze(backend, replica, request.prompts[index])
+            return SLMBatchItem(index=index, result=result)
+        except Exception as e:
+            logger.error(f"Prompt {index} failed on {replica}: {e}")
+            return SLMBatchItem(index=index, error=str(e) or type(e).__name__)
+
+    async def run_chunk(chunk: List[int]) -> List[SLMBatchItem]:
+        async with semaphore:
+            async with backend.replica(weight=len(chunk)) as replica:
+                return await asyncio.gather(*(run_item(replica, index) for index in chunk))
+
+    chunk_results = await asyncio.gather(*(run_chunk(chunk) for chunk in chunks))
+    results = [item for chunk in chunk_results for item in chunk]
+
+    failed = sum(item.error is not None for item in results)
+    logger.info(f"Batch request finished. Model: {request.model_name}, succeeded: {len(results) - failed}, failed: {failed}")
+
+    return SLMBatchResponse(
+        results=results,
+        succeeded=len(results) - failed,
+        failed=failed
+    )
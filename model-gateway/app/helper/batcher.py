@@ -0,0 +1,136 @@
+''' Dynamic micro-batching for single-text embedding requests '''
+
+import asyncio
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from python_utils.logging.logging import init_logger
+
+from app import gateway_config
+from app.helper.embedding import embed_texts
+from app.schemas.config import EmbeddingBatchConfig, MicroBatchConfig
+
+# Initialize logger
+logger = init_logger()
+
+class EmbeddingBatcher:
+    '''
+    Coalesces concurrent single-text embedding requests.
+
+    Each model has its own queue. The first request in a window starts a
+    flush timer; the batch is sent when max_wait_ms elapses or max_batch
+    items are waiting, whichever comes first. Identical texts in a window
+    are embedded once. Every caller awaits its own future and gets back
+    only its vector. If the combined call fails, each text is retried on
+    its own, so one bad input only fails the callers that sent it.
+    '''
+
+    def __init__(self, batch_config: MicroBatchConfig, embedding_batching: EmbeddingBatchConfig):
+        self.config = batch_config
+        self._isolation_config = embedding_batching.model_copy(update={"max_retries": 0})
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.batch_sizes: Counter = Counter()
+        self.deduplicated = 0
+        self.isolated_failures = 0
+
+    async def embed(self, text: str, model_name: str) -> np.ndarray:
+        '''
+        Description: Queue one text and wait for its vector
+
+        Args:
+            text: normalized text to embed
+            model_name: the embedding model
+
+        Returns:
+            vector (np.ndarray): float32 vector for text
+        '''
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        pending = self._pending.setdefault(model_name, [])
+        pending.append((text, future))
+
+        if len(pending) >= self.config.max_batch:
+            self._flush(model_name)
+        elif model_name not in self._timers:
+            self._timers[model_name] = loop.call_later(
+                self.config.max_wait_ms / 1000, self._flush, model_name
+            )
+
+        return await future
+
+    def _flush(self, model_name: str):
+        timer = self._timers.pop(model_name, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._pending.pop(model_name, [])
+        if batch:
+            # Hold a reference so the task isn't garbage collected mid-flight
+            task = asyncio.create_task(self._run(model_name, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, model_name: str, batch: List[Tuple[str, asyncio.Future]]):
+        self.batch_sizes[len(batch)] += 1
+
+        # Identical texts share one upstream slot
+        futures: Dict[str, List[asyncio.Future]] = {}
+        for text, future in batch:
+            futures.setdefault(text, []).append(future)
+        texts = list(futures)
+        self.deduplicated += len(batch) - len(texts)
+        logger.info(f"Flushing micro-batch of {len(batch)} requests, {len(texts)} unique texts. Model: {model_name}")
+
+        try:
+            vectors = await embed_texts(texts, model_name)
+        except Exception as e:
+            if len(texts) == 1:
+                self._resolve(futures[texts[0]], error=e)
+                return
+
+            logger.warning(f"Micro-batch failed ({type(e).__name__}), retrying {len(texts)} texts one by one")
+            await asyncio.gather(*(self._run_one(model_name, text, futures[text]) for text in texts))
+            return
+
+        for text, vector in zip(texts, vectors):
+            self._resolve(futures[text], vector=vector)
+
+    async def _run_one(self, model_name: str, text: str, futures: List[asyncio.Future]):
+        # The combined call already used the retry budget, one attempt each is enough to isolate the failure
+        try:
+            vector = await embed_texts([text], model_name, self._isolation_config)
+        except Exception as e:
+            self.isolated_failures += 1
+            self._resolve(futures, error=e)
+            return
+        self._resolve(futures, vector=vector[0])
+
+    @staticmethod
+    def _resolve(futures: List[asyncio.Future], vector: Optional[np.ndarray] = None, error: Optional[Exception] = None):
+        for future in futures:
+            # Callers that disconnected have cancelled their futures
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(vector)
+
+    def snapshot(self) -> Dict:
+        batches = sum(self.batch_sizes.values())
+        items = sum(size * count for size, count in self.batch_sizes.items())
+        return {
+            "enabled": self.config.enabled,
+            "batches": batches,
+            "items": items,
+            "mean_batch_size": items / batches if batches else 0.0,
+            "deduplicated": self.deduplicated,
+            "isolated_failures": self.isolated_failures,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items()))
+        }
+
+embedding_batcher = EmbeddingBatcher(gateway_config.micro_batching, gateway_config.embedding_batching)
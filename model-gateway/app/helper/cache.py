@@ -0,0 +1,330 @@
+''' Exact-match caches for LLM generations and embeddings '''
+
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pydantic import BaseModel
+from python_utils.logging.logging import init_logger
+
+from app import gateway_config
+from app.schemas.config import EmbeddingCacheConfig, ResponseCacheConfig
+
+# Redis is optional, only needed when a shared cache tier is configured
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+# Initialize logger
+logger = init_logger()
+
+''' Cache Backends '''
+
+class CacheBackend(ABC):
+    ''' Interface for a cache tier. Values are opaque to the backend. '''
+
+    name = "base"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        return [await self.get(key) for key in keys]
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: int):
+        ...
+
+    async def close(self):
+        pass
+
+class LRUCache(CacheBackend):
+    ''' In-process LRU with per-entry expiry. Bounded by entry count and, optionally, by value bytes. '''
+
+    name = "local"
+
+    def __init__(self, max_entries: int, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+
+    @staticmethod
+    def _sizeof(value: Any) -> int:
+        # NumPy arrays report their buffer size, strings and bytes their length
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        return len(value)
+
+    def _pop(self, key: str):
+        _, value = self._entries.pop(key)
+        self.bytes -= self._sizeof(value)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._pop(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int):
+        if key in self._entries:
+            self._pop(key)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self.bytes += self._sizeof(value)
+
+        # Evict least recently used entries past the size bounds
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            self._pop(next(iter(self._entries)))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class RedisCache(CacheBackend):
+    ''' Shared tier backed by Redis (or anything speaking the Redis protocol). '''
+
+    name = "shared"
+
+    def __init__(self, url: str, prefix: str = "gateway:llm:", decode_responses: bool = True):
+        if redis is None:
+            raise ImportError("redis is not installed. Install it to use a shared cache tier.")
+        self.prefix = prefix
+        self._client = redis.from_url(url, decode_responses=decode_responses)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return await self._client.get(self.prefix + key)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        if not keys:
+            return []
+        return await self._client.mget([self.prefix + key for key in keys])
+
+    async def set(self, key: str, value: Any, ttl: int):
+        await self._client.set(self.prefix + key, value, ex=ttl)
+
+    async def close(self):
+        await self._client.aclose()
+
+''' Response Cache '''
+
+class ResponseCache:
+    '''
+    Two-tier exact-match cache. Lookups check the local LRU first, then the
+    shared backend; hits from the shared tier are copied into the local one.
+    '''
+
+    def __init__(self, cache_config: ResponseCacheConfig):
+        self.config = cache_config
+        self.local = LRUCache(cache_config.max_entries)
+        self.shared: Optional[CacheBackend] = None
+        self.stats: Dict[str, int] = {
+            "local_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stores": 0,
+            "errors": 0
+        }
+
+        if cache_config.redis_url:
+            self.shared = RedisCache(cache_config.redis_url)
+            logger.info("Shared response cache tier enabled")
+
+    @staticmethod
+    def make_key(request: BaseModel) -> str:
+        '''
+        Description: Canonical hash of the full request (model, prompts, sampling params, web_search)
+
+        Args:
+            request: the request to hash
+
+        Returns:
+            key (str): sha256 hex digest
+        '''
+        canonical = json.dumps(request.model_dump(), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def ttl_for(self, model_name: str) -> int:
+        return self.config.model_ttls.get(model_name, self.config.default_ttl)
+
+    def is_cacheable(self, temperature: Optional[float], web_search: bool = False) -> bool:
+        '''
+        Description: Only deterministic generations are cached unless configured otherwise.
+        Web search answers depend on live results, so they are never cached.
+        '''
+        if not self.config.enabled or web_search:
+            return False
+        if self.config.deterministic_only and temperature not in (None, 0.0):
+            return False
+        return True
+
+    async def get(self, key: str, ttl: int) -> Optional[str]:
+        '''
+        Description: Look up a cached value, checking the local tier before the shared one
+
+        Args:
+            key: cache key from make_key
+            ttl: lifetime to give the local copy when the hit comes from the shared tier
+
+        Returns:
+            value (Optional[str]): cached value, None on a miss
+        '''
+        value = await self.local.get(key)
+        if value is not None:
+            self.stats["local_hits"] += 1
+            return value
+
+        if self.shared is not None:
+            try:
+                value = await self.shared.get(key)
+            except Exception as e:
+                # A shared tier outage degrades to local-only caching
+                self.stats["errors"] += 1
+                logger.warning(f"Shared cache lookup failed: {e}")
+                value = None
+
+            if value is not None:
+                self.stats["shared_hits"] += 1
+                await self.local.set(key, value, ttl)
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str, ttl: int):
+        await self.local.set(key, value, ttl)
+
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, value, ttl)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Shared cache store failed: {e}")
+
+        self.stats["stores"] += 1
+
+    def snapshot(self) -> Dict:
+        hits = self.stats["local_hits"] + self.stats["shared_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "local_entries": len(self.local),
+            "hit_rate": hits / lookups if lookups else 0.0
+        }
+
+    async def close(self):
+        if self.shared is not None:
+            await self.shared.close()
+
+class EmbeddingCache:
+    '''
+    Content-addressed embedding cache keyed on (model_name, sha256(text)).
+
+    Vectors are held as float32 NumPy arrays in the local LRU and as raw
+    float32 bytes in the shared tier.
+    '''
+
+    def __init__(self, cache_config: EmbeddingCacheConfig):
+        self.config = cache_config
+        self.local = LRUCache(cache_config.max_entries, cache_config.max_bytes)
+        self.shared: Optional[CacheBackend] = None
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "errors": 0
+        }
+
+        if cache_config.redis_url:
+            self.shared = RedisCache(cache_config.redis_url, prefix="gateway:emb:", decode_responses=False)
+            logger.info("Shared embedding cache tier enabled")
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        '''
+        Description: Content address for an embedding. Text must already be normalized.
+        '''
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{model_name}:{digest}"
+
+    async def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        '''
+        Description: Look up vectors for many keys, local tier first
+
+        Args:
+            keys: cache keys from make_key
+
+        Returns:
+            vectors (List[Optional[np.ndarray]]): float32 vectors in key order, None for misses
+        '''
+        if not self.config.enabled:
+            self.stats["misses"] += len(keys)
+            return [None] * len(keys)
+
+        vectors = [await self.local.get(key) for key in keys]
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing and self.shared is not None:
+            try:
+                blobs = await self.shared.get_many([keys[i] for i in missing])
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Shared embedding cache lookup failed: {e}")
+                blobs = [None] * len(missing)
+
+            for i, blob in zip(missing, blobs):
+                if blob is not None:
+                    vectors[i] = np.frombuffer(blob, dtype=np.float32)
+                    await self.local.set(keys[i], vectors[i], self.config.ttl)
+
+        hits = sum(vector is not None for vector in vectors)
+        self.stats["hits"] += hits
+        self.stats["misses"] += len(keys) - hits
+        return vectors
+
+    async def set(self, key: str, vector: np.ndarray):
+        if not self.config.enabled:
+            return
+
+        await self.local.set(key, vector, self.config.ttl)
+
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, vector.tobytes(), self.config.ttl)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Shared embedding cache store failed: {e}")
+
+        self.stats["stores"] += 1
+
+    def snapshot(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "local_entries": len(self.local),
+            "local_bytes": self.local.bytes,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0
+        }
+
+    async def close(self):
+        if self.shared is not None:
+            await self.shared.close()
+
+response_cache = ResponseCache(gateway_config.response_cache)
+embedding_cache = EmbeddingCache(gateway_config.embedding_cache)
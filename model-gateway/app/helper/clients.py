@@ -0,0 +1,182 @@
+''' Long-lived vendor clients shared across requests '''
+
+import os
+import random
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Union
+from dotenv import load_dotenv
+
+import httpx
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+from ollama import AsyncClient as AsyncOllama
+
+from python_utils.logging.logging import init_logger
+
+from app import gateway_config
+from app.schemas.config import HTTPPoolConfig, SLMPoolConfig
+
+# Initialize logger
+logger = init_logger()
+
+# Initialize keys
+try:
+    load_dotenv()
+except ImportError:
+    logger.warning("Tried to load dotenv. Failed. Hopefully running in k8s.")
+ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+
+if ANTHROPIC_API_KEY is None:
+    logger.error('Missing Anthropic API key')
+    raise ValueError("Missing Anthropic API key. Please set ANTHROPIC_API_KEY variable.")
+
+if OPENAI_API_KEY is None:
+    logger.error('Missing OpenAI API key')
+    raise ValueError("Missing OpenAI API key. Please set OPENAI_API_KEY variable.")
+
+def _limits(pool_config: HTTPPoolConfig) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=pool_config.max_connections,
+        max_keepalive_connections=pool_config.max_keepalive_connections,
+        keepalive_expiry=pool_config.keepalive_expiry
+    )
+
+def _timeout(pool_config: HTTPPoolConfig) -> httpx.Timeout:
+    return httpx.Timeout(
+        pool_config.read_timeout,
+        connect=pool_config.connect_timeout
+    )
+
+class SLMBackend:
+    '''
+    One SLM model served by one or more replicas.
+
+    All replicas share a single keep-alive pool. Requests go to the replica
+    with the fewest requests in flight, ties broken at random.
+    '''
+
+    def __init__(self, model_name: str, replicas: List[str], client: httpx.AsyncClient):
+        self.model_name = model_name
+        self.replicas = replicas
+        self.client = client
+        self.outstanding: Dict[str, int] = {replica: 0 for replica in replicas}
+
+    @asynccontextmanager
+    async def replica(self, weight: int = 1) -> AsyncIterator[str]:
+        '''
+        Description: Reserve the least loaded replica for the duration of one request
+
+        Args:
+            weight: number of requests this reservation will send, e.g. the size of a batch chunk
+
+        Yields:
+            replica (str): base URL of the chosen replica
+        '''
+        fewest = min(self.outstanding.values())
+        chosen = random.choice([url for url, count in self.outstanding.items() if count == fewest])
+
+        self.outstanding[chosen] += weight
+        try:
+            yield chosen
+        finally:
+            self.outstanding[chosen] -= weight
+
+class ClientRegistry:
+    '''
+    Holds one async client per vendor for the lifetime of the app.
+
+    Anthropic and OpenAI share a single httpx connection pool so keep-alive
+    sockets are reused across requests. Ollama builds its own httpx client,
+    so the registry hands it a transport (pool) with the same limits and
+    closes that. Each SLM model gets its own pool
+    spanning its replicas.
+    '''
+
+    def __init__(
+        self,
+        pool_config: HTTPPoolConfig,
+        slm_models: Dict[str, Union[str, List[str]]],
+        slm_pool_config: SLMPoolConfig
+    ):
+        self.pool_config = pool_config
+        self.slm_models = slm_models
+        self.slm_pool_config = slm_pool_config
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.anthropic: Optional[AsyncAnthropic] = None
+        self.openai: Optional[AsyncOpenAI] = None
+        self.ollama: Optional[AsyncOllama] = None
+        self.ollama_transport: Optional[httpx.AsyncBaseTransport] = None
+        self.slm: Dict[str, SLMBackend] = {}
+
+    async def start(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        '''
+        Description: Create the shared connection pool and vendor clients. Called once at app startup.
+
+        Args:
+            transport: optional httpx transport override, used to point the clients at a fake upstream for load tests
+        '''
+        logger.info(f'Starting vendor clients. Pool limits: {self.pool_config}')
+
+        self.http_client = httpx.AsyncClient(
+            limits=_limits(self.pool_config),
+            timeout=_timeout(self.pool_config),
+            transport=transport
+        )
+        self.anthropic = AsyncAnthropic(
+            api_key=ANTHROPIC_API_KEY,
+            http_client=self.http_client
+        )
+        self.openai = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            http_client=self.http_client
+        )
+        self.ollama_transport = transport or httpx.AsyncHTTPTransport(limits=_limits(self.pool_config))
+        self.ollama = AsyncOllama(
+            timeout=_timeout(self.pool_config),
+            transport=self.ollama_transport
+        )
+
+        for model_name, replicas in self.slm_models.items():
+            replicas = [replicas] if isinstance(replicas, str) else replicas
+            if not replicas:
+                raise ValueError(f'SLM model {model_name} has no replicas')
+            slm_client = httpx.AsyncClient(
+                limits=_limits(self.slm_pool_config),
+                timeout=_timeout(self.slm_pool_config),
+                http2=self.slm_pool_config.http2,
+                transport=transport
+            )
+            self.slm[model_name] = SLMBackend(model_name, replicas, slm_client)
+            logger.info(f'SLM backend {model_name}: {len(replicas)} replica(s)')
+
+        logger.info('Vendor clients started')
+
+    async def close(self):
+        '''
+        Description: Close all open connections. Called once at app shutdown.
+        '''
+        logger.info('Closing vendor clients')
+
+        if self.http_client is not None:
+            await self.http_client.aclose()
+
+        # ollama does not expose a close method, so close the transport it was given
+        if self.ollama_transport is not None:
+            await self.ollama_transport.aclose()
+
+        for backend in self.slm.values():
+            await backend.client.aclose()
+
+        self.http_client = None
+        self.anthropic = None
+        self.openai = None
+        self.ollama = None
+        self.ollama_transport = None
+        self.slm = {}
+
+client_registry = ClientRegistry(
+    gateway_config.http_pool,
+    gateway_config.slm_models,
+    gateway_config.slm_pool
+)
@@ -0,0 +1,129 @@
+''' Embedding logic: splits large batches and fans them out to OpenAI '''
+
+import asyncio
+import math
+import random
+from typing import List
+
+import numpy as np
+import openai
+
+from python_utils.logging.logging import init_logger
+
+from app import gateway_config
+from app.helper.clients import client_registry
+from app.schemas.config import EmbeddingBatchConfig
+
+# Initialize logger
+logger = init_logger()
+
+# Errors worth retrying; everything else fails the request immediately
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError
+)
+
+def estimate_tokens(text: str, chars_per_token: float) -> int:
+    '''
+    Description: Cheap token estimate, deliberately conservative so sub-batches stay under the vendor limit
+    '''
+    return max(1, math.ceil(len(text) / chars_per_token))
+
+def split_batches(texts: List[str], batch_config: EmbeddingBatchConfig) -> List[List[int]]:
+    '''
+    Description: Split texts into sub-batches bounded by item count and estimated tokens
+
+    Args:
+        texts: texts to embed
+        batch_config: item and token limits per upstream request
+
+    Returns:
+        batches (List[List[int]]): indices into texts, one list per sub-batch, in order
+    '''
+    batches = []
+    current = []
+    current_tokens = 0
+
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text, batch_config.chars_per_token)
+
+        if current and (
+            len(current) >= batch_config.max_items
+            or current_tokens + tokens > batch_config.max_tokens
+        ):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+
+        current.append(i)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+async def _embed_batch(texts: List[str], model_name: str, batch_config: EmbeddingBatchConfig) -> List[np.ndarray]:
+    '''
+    Description: Send one sub-batch upstream, retrying transient failures with jittered exponential backoff
+    '''
+    # The SDK retries twice by default; turn that off so max_retries is the only retry budget
+    openai_client = client_registry.openai.with_options(max_retries=0)
+
+    for attempt in range(batch_config.max_retries + 1):
+        try:
+            embedding_response = await openai_client.embeddings.create(
+                input=texts,
+                model=model_name
+            )
+
+            # Order by index rather than trusting response order
+            data = sorted(embedding_response.data, key=lambda item: item.index)
+            return [np.asarray(item.embedding, dtype=np.float32) for item in data]
+
+        except RETRYABLE_ERRORS as e:
+            if attempt == batch_config.max_retries:
+                logger.error(f"Embedding sub-batch failed after {attempt + 1} attempts: {e}")
+                raise
+
+            delay = min(batch_config.backoff_max, batch_config.backoff_base * (2 ** attempt))
+            delay = random.uniform(0, delay)
+            logger.warning(f"Embedding sub-batch failed ({type(e).__name__}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+async def embed_texts(
+    texts: List[str],
+    model_name: str,
+    batch_config: EmbeddingBatchConfig = gateway_config.embedding_batching
+) -> List[np.ndarray]:
+    '''
+    Description: Embed any number of texts, splitting into sub-batches dispatched concurrently
+
+    Args:
+        texts: normalized texts to embed
+        model_name: the embedding model
+        batch_config: sub-batch limits, concurrency and retry settings
+
+    Returns:
+        vectors (List[np.ndarray]): float32 vectors in the same order as texts
+    '''
+    batches = split_batches(texts, batch_config)
+    semaphore = asyncio.Semaphore(batch_config.max_concurrency)
+
+    logger.info(f"Embedding {len(texts)} texts in {len(batches)} sub-batches. Concurrency: {batch_config.max_concurrency}")
+
+    async def run(batch: List[int]) -> List[np.ndarray]:
+        async with semaphore:
+            return await _embed_batch([texts[i] for i in batch], model_name, batch_config)
+
+    results = await asyncio.gather(*(run(batch) for batch in batches))
+
+    # Merge sub-batch results back into input order
+    vectors: List[np.ndarray] = [None] * len(texts)
+    for batch, batch_vectors in zip(batches, results):
+        for i, vector in zip(batch, batch_vectors):
+            vectors[i] = vector
+
+    return vectors
@@ -1,69 +1,33 @@
 ''' Inference logic for LLM '''
 
-import json
-import os
-from dotenv import load_dotenv
-
-import anthropic
-from openai import OpenAI
-import ollama
+from typing import AsyncIterator, Dict
 
 from python_utils.logging.logging import init_logger
 
+from app.helper.clients import client_registry
 from app.schemas.gateway import LLMResponse
 
 # Initialize logger
 logger = init_logger()
 
-# Initialize keys
-try:
-    load_dotenv()
-except ImportError:
-    logger.warning("Tried to load dotenv. Failed. Hopefully running in k8s.")
-ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-
-if ANTHROPIC_API_KEY is None:
-    logger.error('Missing Anthropic API key')
-    raise ValueError("Missing Anthropic API key. Please set ANTHROPIC_API_KEY variable.")
+''' Request Builders '''
 
-if OPENAI_API_KEY is None:
-    logger.error('Missing OpenAI API key')
-    raise ValueError("Missing OpenAI API key. Please set ANTHROPIC_API_KEY variable.")
-
-''' Inference Logic '''
-
-async def inference_anthropic(
+def _anthropic_params(
     model_name: str,
     user_prompt: str,
     system_prompt: str,
     temperature: float,
     max_tokens: int,
-    top_p: float = 1.0,
-    top_k: int = 40,
-    web_search: bool = False
-) -> LLMResponse:
+    top_p: float,
+    top_k: int,
+    web_search: bool
+) -> Dict:
     '''
-    Description: Inference handler for Anthropic models
-
-    Args:
-        model_name: the model we're sending the request to
-        user_prompt: the user prompt we're sending to the LLM
-        system_prompt: the system prompt for the LLM
-        temperature: Variable for randomness, if 0, it'll return the least random answer
-        max_tokens: the max_token input for the LLM
-        top_p: nucleus sampling parameter
-        top_k: top-k sampling parameter
-        web_search: whether to enable web search functionality
+    Description: Build the request parameters for an Anthropic messages call
 
     Returns:
-        llm_response (LLMResponse): Output of the model
+        request_params (Dict): keyword arguments for messages.create / messages.stream
     '''
-    # Initialize Anthropic client
-    anthropic_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-
-    logger.info(f'Starting Anthropic Inference: {model_name}')
-
     # Prepare messages (no system message in the array)
     messages = [{
         'role': 'user',
@@ -97,48 +61,23 @@ async def inference_anthropic(
         ]
         logger.info(f'Web search enabled for Anthropic model: {model_name}')
 
-    # Send Anthropic Request
-    response_chat_completions = anthropic_client.messages.create(**request_params)
-
-    llm_response = LLMResponse(
-        response=response_chat_completions.content[0].text
-    )
-
-    logger.info(f'Successful Anthropic Inference: {model_name}')
+    return request_params
 
-    return llm_response
-
-async def inference_openai(
+def _openai_params(
     model_name: str,
     user_prompt: str,
     system_prompt: str,
     temperature: float,
     max_tokens: int,
-    top_p: float = 1.0,
-    top_k: int = 40,
-    web_search: bool = False
-) -> LLMResponse:
+    top_p: float,
+    web_search: bool
+) -> Dict:
     '''
-    Description: Inference handler for OpenAI models
-
-    Args:
-        model_name: the model we're sending the request to
-        user_prompt: the user prompt we're sending to the LLM
-        system_prompt: the system prompt for the LLM
-        temperature: Variable for randomness, if 0, it'll return the least random answer
-        max_tokens: the max_token input for the LLM
-        top_p: nucleus sampling parameter
-        top_k: top-k sampling parameter
-        web_search: whether to enable web search functionality
+    Description: Build the request parameters for an OpenAI chat completions call
 
     Returns:
-        llm_response (LLMResponse): Output of the model
+        request_params (Dict): keyword arguments for chat.completions.create
     '''
-    logger.info(f"Starting OpenAI Inference: {model_name}")
-
-    # Initialize openai client
-    client = OpenAI(api_key=OPENAI_API_KEY)
-
     # Prepare messages with system prompt if provided
     messages = []
     if system_prompt:
@@ -151,14 +90,13 @@ async def inference_openai(
         'content': user_prompt
     })
 
-    # Prepare request parameters
+    # Prepare request parameters (chat completions has no top_k)
     request_params = {
         'model': model_name,
         'messages': messages,
         'temperature': temperature,
         'max_tokens': max_tokens,
-        'top_p': top_p,
-        'top_k': top_k
+        'top_p': top_p
     }
 
     if web_search:
@@ -169,14 +107,120 @@ async def inference_openai(
         ]
         logger.info(f'Web search enabled for OpenAI model: {model_name}')
 
+    return request_params
+
+def _ollama_params(
+    model_name: str,
+    user_prompt: str,
+    system_prompt: str,
+    temperature: float,
+    max_tokens: int,
+    top_p: float,
+    top_k: int
+) -> Dict:
+    '''
+    Description: Build the request parameters for an Ollama generate call
+
+    Returns:
+        request_params (Dict): keyword arguments for generate
+    '''
+    # Combine system and user prompts if system prompt is provided
+    full_prompt = user_prompt
+    if system_prompt:
+        full_prompt = f"{system_prompt}\n\n{user_prompt}"
+
+    return {
+        'model': model_name,
+        'prompt': full_prompt,
+        'options': {
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'top_p': top_p,
+            'top_k': top_k
+        }
+    }
+
+''' Inference Logic '''
+
+async def inference_anthropic(
+    model_name: str,
+    user_prompt: str,
+    system_prompt: str,
+    temperature: float,
+    max_tokens: int,
+    top_p: float = 1.0,
+    top_k: int = 40,
+    web_search: bool = False
+) -> LLMResponse:
+    '''
+    Description: Inference handler for Anthropic models
+
+    Args:
+        model_name: the model we're sending the request to
+        user_prompt: the user prompt we're sending to the LLM
+        system_prompt: the system prompt for the LLM
+        temperature: Variable for randomness, if 0, it'll return the least random answer
+        max_tokens: the max_token input for the LLM
+        top_p: nucleus sampling parameter
+        top_k: top-k sampling parameter
+        web_search: whether to enable web search functionality
+
+    Returns:
+        llm_response (LLMResponse): Output of the model
+    '''
+    logger.info(f'Starting Anthropic Inference: {model_name}')
+
+    request_params = _anthropic_params(
+        model_name, user_prompt, system_prompt, temperature, max_tokens, top_p, top_k, web_search
+    )
+
+    # Send Anthropic Request
+    response_chat_completions = await client_registry.anthropic.messages.create(**request_params)
+
+    llm_response = LLMResponse(
+        response=response_chat_completions.content[0].text
+    )
+
+    logger.info(f'Successful Anthropic Inference: {model_name}')
+
+    return llm_response
+
+async def inference_openai(
+    model_name: str,
+    user_prompt: str,
+    system_prompt: str,
+    temperature: float,
+    max_tokens: int,
+    top_p: float = 1.0,
+    web_search: bool = False
+) -> LLMResponse:
+    '''
+    Description: Inference handler for OpenAI models
+
+    Args:
+        model_name: the model we're sending the request to
+        user_prompt: the user prompt we're sending to the LLM
+        system_prompt: the system prompt for the LLM
+        temperature: Variable for randomness, if 0, it'll return the least random answer
+        max_tokens: the max_token input for the LLM
+        top_p: nucleus sampling parameter
+        web_search: whether to enable web search functionality
+
+    Returns:
+        llm_response (LLMResponse): Output of the model
+    '''
+    logger.info(f"Starting OpenAI Inference: {model_name}")
+
+    request_params = _openai_params(
+        model_name, user_prompt, system_prompt, temperature, max_tokens, top_p, web_search
+    )
+
     # send request to openai
-    response_chat_completions = client.chat.completions.create(**request_params)
+    response_chat_completions = await client_registry.openai.chat.completions.create(**request_params)
 
     logger.info(f"Successfully recieved response from: {model_name}")
 
-    resp = response_chat_completions.model_dump_json()
-    resp = json.loads(resp)
-    resp = resp['choices'][0]['message']['content']
+    resp = response_chat_completions.choices[0].message.content
 
     logger.info(f"Returning response for {model_name}")
 
@@ -208,22 +252,98 @@ async def inference_ollama(
     '''
     logger.info(f'Starting Ollama Inference: {model_name}')
 
-    # Combine system and user prompts if system prompt is provided
-    full_prompt = user_prompt
-    if system_prompt:
-        full_prompt = f"{system_prompt}\n\n{user_prompt}"
+    request_params = _ollama_params(
+        model_name, user_prompt, system_prompt, temperature, max_tokens, top_p, top_k
+    )
 
-    response = ollama.generate(
-            model=model_name, 
-            prompt=full_prompt,
-            options = {
-                'temperature': temperature,
-                'max_tokens': max_tokens,
-                'top_p': top_p,
-                'top_k': top_k
-            }
-        )
+    response = await client_registry.ollama.generate(**request_params)
 
     logger.info(f'Ollama inference completed: {model_name}')
 
     return LLMResponse(response=response['response'])
+
+''' Streaming Inference Logic '''
+
+async def stream_anthropic(
+    model_name: str,
+    user_prompt: str,
+    system_prompt: str,
+    temperature: float,
+    max_tokens: int,
+    top_p: float = 1.0,
+    top_k: int = 40,
+    web_search: bool = False
+) -> AsyncIterator[str]:
+    '''
+    Description: Streaming inference handler for Anthropic models. Same args as inference_anthropic.
+
+    Yields:
+        delta (str): text delta as soon as Anthropic emits it
+    '''
+    logger.info(f'Starting Anthropic streaming inference: {model_name}')
+
+    request_params = _anthropic_params(
+        model_name, user_prompt, system_prompt, temperature, max_tokens, top_p, top_k, web_search
+    )
+
+    async with client_registry.anthropic.messages.stream(**request_params) as stream:
+        async for text in stream.text_stream:
+            yield text
+
+    logger.info(f'Successful Anthropic streaming inference: {model_name}')
+
+async def stream_openai(
+    model_name: str,
+    user_prompt: str,
+    system_prompt: str,
+    temperature: float,
+    max_tokens: int,
+    top_p: float = 1.0,
+    web_search: bool = False
+) -> AsyncIterator[str]:
+    '''
+    Description: Streaming inference handler for OpenAI models. Same args as inference_openai.
+
+    Yields:
+        delta (str): text delta as soon as OpenAI emits it
+    '''
+    logger.info(f"Starting OpenAI streaming inference: {model_name}")
+
+    request_params = _openai_params(
+        model_name, user_prompt, system_prompt, temperature, max_tokens, top_p, web_search
+    )
+
+    stream = await client_registry.openai.chat.completions.create(**request_params, stream=True)
+    async for chunk in stream:
+        # Role and finish chunks carry no content
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+    logger.info(f"Successful OpenAI streaming inference: {model_name}")
+
+async def stream_ollama(
+    model_name: str,
+    user_prompt: str,
+    system_prompt: str,
+    temperature: float,
+    max_tokens: int,
+    top_p: float = 1.0,
+    top_k: int = 40
+) -> AsyncIterator[str]:
+    '''
+    Description: Streaming inference handler for Ollama models. Same args as inference_ollama.
+
+    Yields:
+        delta (str): text delta as soon as Ollama emits it
+    '''
+    logger.info(f'Starting Ollama streaming inference: {model_name}')
+
+    request_params = _ollama_params(
+        model_name, user_prompt, system_prompt, temperature, max_tokens, top_p, top_k
+    )
+
+    async for part in await client_registry.ollama.generate(**request_params, stream=True):
+        if part.get('response'):
+            yield part['response']
+
+    logger.info(f'Ollama streaming inference completed: {model_name}')
@@ -1,15 +1,28 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from python_utils.logging.logging import init_logger
 
 from app.api.v1.router import api_router
+from app.helper.cache import embedding_cache, response_cache
+from app.helper.clients import client_registry
 
 # Initialize loger
 logger = init_logger()
 
 logger.info('Starting application...')
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open pooled vendor clients once and reuse them for every request
+    await client_registry.start()
+    yield
+    await client_registry.close()
+    await response_cache.close()
+    await embedding_cache.close()
+
 # Intialize FastAPI
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Connect routers to main application
 app.include_router(api_router, prefix="/v1")
@@ -1,8 +1,8 @@
 ''' Gateway Configurations '''
 
 import yaml
-from pydantic import BaseModel
-from typing import Dict, Optional
+from pydantic import BaseModel, field_validator
+from typing import Dict, List, Optional, Union
 from python_utils.logging.logging import init_logger
 
 # Initialize logger
@@ -12,9 +12,66 @@ class LLMModels(BaseModel):
     vendor: str
     enabled: bool
 
+class HTTPPoolConfig(BaseModel):
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 120.0
+
+class SLMPoolConfig(HTTPPoolConfig):
+    http2: bool = False
+    read_timeout: float = 30.0
+    batch_size: int = 16
+    max_concurrent_batches: int = 4
+
+class ResponseCacheConfig(BaseModel):
+    enabled: bool = True
+    deterministic_only: bool = True
+    max_entries: int = 1024
+    default_ttl: int = 3600
+    model_ttls: Dict[str, int] = {}
+    redis_url: Optional[str] = None
+
+class EmbeddingCacheConfig(BaseModel):
+    enabled: bool = True
+    max_entries: int = 100000
+    max_bytes: int = 268435456
+    ttl: int = 2592000
+    redis_url: Optional[str] = None
+
+class EmbeddingBatchConfig(BaseModel):
+    max_items: int = 2048
+    max_tokens: int = 250000
+    chars_per_token: float = 3.0
+    max_concurrency: int = 4
+    max_retries: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 20.0
+
+class MicroBatchConfig(BaseModel):
+    enabled: bool = False
+    max_wait_ms: float = 5.0
+    max_batch: int = 64
+
 class GatewayConfig(BaseModel):
-    slm_models: Dict[str, str]
+    slm_models: Dict[str, Union[str, List[str]]]
     llm_models: Dict[str, LLMModels]
+    http_pool: HTTPPoolConfig = HTTPPoolConfig()
+    slm_pool: SLMPoolConfig = SLMPoolConfig()
+    response_cache: ResponseCacheConfig = ResponseCacheConfig()
+    embedding_cache: EmbeddingCacheConfig = EmbeddingCacheConfig()
+    embedding_batching: EmbeddingBatchConfig = EmbeddingBatchConfig()
+    micro_batching: MicroBatchConfig = MicroBatchConfig()
+
+    @field_validator('slm_models')
+    @classmethod
+    def require_replicas(cls, slm_models: Dict[str, Union[str, List[str]]]) -> Dict[str, Union[str, List[str]]]:
+        # A model with no replica can't be routed, fail at startup rather than on the first request
+        for model_name, replicas in slm_models.items():
+            if not replicas:
+                raise ValueError(f'SLM model {model_name} has no replicas')
+        return slm_models
 
     @classmethod
     def from_yaml(cls, file: str) -> 'GatewayConfig':
@@ -5,7 +5,7 @@ Mainly contains the Request/Response schemas
 '''
 
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 
 class GatewayRequest(BaseModel):
     model_name: str
@@ -20,6 +20,11 @@ class GatewayRequest(BaseModel):
 class LLMResponse(BaseModel):
     response: str
 
+class LLMStreamDelta(BaseModel):
+    delta: str = ""
+    done: bool = False
+    error: Optional[str] = None
+
 class EmbeddingRequest(BaseModel):
     text: str
     model_name: str
@@ -32,4 +37,23 @@ class BatchEmbeddingRequest(BaseModel):
     model_name: str
 
 class BatchEmbeddingResponse(BaseModel):
-    embeddings: List[List[float]]
\ No newline at end of file
+    embeddings: List[List[float]]
+
+class EncodedEmbeddingResponse(BaseModel):
+    data: str
+    shape: List[int]
+    dtype: str
+
+class SLMBatchRequest(BaseModel):
+    model_name: str
+    prompts: List[str]
+
+class SLMBatchItem(BaseModel):
+    index: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class SLMBatchResponse(BaseModel):
+    results: List[SLMBatchItem]
+    succeeded: int
+    failed: int
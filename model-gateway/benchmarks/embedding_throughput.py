@@ -0,0 +1,53 @@
+'''
+Throughput benchmark for large embedding batches
+
+Embeds N synthetic texts through embed_texts against a fake upstream whose
+latency grows with sub-batch size, for several concurrency limits.
+
+Usage (from the model-gateway directory):
+    PYTHONPATH=. python benchmarks/embedding_throughput.py --texts 10000
+'''
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault('ANTHROPIC_API_KEY', 'benchmark')
+os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+
+from app import gateway_config
+from app.helper.clients import client_registry
+from app.helper.embedding import embed_texts, split_batches
+from fake_upstream import fake_upstream
+
+async def main(n_texts: int, levels: list, latency: float, per_item_latency: float):
+    await client_registry.start(transport=fake_upstream(latency, per_item_latency))
+
+    texts = [f'Row {i} | campsite | reservation notes for site {i % 97}' * 3 for i in range(n_texts)]
+
+    try:
+        print(f'texts={n_texts} sub-batches={len(split_batches(texts, gateway_config.embedding_batching))}')
+        print(f'{"concurrency":>12} {"seconds":>10} {"texts/s":>10}')
+
+        for concurrency in levels:
+            batch_config = gateway_config.embedding_batching.model_copy(update={'max_concurrency': concurrency})
+
+            start = time.perf_counter()
+            vectors = await embed_texts(texts, 'text-embedding-3-small', batch_config)
+            elapsed = time.perf_counter() - start
+
+            assert len(vectors) == n_texts
+            print(f'{concurrency:>12} {elapsed:>10.2f} {n_texts / elapsed:>10.0f}')
+    finally:
+        await client_registry.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Embedding fan-out throughput against a fake upstream')
+    parser.add_argument('--texts', type=int, default=10000)
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--latency', type=float, default=0.3)
+    parser.add_argument('--per-item-latency', type=float, default=0.0005)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.texts, args.levels, args.latency, args.per_item_latency))
@@ -0,0 +1,74 @@
+'''
+Serialization benchmark for batch embedding responses
+
+Compares the JSON BatchEmbeddingResponse against the base64 and raw binary
+formats (float32 and float16): payload size, gateway-side encode time and
+client-side decode time into a NumPy matrix.
+
+Usage (from the model-gateway directory):
+    PYTHONPATH=. python benchmarks/embedding_wire_format.py --rows 1000 --dimensions 1536
+'''
+
+import argparse
+import base64
+import time
+
+import numpy as np
+
+from app.schemas.gateway import BatchEmbeddingResponse, EncodedEmbeddingResponse
+
+def timed(func, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+def main(rows: int, dimensions: int, repeat: int):
+    rng = np.random.default_rng(0)
+    vectors = list(rng.standard_normal((rows, dimensions), dtype=np.float32))
+
+    print(f'rows={rows} dimensions={dimensions}')
+    print(f'{"format":>16} {"bytes":>12} {"encode ms":>10} {"decode ms":>10}')
+
+    # JSON lists of floats, validated by pydantic on both sides
+    payload, encode_ms = timed(
+        lambda: BatchEmbeddingResponse(embeddings=[v.tolist() for v in vectors]).model_dump_json(),
+        repeat
+    )
+    _, decode_ms = timed(
+        lambda: np.asarray(BatchEmbeddingResponse.model_validate_json(payload).embeddings, dtype=np.float32),
+        repeat
+    )
+    print(f'{"json":>16} {len(payload):>12} {encode_ms:>10.2f} {decode_ms:>10.2f}')
+
+    for dtype, numpy_dtype in (('float32', '<f4'), ('float16', '<f2')):
+        # Base64 inside a small JSON envelope
+        payload, encode_ms = timed(
+            lambda: EncodedEmbeddingResponse(
+                data=base64.b64encode(np.vstack(vectors).astype(numpy_dtype).tobytes()).decode('ascii'),
+                shape=[rows, dimensions],
+                dtype=dtype
+            ).model_dump_json(),
+            repeat
+        )
+        _, decode_ms = timed(
+            lambda: np.frombuffer(
+                base64.b64decode(EncodedEmbeddingResponse.model_validate_json(payload).data), dtype=numpy_dtype
+            ).reshape(rows, dimensions),
+            repeat
+        )
+        print(f'{"base64-" + dtype:>16} {len(payload):>12} {encode_ms:>10.2f} {decode_ms:>10.2f}')
+
+        # Raw little-endian buffer, shape travels in headers
+        payload, encode_ms = timed(lambda: np.vstack(vectors).astype(numpy_dtype).tobytes(), repeat)
+        _, decode_ms = timed(lambda: np.frombuffer(payload, dtype=numpy_dtype).reshape(rows, dimensions), repeat)
+        print(f'{"binary-" + dtype:>16} {len(payload):>12} {encode_ms:>10.2f} {decode_ms:>10.2f}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare embedding response wire formats')
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--dimensions', type=int, default=1536)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    main(args.rows, args.dimensions, args.repeat)
@@ -0,0 +1,91 @@
+'''
+Fake vendor upstream for offline benchmarks
+
+Answers Anthropic, OpenAI (chat + embeddings), Ollama and SLM calls after an
+async delay, so the gateway can be measured without network or API keys.
+'''
+
+import asyncio
+import base64
+import json
+
+import httpx
+import numpy as np
+
+def fake_upstream(latency: float, per_item_latency: float = 0.0, dimensions: int = 1536) -> httpx.MockTransport:
+    '''
+    Description: Build a transport that mimics Anthropic, OpenAI, Ollama and SLM responses
+
+    Args:
+        latency: seconds each upstream call takes
+        per_item_latency: extra seconds per input on embedding calls
+        dimensions: size of fake embedding vectors
+
+    Returns:
+        transport (httpx.MockTransport): fake vendor transport
+    '''
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        path = request.url.path
+
+        if path.endswith('/messages'):
+            return httpx.Response(200, json={
+                'id': 'msg_load_test',
+                'type': 'message',
+                'role': 'assistant',
+                'model': 'load-test',
+                'content': [{'type': 'text', 'text': 'ok'}],
+                'stop_reason': 'end_turn',
+                'stop_sequence': None,
+                'usage': {'input_tokens': 1, 'output_tokens': 1}
+            })
+
+        if path.endswith('/chat/completions'):
+            return httpx.Response(200, json={
+                'id': 'chatcmpl_load_test',
+                'object': 'chat.completion',
+                'created': 0,
+                'model': 'load-test',
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': 'ok'},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2}
+            })
+
+        if path.endswith('/api/generate'):
+            return httpx.Response(200, json={
+                'model': 'load-test',
+                'created_at': '1970-01-01T00:00:00Z',
+                'response': 'ok',
+                'done': True
+            })
+
+        if path.endswith('/embeddings'):
+            body = json.loads(request.content)
+            inputs = body['input'] if isinstance(body['input'], list) else [body['input']]
+            await asyncio.sleep(per_item_latency * len(inputs))
+
+            vector = np.full(dimensions, 0.01, dtype=np.float32)
+            if body.get('encoding_format') == 'base64':
+                embedding = base64.b64encode(vector.tobytes()).decode('ascii')
+            else:
+                embedding = vector.tolist()
+
+            return httpx.Response(200, json={
+                'object': 'list',
+                'model': body['model'],
+                'data': [
+                    {'object': 'embedding', 'index': i, 'embedding': embedding}
+                    for i in range(len(inputs))
+                ],
+                'usage': {'prompt_tokens': len(inputs), 'total_tokens': len(inputs)}
+            })
+
+        if path.endswith('/v1/analyze'):
+            return httpx.Response(200, json={'label': 'positive', 'score': 0.99})
+
+        return httpx.Response(404)
+
+    return httpx.MockTransport(handler)
@@ -0,0 +1,72 @@
+'''
+Load test for /v1/llm/generate
+
+Runs the gateway in-process and points the vendor clients at a fake upstream
+that answers after a fixed (async) delay. If the request path is truly
+non-blocking, throughput grows with concurrency; if anything blocks the event
+loop, requests serialize and throughput stays flat.
+
+Usage (from the model-gateway directory):
+    PYTHONPATH=. python benchmarks/load_test.py --model gpt-4o-mini --latency 0.2
+'''
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+# The gateway refuses to start without keys; the fake upstream ignores them
+os.environ.setdefault('ANTHROPIC_API_KEY', 'load-test')
+os.environ.setdefault('OPENAI_API_KEY', 'load-test')
+
+from app.main import app
+from app.helper.clients import client_registry
+from fake_upstream import fake_upstream
+
+async def run_level(client: httpx.AsyncClient, model_name: str, concurrency: int, requests_per_worker: int) -> float:
+    '''
+    Description: Fire requests from `concurrency` workers and return requests/second
+    '''
+    payload = {'model_name': model_name, 'user_prompt': 'ping'}
+    # Skip the response cache so every request reaches the upstream
+    headers = {'Cache-Control': 'no-cache, no-store'}
+
+    async def worker():
+        for _ in range(requests_per_worker):
+            response = await client.post('/v1/llm/generate', json=payload, headers=headers)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return (concurrency * requests_per_worker) / elapsed
+
+async def main(model_name: str, latency: float, levels: list, requests_per_worker: int):
+    await client_registry.start(transport=fake_upstream(latency))
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://gateway', timeout=None) as client:
+            print(f'model={model_name} upstream_latency={latency}s')
+            print(f'{"concurrency":>12} {"req/s":>10} {"speedup":>8}')
+
+            baseline = None
+            for concurrency in levels:
+                throughput = await run_level(client, model_name, concurrency, requests_per_worker)
+                baseline = baseline or throughput
+                print(f'{concurrency:>12} {throughput:>10.1f} {throughput / baseline:>7.1f}x')
+    finally:
+        await client_registry.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Concurrent /generate load test against a fake upstream')
+    parser.add_argument('--model', default='gpt-4o-mini')
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--requests-per-worker', type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.model, args.latency, args.levels, args.requests_per_worker))
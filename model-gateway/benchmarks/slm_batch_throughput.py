@@ -0,0 +1,59 @@
+'''
+Throughput benchmark for /v1/slm/predict/batch
+
+Scores N prompts once through repeated single-item /predict calls (one
+client, one request at a time, like a naive script) and once through a
+single /predict/batch call, against a fake SLM with fixed latency.
+
+Usage (from the model-gateway directory):
+    PYTHONPATH=. python benchmarks/slm_batch_throughput.py --prompts 500
+'''
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+os.environ.setdefault('ANTHROPIC_API_KEY', 'benchmark')
+os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+
+from app.main import app
+from app.helper.clients import client_registry
+from fake_upstream import fake_upstream
+
+async def main(model_name: str, n_prompts: int, latency: float):
+    await client_registry.start(transport=fake_upstream(latency))
+    prompts = [f'review {i}: the campsite was great' for i in range(n_prompts)]
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://gateway', timeout=None) as client:
+            start = time.perf_counter()
+            for prompt in prompts:
+                response = await client.post('/v1/slm/predict', json={'model_name': model_name, 'user_prompt': prompt})
+                response.raise_for_status()
+            single_elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            response = await client.post('/v1/slm/predict/batch', json={'model_name': model_name, 'prompts': prompts})
+            response.raise_for_status()
+            batch_elapsed = time.perf_counter() - start
+
+            print(f'prompts={n_prompts} upstream_latency={latency}s')
+            print(f'{"path":>10} {"seconds":>10} {"prompts/s":>10}')
+            print(f'{"single":>10} {single_elapsed:>10.2f} {n_prompts / single_elapsed:>10.1f}')
+            print(f'{"batch":>10} {batch_elapsed:>10.2f} {n_prompts / batch_elapsed:>10.1f}')
+            print(f'failed items in batch: {response.json()["failed"]}')
+    finally:
+        await client_registry.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Single vs batch SLM prediction throughput against a fake upstream')
+    parser.add_argument('--model', default='roberta_sentiment')
+    parser.add_argument('--prompts', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.model, args.prompts, args.latency))
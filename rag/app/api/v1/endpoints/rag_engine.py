@@ -2,86 +2,77 @@
 RAG Engine API
 '''
 
-import httpx
 from fastapi import APIRouter, HTTPException
 from python_utils.logging.logging import init_logger
 
-from app.paths import SERVICE_CONFIG_PATH
-from app.modules.google_integration import read_google_sheets
+from app.modules.io_pool import pinecone_io
 from app.modules.pinecone import PineconeManager
+from app.modules.sync_jobs import SyncJobRunner
+from app.paths import SERVICE_CONFIG_PATH
 from app.schemas.config import ServiceConfig
 
 # Initialize logger and FastAPI
 logger = init_logger()
 router = APIRouter()
 
-# Initialize RAG configs
-embedding_config = ServiceConfig.from_yaml(SERVICE_CONFIG_PATH).embedding
-EMBEDDING_GATEWAY = embedding_config.model_gateway
-EMBEDDING_MODEL = embedding_config.model_name
-
 # Initialize Pinecone manager
-pinecone_manager = PineconeManager()
+service_config = ServiceConfig.from_yaml(SERVICE_CONFIG_PATH)
+pinecone_manager = PineconeManager(
+    local_index=service_config.local_index,
+    inventory=service_config.inventory,
+    sync=service_config.sync,
+    upload=service_config.upload,
+    executor=pinecone_io.executor
+)
+
+# Background sync worker, started with the application
+sync_job_runner = SyncJobRunner(pinecone_manager, service_config)
 
 ''' API Endpoints'''
-@router.post("/sync")
-async def sync_data():
+@router.post("/sync", status_code=202)
+async def sync_data(force: bool = False):
     '''
-    Description: Sync data from Google Sheets to Vectorized DB
+    Description: Queue a sync from Google Sheets to Vectorized DB and return at once. The job
+    returns after one Drive metadata call when the spreadsheet's revision hasn't changed; otherwise
+    sheets are streamed through read -> embed -> upsert and only new, changed and removed rows
+    touch the index. Calls made while a sync is already queued join that job.
 
     Args:
-        None # think about adding spreadsheet id then remove google_sheet config
+        force (bool): ignore the revision check and re-embed every row
     
     Returns:
-        TODO
+        job (Dict): job id and status, poll /sync/{job_id} for progress
     '''
-    # Connect to Google Sheets
-    google_sheets_data = await read_google_sheets()
+    job, coalesced = sync_job_runner.submit(force=force)
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "coalesced": coalesced
+    }
 
-    # TODO: Vectorize / Embed the Google Sheets data
-    all_embedded_data = []
-    
-    try:
-        async with httpx.AsyncClient() as client:
-            # Extract all texts from Google Sheets data
-            texts = [row.content for row in google_sheets_data.sheet_data]
-            
-            # Make a single batch request instead of individual requests
-            batch_embedding_request = {
-                "texts": texts,
-                "model_name": EMBEDDING_MODEL
-            }
+@router.get("/sync/{job_id}")
+async def sync_status(job_id: str):
+    '''
+    Description: Status of a sync job
 
-            embedding_response = await client.post(
-                url=f"{EMBEDDING_GATEWAY}/embeddings/batch",
-                json=batch_embedding_request
-            )
-            embedding_response.raise_for_status()
-            
-            # Get all embeddings from the batch response
-            batch_response = embedding_response.json()
-            all_embedded_data = batch_response["embeddings"]
-    
-    except Exception as e:
-        logger.error(f"Error embedding data: {e}")
-        raise HTTPException(status_code=500, detail="Error embedding request")
+    Args:
+        job_id (str): id returned by /sync
 
-    # Sync data to Pinecone DB
-    try:
-        sync_result = pinecone_manager.sync_data(google_sheets_data.sheet_data, all_embedded_data)
-        new_count = sync_result["new_vectors"]
-        update_count = sync_result["updated_vectors"]
-        total_vectors = sync_result["total_vectors"]
-        
-        logger.info(f"Successfully synced to Pinecone: {new_count} new vectors, {update_count} updated vectors")
-        
-    except Exception as e:
-        logger.error(f"Error uploading to Pinecone: {e}")
-        raise HTTPException(status_code=500, detail="Error uploading to Pinecone")
+    Returns:
+        job (Dict): status, message or error, row counts per stage and seconds spent per stage
+    '''
+    job = sync_job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown sync job: {job_id}")
 
     return {
-        "message": f"Successfully synced {len(google_sheets_data.sheet_data)} documents to Pinecone",
-        "new_vectors": new_count,
-        "updated_vectors": update_count,
-        "total_vectors": total_vectors
-    }
\ No newline at end of file
+        **job.model_dump(),
+        "elapsed_seconds": sync_job_runner.elapsed_seconds(job)
+    }
+
+@router.get("/inventory")
+async def inventory_stats():
+    '''
+    Description: Size, source and age of the cached vector inventory
+    '''
+    return pinecone_manager.inventory.snapshot()
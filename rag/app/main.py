@@ -1,16 +1,33 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from python_utils.logging.logging import init_logger
 
+from app.api.v1.endpoints.rag_engine import sync_job_runner
 from app.api.v1.router import api_router
+from app.modules.io_pool import google_io, pinecone_io
 
 # Initialize logger
 logger = init_logger()
 
 logger.info("Starting RAG Engine")
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync worker and scheduler live as long as the application
+    sync_job_runner.start()
+    yield
+    await sync_job_runner.close()
+    google_io.shutdown()
+    pinecone_io.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 # Connect routers to main application
 app.include_router(api_router, prefix="/v1")
 
+@app.get("/ready")
+async def ready():
+    return {"Ready": True}
+
 logger.info("RAG Engine started")
\ No newline at end of file
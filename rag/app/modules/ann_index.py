@@ -0,0 +1,114 @@
+'''
+IVF Index Builder
+
+Partitions normalized vectors into inverted lists with spherical k-means so
+the agent only has to score the few lists closest to a query. The local index
+rows are written grouped by list, so a list is a contiguous slice of
+vectors.npy and the index itself is just:
+    ivf_centroids.npy   (n_lists, dimensions) float32, rows L2-normalized
+    ivf_offsets.npy     (n_lists + 1,) int64, list i is rows offsets[i]:offsets[i + 1]
+'''
+
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+from python_utils.logging.logging import init_logger
+
+# Initialize logger
+logger = init_logger()
+
+# Assignment is done in chunks to bound the (chunk, n_lists) score matrix
+ASSIGN_CHUNK = 8192
+
+def default_n_lists(n_vectors: int) -> int:
+    '''
+    Description: Rule of thumb of ~sqrt(n) lists, so each list holds ~sqrt(n) vectors
+    '''
+    return max(1, int(round(math.sqrt(n_vectors))))
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    '''
+    Description: Assign each vector to its most similar centroid
+
+    Args:
+        vectors (np.ndarray): (n_vectors, dimensions) normalized vectors
+        centroids (np.ndarray): (n_lists, dimensions) normalized centroids
+
+    Returns:
+        assignments (np.ndarray): (n_vectors,) list number per vector
+    '''
+    assignments = np.empty(vectors.shape[0], dtype=np.int64)
+    for start in range(0, vectors.shape[0], ASSIGN_CHUNK):
+        chunk = vectors[start:start + ASSIGN_CHUNK]
+        assignments[start:start + ASSIGN_CHUNK] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+def train_ivf(
+    vectors: np.ndarray,
+    n_lists: Optional[int] = None,
+    iterations: int = 20,
+    sample_size: int = 65536,
+    seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Description: Spherical k-means over the vectors
+
+    Args:
+        vectors (np.ndarray): (n_vectors, dimensions) normalized float32 vectors
+        n_lists (int): number of inverted lists, defaults to ~sqrt(n_vectors)
+        iterations (int): k-means iterations
+        sample_size (int): centroids are trained on at most this many vectors
+        seed (int): seed for the sample and initial centroids
+
+    Returns:
+        (centroids, assignments) (Tuple[np.ndarray, np.ndarray]): normalized centroids and the list of every vector
+    '''
+    n_vectors = vectors.shape[0]
+    n_lists = min(n_lists or default_n_lists(n_vectors), n_vectors)
+    rng = np.random.default_rng(seed)
+
+    sample = vectors
+    if n_vectors > sample_size:
+        sample = vectors[np.sort(rng.choice(n_vectors, sample_size, replace=False))]
+
+    centroids = sample[rng.choice(sample.shape[0], n_lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = assign_lists(sample, centroids)
+
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        counts = np.bincount(assignments, minlength=n_lists)
+
+        # Re-seed empty lists with random sample points so no list is wasted
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(sample.shape[0], int(empty.sum()), replace=False)]
+
+        centroids = _normalize(sums).astype(np.float32)
+
+    assignments = assign_lists(vectors, centroids)
+    logger.info(f"Trained IVF index: {n_lists} lists over {n_vectors} vectors")
+
+    return centroids, assignments
+
+def list_offsets(assignments: np.ndarray, n_lists: int) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Description: Order rows by list and compute where each list starts
+
+    Args:
+        assignments (np.ndarray): (n_vectors,) list number per vector
+        n_lists (int): number of lists
+
+    Returns:
+        (order, offsets) (Tuple[np.ndarray, np.ndarray]): row permutation grouping lists, and list boundaries
+    '''
+    order = np.argsort(assignments, kind="stable")
+    offsets = np.zeros(n_lists + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assignments, minlength=n_lists), out=offsets[1:])
+    return order, offsets
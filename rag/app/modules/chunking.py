@@ -0,0 +1,226 @@
+'''
+Row-Aware Chunking
+
+Turns streamed sheet rows into the texts that get embedded. A row becomes
+"column: value" lines labelled from the sheet's header row, so a vector
+carries the column names as well as the values. Long rows (itineraries,
+packing lists) are split by token budget with overlap, and the first
+context_columns lines are repeated in every part so each part still says
+what it belongs to; a part that starts inside a column also repeats that
+column's label. Runs of tiny consecutive rows are merged into one chunk.
+Every chunk records its parent row(s), so the agent can fetch sibling parts
+with a metadata filter on "parent".
+
+Chunk ids are content addressed (see sync_manifest.chunk_vector_id). A
+chunk whose rows didn't change keeps its id and isn't re-embedded, and a
+changed row re-embeds exactly the chunks it appears in.
+
+The manifest also stores chunking_fingerprint, so a sync after a chunking
+config change (or a bump of CHUNKER_VERSION) isn't skipped by the revision
+check even though the spreadsheet itself is unchanged.
+'''
+
+import hashlib
+import math
+import re
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from app.modules.sync_manifest import chunk_vector_id, vector_id
+from app.schemas.config import ChunkingConfig
+from app.schemas.google_sheets import SheetRow
+
+# (row position in the spreadsheet, row)
+IndexedRow = Tuple[int, SheetRow]
+
+WORD_PATTERN = re.compile(r"\S+\s*")
+
+# Bump whenever the same rows and config would produce different chunk texts
+CHUNKER_VERSION = 2
+
+class Chunk(NamedTuple):
+    vector_id: str
+    text: str
+    sheet_name: str
+    row_index: int
+    row_numbers: Tuple[int, ...]
+    part: int = 1
+    parts: int = 1
+
+    @property
+    def parent(self) -> str:
+        first, last = self.row_numbers[0], self.row_numbers[-1]
+        return f"{self.sheet_name}!{first}" if first == last else f"{self.sheet_name}!{first}-{last}"
+
+def estimate_tokens(text: str, chars_per_token: float) -> int:
+    '''
+    Description: Cheap token estimate from the character count, no tokenizer dependency
+    '''
+    return max(1, math.ceil(len(text) / chars_per_token))
+
+def chunking_fingerprint(chunking_config: ChunkingConfig) -> str:
+    '''
+    Description: Hash of the chunker version and config, recorded with each sync
+    '''
+    key = f"{CHUNKER_VERSION}\x1f{chunking_config.model_dump_json()}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+def format_cells(header: Sequence[str], cells: Sequence[str]) -> List[str]:
+    '''
+    Description: One "column: value" line per non-empty cell, unnamed columns are labelled by position
+
+    Args:
+        header (Sequence[str]): the sheet's header row, may be shorter than cells or empty
+        cells (Sequence[str]): the row's cells
+
+    Returns:
+        lines (List[str]): formatted lines in column order
+    '''
+    lines = []
+    for column, value in enumerate(cells):
+        value = value.strip()
+        if not value:
+            continue
+        label = header[column].strip() if column < len(header) else ""
+        lines.append(f"{label or f'Column {column + 1}'}: {value}")
+    return lines
+
+class RowChunker:
+    def __init__(self, chunking_config: ChunkingConfig, spreadsheet_id: str):
+        self.config = chunking_config
+        self.spreadsheet_id = spreadsheet_id
+        self.headers: Dict[str, Tuple[str, ...]] = {}
+
+    def _tokens(self, text: str) -> int:
+        return estimate_tokens(text, self.config.chars_per_token)
+
+    def chunk_page(self, rows: List[IndexedRow]) -> List[Chunk]:
+        '''
+        Description: Chunk one page of rows. Pages come from a single sheet, in row order, and merges never
+        cross a page, so the same rows always produce the same chunks.
+
+        Args:
+            rows (List[IndexedRow]): (position, row) pairs of one page
+
+        Returns:
+            chunks (List[Chunk]): chunks in row order, the header row and empty rows produce none
+        '''
+        if not self.config.enabled:
+            # One chunk per row with the row's own id, the pre-chunking behaviour
+            return [
+                Chunk(vector_id(self.spreadsheet_id, row), row.content, row.sheet_name, position, (row.row_number,))
+                for position, row in rows
+            ]
+
+        chunks: List[Chunk] = []
+        merging: List[Tuple[int, SheetRow, str]] = []
+        merged_tokens = 0
+
+        def flush_merged():
+            nonlocal merged_tokens
+            merged_tokens = 0
+            if merging:
+                chunks.append(self._chunk(
+                    "\n\n".join(text for _, _, text in merging),
+                    merging[0][1].sheet_name,
+                    merging[0][0],
+                    tuple(row.row_number for _, row, _ in merging)
+                ))
+                merging.clear()
+
+        for position, row in rows:
+            if self.config.header_row and row.row_number == 1:
+                self.headers[row.sheet_name] = row.cells
+                continue
+
+            lines = format_cells(self.headers.get(row.sheet_name, ()), row.cells or (row.content,))
+            if not lines:
+                continue
+
+            text = "\n".join(lines)
+            tokens = self._tokens(text)
+            if tokens < self.config.min_tokens:
+                # Only merge consecutive rows, so a merged chunk's parent range never claims a row it doesn't hold
+                if merged_tokens + tokens > self.config.max_tokens or (merging and row.row_number != merging[-1][1].row_number + 1):
+                    flush_merged()
+                merging.append((position, row, text))
+                merged_tokens += tokens
+                continue
+
+            flush_merged()
+            if tokens <= self.config.max_tokens:
+                chunks.append(self._chunk(text, row.sheet_name, position, (row.row_number,)))
+            else:
+                chunks.extend(self._split(position, row, lines))
+
+        flush_merged()
+        return chunks
+
+    def _chunk(self, text: str, sheet_name: str, position: int, row_numbers: Tuple[int, ...], part: int = 1, parts: int = 1) -> Chunk:
+        return Chunk(
+            chunk_vector_id(self.spreadsheet_id, sheet_name, row_numbers, part, text),
+            text,
+            sheet_name,
+            position,
+            row_numbers,
+            part,
+            parts
+        )
+
+    def _split(self, position: int, row: SheetRow, lines: List[str]) -> List[Chunk]:
+        '''
+        Description: Split a long row into overlapping parts of at most max_tokens, each starting with the row's
+        context lines, and with the column's label when the part starts partway through a column
+        '''
+        context, body = lines[:self.config.context_columns], lines[self.config.context_columns:]
+        if not body:
+            context, body = [], lines
+        prefix = "\n".join(context)
+        labels = [line.split(": ", 1)[0] + ": " for line in body]
+
+        # Leave room for the longest label a continuation part may have to repeat
+        budget_tokens = self.config.max_tokens - (self._tokens(prefix) if prefix else 0)
+        budget_chars = max(
+            budget_tokens * self.config.chars_per_token - max(len(label) for label in labels),
+            (2 * self.config.overlap_tokens + 1) * self.config.chars_per_token
+        )
+        overlap_chars = self.config.overlap_tokens * self.config.chars_per_token
+
+        # (word, body line) pairs. Words keep their trailing whitespace, so joining restores the line breaks
+        words = [(word, line) for line, text in enumerate(body) for word in WORD_PATTERN.findall(text + "\n")]
+        texts = []
+        start = 0
+        while start < len(words):
+            end, size = start, 0
+            while end < len(words) and (end == start or size + len(words[end][0]) <= budget_chars):
+                size += len(words[end][0])
+                end += 1
+
+            text = "".join(word for word, _ in words[start:end]).strip()
+            line = words[start][1]
+            if start > 0 and words[start - 1][1] == line:
+                text = labels[line] + text
+            texts.append(text)
+            if end == len(words):
+                break
+
+            # Step back over about overlap_tokens of trailing words, always moving forward at least one word
+            back, overlap = end, 0
+            while back > start + 1 and overlap + len(words[back - 1][0]) <= overlap_chars:
+                back -= 1
+                overlap += len(words[back][0])
+            start = back
+
+        return [
+            self._chunk(f"{prefix}\n{text}" if prefix else text, row.sheet_name, position, (row.row_number,), part, len(texts))
+            for part, text in enumerate(texts, start=1)
+        ]
+
+def row_chunk_ids(chunks: List[Chunk]) -> Dict[str, List[str]]:
+    '''
+    Description: Row key -> ids of the chunks that row appears in
+    '''
+    ids: Dict[str, List[str]] = {}
+    for chunk in chunks:
+        for row_number in chunk.row_numbers:
+            ids.setdefault(f"{chunk.sheet_name}!{row_number}", []).append(chunk.vector_id)
+    return ids
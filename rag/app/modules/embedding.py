@@ -0,0 +1,66 @@
+''' Embedding Gateway Client '''
+
+from typing import List
+
+import httpx
+import numpy as np
+from python_utils.logging.logging import init_logger
+
+from app.paths import SERVICE_CONFIG_PATH
+from app.schemas.config import ServiceConfig
+
+# Initialize logger
+logger = init_logger()
+
+# Initialize embedding configs
+embedding_config = ServiceConfig.from_yaml(SERVICE_CONFIG_PATH).embedding
+EMBEDDING_GATEWAY = embedding_config.model_gateway
+EMBEDDING_MODEL = embedding_config.model_name
+EMBEDDING_TIMEOUT = embedding_config.timeout
+
+# Raw little-endian float32 matrix, shape and dtype sent as headers
+BINARY_MEDIA_TYPE = "application/octet-stream"
+DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+def decode_embeddings(response: httpx.Response) -> np.ndarray:
+    '''
+    Description: Decode a binary batch embedding response without copying the buffer
+
+    Args:
+        response (httpx.Response): response from /embeddings/batch with Accept: application/octet-stream
+
+    Returns:
+        embeddings (np.ndarray): read-only (n_texts, dimensions) matrix
+    '''
+    shape = tuple(int(dim) for dim in response.headers["X-Embedding-Shape"].split(","))
+    dtype = DTYPES[response.headers.get("X-Embedding-Dtype", "float32")]
+
+    return np.frombuffer(response.content, dtype=dtype).reshape(shape)
+
+async def embed_texts(client: httpx.AsyncClient, texts: List[str]) -> np.ndarray:
+    '''
+    Description: Embed texts through the model gateway using the compact binary wire format
+
+    Args:
+        client (httpx.AsyncClient): client used for the gateway request
+        texts (List[str]): texts to embed
+
+    Returns:
+        embeddings (np.ndarray): (n_texts, dimensions) matrix in input order
+    '''
+    batch_embedding_request = {
+        "texts": texts,
+        "model_name": EMBEDDING_MODEL
+    }
+
+    embedding_response = await client.post(
+        url=f"{EMBEDDING_GATEWAY}/embeddings/batch",
+        json=batch_embedding_request,
+        headers={"Accept": f"{BINARY_MEDIA_TYPE}; dtype=float32"}
+    )
+    embedding_response.raise_for_status()
+
+    embeddings = decode_embeddings(embedding_response)
+    logger.info(f"Received {embeddings.shape[0]} embeddings ({len(embedding_response.content)} bytes)")
+
+    return embeddings
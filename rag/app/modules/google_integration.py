@@ -1,13 +1,22 @@
 ''' Google Integration Module '''
 
+import threading
+from typing import AsyncIterator, List, Optional, Tuple
+
+import httplib2
 from python_utils.logging.logging import init_logger
 
 from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
 
+from app.modules.io_pool import google_io
 from app.paths import GOOGLE_CREDENTIALS_PATH, SERVICE_CONFIG_PATH
 from app.schemas.config import ServiceConfig
-from app.schemas.google_sheets import GoogleSheetResponse, RowData, RowMetadata
+from app.schemas.google_sheets import GoogleSheetResponse, RowData, RowMetadata, SheetRow
+from app.schemas.sync import SourceRevision
 
 # Initialize logger
 logger = init_logger()
@@ -20,7 +29,10 @@ SPREADSHEET_ID = config.sheet_id
 creds_path = GOOGLE_CREDENTIALS_PATH
 credentials = service_account.Credentials.from_service_account_file(
     creds_path,
-    scopes=["https://www.googleapis.com/auth/spreadsheets.readonly"]
+    scopes=[
+        "https://www.googleapis.com/auth/spreadsheets.readonly",
+        "https://www.googleapis.com/auth/drive.metadata.readonly"
+    ]
 )
 
 # Initialize Google Sheets API
@@ -30,8 +42,38 @@ google_sheets_service = build(
     credentials=credentials
 )
 
+# Initialize Google Drive API, only used for the spreadsheet's revision metadata
+google_drive_service = build(
+    "drive",
+    "v3",
+    credentials=credentials
+)
+
 logger.info(f"Connected to Google Sheets API: {SPREADSHEET_ID}")
 
+# httplib2.Http isn't thread-safe, every pool thread gets its own authorized connection
+_thread_local = threading.local()
+
+def _execute_blocking(request: HttpRequest):
+    http = getattr(_thread_local, "http", None)
+    if http is None:
+        http = _thread_local.http = AuthorizedHttp(credentials, http=httplib2.Http())
+    return request.execute(http=http)
+
+def a1_range(sheet_name: str, cells: str) -> str:
+    '''
+    Description: A1 range on one sheet. The name is quoted with any apostrophes doubled, so names like
+    "Ryan's Trips" or ones with spaces parse
+    '''
+    quoted = sheet_name.replace("'", "''")
+    return f"'{quoted}'!{cells}"
+
+async def _execute(request: HttpRequest):
+    '''
+    Description: Execute a Google API request on the bounded Google I/O pool instead of the event loop
+    '''
+    return await google_io.run(_execute_blocking, request)
+
 async def read_google_sheets() -> GoogleSheetResponse:
     '''
     Description: Read data from Google Sheets
@@ -45,7 +87,7 @@ async def read_google_sheets() -> GoogleSheetResponse:
     try:
         # Get spreadsheet metadata
         sheet = google_sheets_service.spreadsheets()
-        metadata = sheet.get(spreadsheetId=SPREADSHEET_ID).execute()
+        metadata = await _execute(sheet.get(spreadsheetId=SPREADSHEET_ID))
         
         # Get spreadsheet title
         title = metadata.get('properties', {}).get('title', 'Unknown')
@@ -57,11 +99,11 @@ async def read_google_sheets() -> GoogleSheetResponse:
         logger.info(f"Found {len(sheet_names)} sheets in spreadsheet")
 
         # Batch read data from each sheet
-        ranges = [f"{sheet_name}!A:K" for sheet_name in sheet_names]
-        data_response = sheet.values().batchGet(
+        ranges = [a1_range(sheet_name, "A:K") for sheet_name in sheet_names]
+        data_response = await _execute(sheet.values().batchGet(
             spreadsheetId=SPREADSHEET_ID,
             ranges=ranges
-        ).execute()
+        ))
 
         # Fetch and process all row data
         all_row_data = []
@@ -95,4 +137,77 @@ async def read_google_sheets() -> GoogleSheetResponse:
         
     except Exception as e:
         logger.error(f"Connection failed: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+async def list_sheets() -> Tuple[str, List[Tuple[str, int]]]:
+    '''
+    Description: Read only the spreadsheet metadata
+
+    Returns:
+        (title, sheets) (Tuple[str, List[Tuple[str, int]]]): spreadsheet title and (sheet name, row count) per sheet
+    '''
+    request = google_sheets_service.spreadsheets().get(
+        spreadsheetId=SPREADSHEET_ID,
+        fields="properties.title,sheets.properties(title,gridProperties.rowCount)"
+    )
+    metadata = await _execute(request)
+
+    title = metadata.get('properties', {}).get('title', 'Unknown')
+    sheets = [
+        (
+            sheet.get('properties', {}).get('title', 'Unknown'),
+            sheet.get('properties', {}).get('gridProperties', {}).get('rowCount', 0)
+        )
+        for sheet in metadata.get('sheets', [])
+    ]
+    return title, sheets
+
+async def iter_sheet_rows(page_rows: int = 500) -> AsyncIterator[List[SheetRow]]:
+    '''
+    Description: Stream every sheet in row-range windows instead of reading the whole spreadsheet at once
+
+    Args:
+        page_rows (int): rows requested per values.get call
+
+    Yields:
+        page (List[SheetRow]): up to page_rows rows, in sheet then row order
+    '''
+    title, sheets = await list_sheets()
+    logger.info(f"Streaming {len(sheets)} sheets from {title} in pages of {page_rows} rows")
+
+    values = google_sheets_service.spreadsheets().values()
+    for sheet_name, row_count in sheets:
+        for start in range(1, row_count + 1, page_rows):
+            end = min(start + page_rows - 1, row_count)
+            request = values.get(spreadsheetId=SPREADSHEET_ID, range=a1_range(sheet_name, f"A{start}:K{end}"))
+            response = await _execute(request)
+
+            # Rows are relative to the window start, the API drops trailing empty rows
+            page = []
+            for offset, row in enumerate(response.get('values', [])):
+                cells = tuple(str(cell) for cell in row)
+                page.append(SheetRow(sheet_name, start + offset, ' | '.join(cells), cells))
+            if page:
+                yield page
+
+async def get_revision() -> Optional[SourceRevision]:
+    '''
+    Description: Fetch the spreadsheet's Drive version and modifiedTime, a single metadata call.
+    The version increases on every edit to any sheet.
+
+    Returns:
+        revision (Optional[SourceRevision]): None when Drive metadata isn't readable (API disabled,
+        missing scope), callers then have to read the sheets
+    '''
+    request = google_drive_service.files().get(
+        fileId=SPREADSHEET_ID,
+        fields="version,modifiedTime",
+        supportsAllDrives=True
+    )
+    try:
+        metadata = await _execute(request)
+    except HttpError as e:
+        logger.warning(f"Could not read Drive revision, falling back to a full read: {e}")
+        return None
+
+    return SourceRevision(version=str(metadata.get('version', '')), modified_time=metadata.get('modifiedTime', ''))
@@ -0,0 +1,117 @@
+'''
+Vector Inventory
+
+Knows which vector ids are stored in the index without querying vectors:
+
+- "pinecone" pages through the index's id listing (list_paginated), once per
+  id prefix this service writes, so it streams our ids regardless of index
+  size and never sees vectors other writers put in the same index.
+- "manifest" reads the ids recorded by the sync manifest, no network call.
+
+The id set is cached in-process and kept current by applying each sync's
+upserts and deletes, so it only has to be re-listed when the TTL expires.
+
+Reconcile is opt-in, because it makes a sync cost a listing of every id we
+stored rather than just the changed rows. With the "pinecone" source and
+reconcile on, every sync that reads the sheet checks the manifest against the
+inventory: chunks whose vector is missing from the index are re-embedded, and
+our vectors no row references (a delete that failed, ids written before the
+manifest existed) are deleted.
+'''
+
+import time
+from typing import Iterable, Iterator, List, Optional, Set
+
+from python_utils.logging.logging import init_logger
+
+from app.modules.sync_manifest import SyncManifest
+from app.schemas.config import InventoryConfig
+
+# Initialize logger
+logger = init_logger()
+
+# Ids this service writes: chunk vectors, whole-row vectors, and the legacy per-process hash() ids
+ID_PREFIXES = ("chunk_", "row_", "content_")
+
+class VectorInventory:
+    def __init__(self, index, inventory_config: InventoryConfig, manifest_path: str):
+        self.index = index
+        self.config = inventory_config
+        self.manifest_path = manifest_path
+
+        self._ids: Optional[Set[str]] = None
+        self._loaded_at = 0.0
+
+    @property
+    def reconciles(self) -> bool:
+        # Reconciling against the manifest itself would find nothing
+        return self.config.reconcile and self.config.source == "pinecone"
+
+    def pages(self) -> Iterator[List[str]]:
+        '''
+        Description: Stream the ids this service stored in Pinecone, one page per request
+
+        Yields:
+            page (List[str]): up to page_size vector ids
+        '''
+        for prefix in ID_PREFIXES:
+            pagination_token = None
+            while True:
+                response = self.index.list_paginated(prefix=prefix, limit=self.config.page_size, pagination_token=pagination_token)
+                yield [vector.id for vector in response.vectors]
+
+                pagination_token = response.pagination.next if response.pagination else None
+                if not pagination_token:
+                    break
+
+    def ids(self, refresh: bool = False) -> Set[str]:
+        '''
+        Description: Every vector id this service stored in the index, from cache when it is fresh enough
+
+        Args:
+            refresh (bool): ignore the cache and list again
+
+        Returns:
+            ids (Set[str]): vector ids
+        '''
+        expired = time.monotonic() - self._loaded_at > self.config.ttl_seconds
+        if self._ids is None or refresh or expired:
+            self._ids = self._load()
+            self._loaded_at = time.monotonic()
+        return self._ids
+
+    def _load(self) -> Set[str]:
+        start = time.perf_counter()
+
+        if self.config.source == "manifest":
+            ids = SyncManifest(self.manifest_path).load().vector_ids()
+        else:
+            ids = set()
+            for page in self.pages():
+                ids.update(page)
+
+        logger.info(f"Loaded inventory of {len(ids)} vector ids from {self.config.source} in {time.perf_counter() - start:.2f}s")
+        return ids
+
+    def apply(self, upserted: Iterable[str], deleted: Iterable[str]):
+        '''
+        Description: Keep a cached inventory current after a sync instead of listing again
+
+        Args:
+            upserted (Iterable[str]): ids written by the sync
+            deleted (Iterable[str]): ids removed by the sync
+        '''
+        if self._ids is None:
+            return
+        self._ids.difference_update(deleted)
+        self._ids.update(upserted)
+
+    def snapshot(self) -> dict:
+        return {
+            "source": self.config.source,
+            "reconcile": self.reconciles,
+            "cached": self._ids is not None,
+            "vectors": len(self._ids) if self._ids is not None else None,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._ids is not None else None,
+            "ttl_seconds": self.config.ttl_seconds
+        }
@@ -0,0 +1,57 @@
+'''
+Bounded Thread Pools for Blocking I/O
+
+The Google API client and the Pinecone client are synchronous. Calling them
+from a coroutine freezes the event loop, and with it /ready and every other
+request, for as long as the call takes. Each client gets its own small pool,
+so a slow spreadsheet read can't starve index writes (or the other way
+round) and neither competes with the loop's default executor.
+'''
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from python_utils.logging.logging import init_logger
+
+from app.paths import SERVICE_CONFIG_PATH
+from app.schemas.config import ServiceConfig
+
+# Initialize logger
+logger = init_logger()
+
+T = TypeVar("T")
+
+class IOPool:
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-io")
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # For code that submits its own work, e.g. the uploader's batch upserts
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        '''
+        Description: Run a blocking call on the pool and await its result
+
+        Args:
+            func (Callable): blocking function
+            *args, **kwargs: passed to func
+
+        Returns:
+            result: whatever func returns, exceptions are re-raised in the caller
+        '''
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# Initialize pools
+io_config = ServiceConfig.from_yaml(SERVICE_CONFIG_PATH).io
+google_io = IOPool("google", io_config.google_threads)
+pinecone_io = IOPool("pinecone", io_config.pinecone_threads)
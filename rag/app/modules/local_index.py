@@ -0,0 +1,128 @@
+'''
+Local Vector Index Export
+
+Writes the vectors prepared for Pinecone to a directory the agent can
+memory-map and search in-process:
+    vectors.npy       (n_vectors, dimensions) float32, rows L2-normalized
+    metadata.jsonl    one {"id": ..., "metadata": {...}} object per row, same order
+
+With an IVF index the rows are grouped by inverted list and ivf_centroids.npy /
+ivf_offsets.npy are written alongside, see ann_index.
+'''
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from python_utils.logging.logging import init_logger
+
+from app.modules.ann_index import list_offsets, train_ivf
+
+# Initialize logger
+logger = init_logger()
+
+def _save_array(index_dir: Path, name: str, array: np.ndarray):
+    # Write next to the final file and rename, so readers never see a partial file
+    tmp_path = index_dir / f"{name}.tmp.npy"
+    np.save(tmp_path, array)
+    os.replace(tmp_path, index_dir / f"{name}.npy")
+
+def write_local_index(
+    vectors_to_upsert: List[Dict],
+    index_path: str,
+    ivf: bool = False,
+    ivf_lists: Optional[int] = None
+):
+    '''
+    Description: Export prepared vectors as a local index, replacing any previous export
+
+    Args:
+        vectors_to_upsert (List[Dict]): output of PineconeManager.prepare_vectors
+        index_path (str): directory to write the index into
+        ivf (bool): also build an IVF index and group the rows by list
+        ivf_lists (int): number of IVF lists, defaults to ~sqrt(n_vectors)
+    '''
+    index_dir = Path(index_path)
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    vectors = np.asarray([vector["values"] for vector in vectors_to_upsert], dtype=np.float32)
+    if vectors.size:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1.0, norms)
+
+    # Stale IVF files would point at the wrong rows
+    build_ivf = ivf and len(vectors_to_upsert) > 0
+    if not build_ivf:
+        for name in ("ivf_centroids.npy", "ivf_offsets.npy"):
+            (index_dir / name).unlink(missing_ok=True)
+
+    order = range(len(vectors_to_upsert))
+    if build_ivf:
+        centroids, assignments = train_ivf(vectors, ivf_lists)
+        order, offsets = list_offsets(assignments, centroids.shape[0])
+        vectors = vectors[order]
+
+    tmp_metadata = index_dir / "metadata.tmp.jsonl"
+    with open(tmp_metadata, "w") as f:
+        for row in order:
+            vector = vectors_to_upsert[row]
+            f.write(json.dumps({"id": vector["id"], "metadata": vector["metadata"]}) + "\n")
+
+    _save_array(index_dir, "vectors", vectors)
+    os.replace(tmp_metadata, index_dir / "metadata.jsonl")
+    if build_ivf:
+        _save_array(index_dir, "ivf_centroids", centroids)
+        _save_array(index_dir, "ivf_offsets", offsets)
+
+    logger.info(f"Wrote local index with {len(vectors_to_upsert)} vectors to {index_dir} (IVF: {build_ivf})")
+
+def local_index_exists(index_path: str) -> bool:
+    index_dir = Path(index_path)
+    return (index_dir / "vectors.npy").exists() and (index_dir / "metadata.jsonl").exists()
+
+def read_local_index(index_path: str) -> List[Dict]:
+    '''
+    Description: Read a local index back as prepared vectors
+
+    Args:
+        index_path (str): directory the index was written to
+
+    Returns:
+        vectors (List[Dict]): {"id", "values", "metadata"} per row, empty if there is no index
+    '''
+    index_dir = Path(index_path)
+    if not local_index_exists(index_path):
+        return []
+
+    vectors = np.load(index_dir / "vectors.npy", mmap_mode="r")
+    with open(index_dir / "metadata.jsonl", "r") as f:
+        records = [json.loads(line) for line in f]
+
+    return [
+        {"id": record["id"], "values": vector, "metadata": record["metadata"]}
+        for record, vector in zip(records, vectors)
+    ]
+
+def update_local_index(
+    vectors_to_upsert: List[Dict],
+    deleted_ids: List[str],
+    index_path: str,
+    ivf: bool = False,
+    ivf_lists: Optional[int] = None
+):
+    '''
+    Description: Apply an incremental sync to the local index: replace upserted ids, drop deleted ids
+
+    Args:
+        vectors_to_upsert (List[Dict]): new and changed vectors from PineconeManager.prepare_vectors
+        deleted_ids (List[str]): vector ids removed from the index
+        index_path (str): directory the index lives in
+        ivf (bool): rebuild the IVF index over the result
+        ivf_lists (int): number of IVF lists, defaults to ~sqrt(n_vectors)
+    '''
+    replaced = set(deleted_ids) | {vector["id"] for vector in vectors_to_upsert}
+    kept = [vector for vector in read_local_index(index_path) if vector["id"] not in replaced]
+
+    write_local_index(kept + vectors_to_upsert, index_path, ivf=ivf, ivf_lists=ivf_lists)
@@ -4,19 +4,42 @@ Pinecone Database Operations
 
 import os
 import datetime
+from concurrent.futures import Executor
+from typing import List, Optional
 from dotenv import load_dotenv
 from pinecone import Pinecone, ServerlessSpec
 from python_utils.logging.logging import init_logger
 
+from app.modules.inventory import VectorInventory
+from app.modules.local_index import update_local_index
+from app.modules.sync_manifest import content_hash, vector_id
+from app.modules.uploader import PipelinedUploader, UploadError
+from app.schemas.config import InventoryConfig, LocalIndexConfig, SyncConfig, UploadConfig
+
 # Initialize logger
 logger = init_logger()
 
 class PineconeManager:
-    def __init__(self, index_name: str = "rag-engine"):
+    def __init__(
+        self,
+        index_name: str = "rag-engine",
+        local_index: Optional[LocalIndexConfig] = None,
+        inventory: Optional[InventoryConfig] = None,
+        sync: Optional[SyncConfig] = None,
+        upload: Optional[UploadConfig] = None,
+        executor: Optional[Executor] = None
+    ):
         self.index_name = index_name
+        self.local_index = local_index
         self.pinecone_db = None
         self.index = None
         self._initialize_pinecone()
+        self.inventory = VectorInventory(
+            self.index,
+            inventory or InventoryConfig(),
+            (sync or SyncConfig()).manifest_path
+        )
+        self.uploader = PipelinedUploader(self.index, upload or UploadConfig(), executor)
     
     def _initialize_pinecone(self):
         """Initialize Pinecone connection and create index if needed"""
@@ -53,46 +76,56 @@ class PineconeManager:
         self.index = self.pinecone_db.Index(self.index_name)
         logger.info(f"Connected to Pinecone index: {self.index_name}")
     
-    def get_existing_vectors(self, limit: int = 10000):
-        """Fetch existing vectors from the index"""
-        existing_vectors = {}
-        try:
-            # Fetch existing vectors (you might want to implement pagination for large datasets)
-            fetch_response = self.index.query(
-                vector=[0] * 1536,  # Dummy vector to get all vectors
-                top_k=limit,
-                include_metadata=True
-            )
-            for match in fetch_response.matches:
-                existing_vectors[match.id] = match.metadata
-            logger.debug(f"Fetched {len(existing_vectors)} existing vectors")
-        except Exception as e:
-            logger.warning(f"Could not fetch existing vectors: {e}")
-        
-        return existing_vectors
+    def get_existing_vectors(self):
+        """Ids of the vectors already in the index, from the cached inventory"""
+        return self.inventory.ids()
     
-    def prepare_vectors(self, sheet_data, embeddings):
-        """Prepare vectors for upload with metadata"""
+    def list_vector_ids(self):
+        """Yield every vector id this service stored in the index, streamed page by page"""
+        for page in self.inventory.pages():
+            yield from page
+    
+    def fetch_vectors(self, vector_ids: List[str], batch_size: int = 100):
+        """Fetch vectors (values and metadata) by id, in batches"""
+        vectors = {}
+        for i in range(0, len(vector_ids), batch_size):
+            vectors.update(self.index.fetch(ids=vector_ids[i:i + batch_size]).vectors)
+        return vectors
+    
+    def prepare_vectors(
+        self,
+        sheet_data,
+        embeddings,
+        spreadsheet_id: str = "",
+        row_indices: Optional[List[int]] = None,
+        existing_vectors=None
+    ):
+        """Prepare vectors for upload with metadata. row_indices gives each row's position in the
+        full sheet when only a subset of rows is passed; existing_vectors skips the index lookup."""
         vectors_to_upsert = []
         new_count = 0
         update_count = 0
         
         # Get existing vectors for update detection
-        existing_vectors = self.get_existing_vectors()
+        if existing_vectors is None:
+            existing_vectors = self.get_existing_vectors()
+        if row_indices is None:
+            row_indices = range(len(sheet_data))
         
-        for i, (row, embedding) in enumerate(zip(sheet_data, embeddings)):
-            # Create a unique ID based on content hash for better update detection
-            content_hash = hash(row.content) % 1000000
-            vector_id = f"content_{content_hash}"
+        for i, row, embedding in zip(row_indices, sheet_data, embeddings):
+            # Stable across processes: spreadsheet, sheet, row and content
+            row_vector_id = vector_id(spreadsheet_id, row)
             
             # Prepare metadata with timestamp and version info
             metadata = {
                 "content": row.content,
                 "row_index": i,
+                "sheet": row.sheet_name,
+                "row_number": row.row_number,
                 "source": "google_sheets",
                 "last_updated": str(datetime.datetime.now()),
-                "content_hash": content_hash,
-                "sync_version": "1.0"  # Increment this when you change the sync logic
+                "content_hash": content_hash(row.content),
+                "sync_version": "2.0"  # Increment this when you change the sync logic
             }
             
             # Add any additional fields from your Google Sheets data
@@ -102,50 +135,81 @@ class PineconeManager:
                 metadata["category"] = row.category
             
             # Check if this is a new vector or an update
-            is_update = vector_id in existing_vectors
+            is_update = row_vector_id in existing_vectors
             if is_update:
                 update_count += 1
-                logger.debug(f"Updating existing vector: {vector_id}")
+                logger.debug(f"Updating existing vector: {row_vector_id}")
             else:
                 new_count += 1
-                logger.debug(f"Adding new vector: {vector_id}")
+                logger.debug(f"Adding new vector: {row_vector_id}")
             
             vectors_to_upsert.append({
-                "id": vector_id,
-                "values": embedding,
+                "id": row_vector_id,
+                "values": embedding.tolist(),
                 "metadata": metadata
             })
         
         return vectors_to_upsert, new_count, update_count
-    
-    def upload_vectors(self, vectors_to_upsert, batch_size: int = 100):
-        """Upload vectors to Pinecone in batches"""
+
+    def prepare_chunk_vectors(self, chunks, embeddings):
+        """Prepare chunk vectors for upload. Metadata points back at the parent row(s): filter on
+        "parent" to fetch every part of a split row, part/parts give their order."""
+        vectors_to_upsert = []
+        last_updated = str(datetime.datetime.now())
+
+        for chunk, embedding in zip(chunks, embeddings):
+            metadata = {
+                "content": chunk.text,
+                "row_index": chunk.row_index,
+                "sheet": chunk.sheet_name,
+                "row_number": chunk.row_numbers[0],
+                "row_end": chunk.row_numbers[-1],
+                "parent": chunk.parent,
+                "part": chunk.part,
+                "parts": chunk.parts,
+                "source": "google_sheets",
+                "last_updated": last_updated,
+                "content_hash": content_hash(chunk.text),
+                "sync_version": "3.0"  # Increment this when you change the sync logic
+            }
+
+            vectors_to_upsert.append({
+                "id": chunk.vector_id,
+                "values": embedding.tolist(),
+                "metadata": metadata
+            })
+
+        return vectors_to_upsert
+
+    def upload_vectors(self, vectors_to_upsert):
+        """Upload vectors to Pinecone with the pipelined uploader, returns its UploadReport"""
         try:
-            for i in range(0, len(vectors_to_upsert), batch_size):
-                batch = vectors_to_upsert[i:i + batch_size]
-                self.index.upsert(vectors=batch)
-                logger.info(f"Uploaded batch {i//batch_size + 1} of {(len(vectors_to_upsert) + batch_size - 1)//batch_size}")
+            report = self.uploader.upload(vectors_to_upsert)
+            self.inventory.apply(upserted=[vector["id"] for vector in vectors_to_upsert], deleted=[])
             
             logger.info(f"Successfully uploaded {len(vectors_to_upsert)} vectors to Pinecone")
-            return True
-        except Exception as e:
+            return report
+        except UploadError as e:
+            # Batches that made it are stored, keep the inventory honest about them
+            failed_ids = set(e.failed_ids)
+            self.inventory.apply(upserted=[vector["id"] for vector in vectors_to_upsert if vector["id"] not in failed_ids], deleted=[])
             logger.error(f"Error uploading to Pinecone: {e}")
             raise e
     
-    def sync_data(self, sheet_data, embeddings):
-        """Complete sync operation: prepare and upload vectors"""
-        try:
-            # Prepare vectors for upload
-            vectors_to_upsert, new_count, update_count = self.prepare_vectors(sheet_data, embeddings)
-            
-            # Upload vectors to Pinecone
-            self.upload_vectors(vectors_to_upsert)
-            
-            return {
-                "new_vectors": new_count,
-                "updated_vectors": update_count,
-                "total_vectors": len(vectors_to_upsert)
-            }
-        except Exception as e:
-            logger.error(f"Error in sync operation: {e}")
-            raise e 
\ No newline at end of file
+    def delete_vectors(self, vector_ids: List[str], batch_size: int = 1000):
+        """Delete vectors from Pinecone in batches"""
+        for i in range(0, len(vector_ids), batch_size):
+            self.index.delete(ids=vector_ids[i:i + batch_size])
+            self.inventory.apply(upserted=[], deleted=vector_ids[i:i + batch_size])
+        logger.info(f"Deleted {len(vector_ids)} vectors from Pinecone")
+    
+    def update_local_index(self, vectors_to_upsert, stale_ids: List[str]):
+        """Apply upserted and deleted vectors to the local index export, if enabled"""
+        if self.local_index and self.local_index.enabled:
+            update_local_index(
+                vectors_to_upsert,
+                stale_ids,
+                self.local_index.path,
+                ivf=self.local_index.ivf,
+                ivf_lists=self.local_index.ivf_lists
+            )
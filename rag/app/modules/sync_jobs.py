@@ -0,0 +1,185 @@
+'''
+Background Sync Jobs
+
+Runs syncs outside the HTTP request. One worker task runs one job at a time,
+so syncs never race each other on the manifest or the index. Requests are
+coalesced: at most one job runs and at most one waits behind it. Any /sync
+that arrives while a job is already queued joins that job. A job queued
+while another runs still starts from a fresh read, so edits made during the
+running sync are not missed. A scheduler queues an incremental sync every
+schedule_seconds, unless one is already running or queued.
+'''
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from python_utils.logging.logging import init_logger
+
+from app.modules.local_index import local_index_exists
+from app.modules.pinecone import PineconeManager
+from app.modules.sync_manifest import SyncManifest
+from app.modules.sync_pipeline import run_sync
+from app.schemas.config import ServiceConfig
+from app.schemas.sync import SyncJob, SyncProgress
+
+# Initialize logger
+logger = init_logger()
+
+def summarize(progress: SyncProgress) -> str:
+    changed = progress.rows_added + progress.rows_changed + progress.rows_deleted
+    if progress.revision_unchanged:
+        return "Spreadsheet unchanged since the last sync"
+    if changed:
+        return f"Synced {changed} changed rows of {progress.rows_read} to Pinecone"
+    if progress.vectors_missing or progress.vectors_orphaned:
+        return f"Re-upserted {progress.vectors_missing} missing vectors, deleted {progress.vectors_orphaned} orphaned vectors"
+    return "Nothing changed since the last sync"
+
+class SyncJobRunner:
+    def __init__(self, pinecone_manager: PineconeManager, service_config: ServiceConfig):
+        self.pinecone_manager = pinecone_manager
+        self.service_config = service_config
+        self.config = service_config.sync_jobs
+        self.jobs: "OrderedDict[str, SyncJob]" = OrderedDict()
+        self._active: Optional[SyncJob] = None
+        self._queued: Optional[SyncJob] = None
+        self._started: Dict[str, float] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._scheduler: Optional[asyncio.Task] = None
+
+    def start(self):
+        '''
+        Description: Start the worker and, if configured, the scheduler on the running event loop
+        '''
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.create_task(self._work())
+            if self._queued is not None:
+                self._wakeup.set()
+
+        if self.config.schedule_seconds and (self._scheduler is None or self._scheduler.done()):
+            self._scheduler = asyncio.create_task(self._schedule())
+            logger.info(f"Scheduled incremental sync every {self.config.schedule_seconds:.0f}s")
+
+    async def close(self):
+        for task in (self._scheduler, self._worker):
+            if task is not None:
+                task.cancel()
+        for task in (self._scheduler, self._worker):
+            if task is not None:
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+    def submit(self, force: bool = False, trigger: str = "api") -> Tuple[SyncJob, bool]:
+        '''
+        Description: Queue a sync, or join the one already waiting
+
+        Args:
+            force (bool): skip the revision check and re-embed every row
+            trigger (str): "api" or "schedule"
+
+        Returns:
+            (job, coalesced) (Tuple[SyncJob, bool]): the job that will do the work, and whether it already existed
+        '''
+        if self._queued is not None:
+            # A force request upgrades the waiting job rather than queuing a second one
+            self._queued.force = self._queued.force or force
+            return self._queued, True
+
+        job = SyncJob(
+            job_id=uuid.uuid4().hex,
+            trigger=trigger,
+            force=force,
+            created_at=datetime.now(timezone.utc)
+        )
+        self.jobs[job.job_id] = job
+        self._queued = job
+        self._trim_history()
+
+        self.start()
+        self._wakeup.set()
+        logger.info(f"Queued sync job {job.job_id} ({trigger}, force={force})")
+        return job, False
+
+    def get(self, job_id: str) -> Optional[SyncJob]:
+        return self.jobs.get(job_id)
+
+    def elapsed_seconds(self, job: SyncJob) -> float:
+        if job.started_at is None:
+            return 0.0
+        if job.finished_at is None:
+            return time.perf_counter() - self._started[job.job_id]
+        return (job.finished_at - job.started_at).total_seconds()
+
+    def _trim_history(self):
+        # Forget the oldest finished jobs, never the running or queued one
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.config.history:
+                break
+            if self.jobs[job_id].status in ("succeeded", "failed"):
+                del self.jobs[job_id]
+                self._started.pop(job_id, None)
+
+    async def _work(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while self._queued is not None:
+                job, self._queued = self._queued, None
+                self._active = job
+                try:
+                    await self._run(job)
+                finally:
+                    self._active = None
+
+    async def _run(self, job: SyncJob):
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        self._started[job.job_id] = time.perf_counter()
+
+        try:
+            manifest = await asyncio.to_thread(SyncManifest(self.service_config.sync.manifest_path).load)
+
+            local_index = self.service_config.local_index
+            rebuild = local_index.enabled and not local_index_exists(local_index.path)
+            if rebuild:
+                # Nothing to patch locally, so re-embed everything once to build the local index
+                logger.info("Local index missing, syncing every row")
+
+            await run_sync(
+                self.pinecone_manager,
+                manifest,
+                self.service_config.sync,
+                self.service_config.chunking,
+                force=job.force or rebuild,
+                progress=job.progress
+            )
+            job.message = summarize(job.progress)
+            job.status = "succeeded"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "Cancelled at shutdown"
+            raise
+        except Exception as e:
+            logger.error(f"Sync job {job.job_id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            logger.info(f"Sync job {job.job_id} {job.status} in {self.elapsed_seconds(job):.1f}s")
+
+    async def _schedule(self):
+        while True:
+            await asyncio.sleep(self.config.schedule_seconds)
+            if self._active is not None or self._queued is not None:
+                logger.info("Skipping scheduled sync, a sync is already running or queued")
+                continue
+            self.submit(trigger="schedule")
@@ -0,0 +1,212 @@
+'''
+Sync Manifest
+
+Remembers, for every sheet row synced so far, the hash of its content and the
+ids of the chunk vectors it was stored in:
+    row key ("<sheet>!<row>") -> content hash -> vector ids
+
+/sync diffs the sheet against it so only new and changed rows are embedded
+and upserted, and vectors of removed rows are deleted. It also keeps the
+spreadsheet's Drive revision as of the last sync, so an untouched
+spreadsheet is recognised without reading it.
+
+Row keys and vector ids include the row number, so inserting or deleting a
+row moves every row below it to a new key and new ids. Those rows are still
+re-upserted, but the sync looks their content up with ids_by_content and
+reuses the stored embedding instead of embedding them again.
+'''
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from python_utils.logging.logging import init_logger
+
+from app.schemas.google_sheets import RowData, SheetRow
+from app.schemas.sync import ManifestEntry, SourceRevision, SyncDiff, SyncManifestData
+
+# Initialize logger
+logger = init_logger()
+
+# Anything with sheet_name, row_number and content
+Row = Union[RowData, SheetRow]
+
+def row_key(row: Row) -> str:
+    return f"{row.sheet_name}!{row.row_number}"
+
+def content_hash(content: str) -> str:
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+def vector_id(spreadsheet_id: str, row: Row) -> str:
+    '''
+    Description: Deterministic vector id for a row. Same row and content give the same id in every
+    process (unlike hash(), which is salted per process), and 128 bits make collisions negligible.
+
+    Args:
+        spreadsheet_id (str): the spreadsheet the row belongs to
+        row (Row): the row
+
+    Returns:
+        vector_id (str): "row_" + 32 hex characters
+    '''
+    # Unit separators keep ("a", "bc") and ("ab", "c") from hashing alike
+    key = "\x1f".join([spreadsheet_id, row.sheet_name, str(row.row_number), row.content])
+    return f"row_{hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()}"
+
+def chunk_vector_id(spreadsheet_id: str, sheet_name: str, row_numbers: Tuple[int, ...], part: int, text: str) -> str:
+    '''
+    Description: Deterministic id for a chunk, derived from the rows it covers and its exact text, so an
+    unchanged chunk keeps its id across syncs and any change to it produces a new one
+
+    Returns:
+        vector_id (str): "chunk_" + 32 hex characters
+    '''
+    rows = ",".join(str(row_number) for row_number in row_numbers)
+    key = "\x1f".join([spreadsheet_id, sheet_name, rows, str(part), text])
+    return f"chunk_{hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()}"
+
+class SyncManifest:
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.entries: Dict[str, ManifestEntry] = {}
+        self.revision: Optional[SourceRevision] = None
+        self.chunking: Optional[str] = None
+
+    def load(self) -> "SyncManifest":
+        '''
+        Description: Load the manifest from disk, an absent file is an empty manifest
+        '''
+        if self.path.exists():
+            data = SyncManifestData.model_validate_json(self.path.read_text())
+            self.entries, self.revision, self.chunking = data.entries, data.revision, data.chunking
+        logger.info(f"Loaded sync manifest with {len(self.entries)} rows: {self.path}")
+        return self
+
+    def save(self):
+        '''
+        Description: Write the manifest atomically so a crash mid-write keeps the previous one
+        '''
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(SyncManifestData(entries=self.entries, revision=self.revision, chunking=self.chunking).model_dump_json())
+        os.replace(tmp_path, self.path)
+
+    def is_current(self, revision: Optional[SourceRevision], chunking: Optional[str] = None) -> bool:
+        '''
+        Description: Whether the spreadsheet is still at the revision of the last successful sync, and its
+        chunks were built with the same chunking config
+        '''
+        return revision is not None and bool(self.entries) and self.revision == revision and self.chunking == chunking
+
+    def classify(self, row: Row, force: bool = False) -> str:
+        '''
+        Description: Compare one row against the manifest, for callers that stream rows
+
+        Args:
+            row (Row): a row currently in the spreadsheet
+            force (bool): treat a known row as changed, e.g. to rebuild a lost local index
+
+        Returns:
+            status (str): "added", "changed" or "unchanged"
+        '''
+        entry = self.entries.get(row_key(row))
+        if entry is None:
+            return "added"
+        if force or entry.content_hash != content_hash(row.content):
+            return "changed"
+        return "unchanged"
+
+    def deleted_keys(self, seen: Set[str]) -> List[str]:
+        '''
+        Description: Row keys in the manifest that were not seen in the spreadsheet
+        '''
+        return [key for key in self.entries if key not in seen]
+
+    def diff(self, rows: List[Row], force: bool = False) -> SyncDiff:
+        '''
+        Description: Compare the current sheet rows against the manifest
+
+        Args:
+            rows (List[Row]): every row currently in the spreadsheet
+            force (bool): treat every known row as changed, e.g. to rebuild a lost local index
+
+        Returns:
+            diff (SyncDiff): positions in rows of added and changed rows, row keys of deleted rows
+        '''
+        diff = SyncDiff()
+        for position, row in enumerate(rows):
+            status = self.classify(row, force)
+            if status == "added":
+                diff.added.append(position)
+            elif status == "changed":
+                diff.changed.append(position)
+            else:
+                diff.unchanged += 1
+
+        diff.deleted = self.deleted_keys({row_key(row) for row in rows})
+        return diff
+
+    def vector_ids(self) -> Set[str]:
+        '''
+        Description: Every vector id some row currently points at
+        '''
+        return {vector_id for entry in self.entries.values() for vector_id in entry.vector_ids}
+
+    def ids_by_content(self) -> Dict[Tuple[str, str], List[str]]:
+        '''
+        Description: (sheet, content hash) -> vector ids of a stored row with that content, to find rows that only moved
+        '''
+        by_content: Dict[Tuple[str, str], List[str]] = {}
+        for key, entry in self.entries.items():
+            if entry.vector_ids:
+                by_content.setdefault((key.rsplit("!", 1)[0], entry.content_hash), entry.vector_ids)
+        return by_content
+
+    def needs_update(self, row: Row, vector_ids: List[str]) -> bool:
+        '''
+        Description: Whether the row's entry differs from its current content or chunk ids
+        '''
+        entry = self.entries.get(row_key(row))
+        return entry is None or entry.vector_ids != vector_ids or entry.content_hash != content_hash(row.content)
+
+    def apply(self, rows: List[Row], vector_ids: List[List[str]], deleted: List[str]) -> List[str]:
+        '''
+        Description: Record updated rows and forget deleted ones
+
+        Args:
+            rows (List[Row]): rows whose content or chunks changed
+            vector_ids (List[List[str]]): ids of the chunks each row is now stored in
+            deleted (List[str]): row keys that no longer exist
+
+        Returns:
+            stale_ids (List[str]): vector ids no longer referenced by any row, safe to delete
+        '''
+        updated = {
+            row_key(row): ManifestEntry(content_hash=content_hash(row.content), vector_ids=row_vector_ids)
+            for row, row_vector_ids in zip(rows, vector_ids)
+        }
+        return self.apply_entries(updated, deleted)
+
+    def apply_entries(self, updated: Dict[str, ManifestEntry], deleted: List[str]) -> List[str]:
+        '''
+        Description: Same as apply, for callers that keep only the new entries rather than whole rows
+
+        Args:
+            updated (Dict[str, ManifestEntry]): row key -> new entry
+            deleted (List[str]): row keys that no longer exist
+
+        Returns:
+            stale_ids (List[str]): vector ids no longer referenced by any row, safe to delete
+        '''
+        previous_ids = {vector_id for key in deleted if key in self.entries for vector_id in self.entries[key].vector_ids}
+        for key in updated:
+            if key in self.entries:
+                previous_ids.update(self.entries[key].vector_ids)
+
+        for key in deleted:
+            self.entries.pop(key, None)
+        self.entries.update(updated)
+
+        # Rows merged into one chunk share its vector, only drop ids no row points at anymore
+        return sorted(previous_ids - self.vector_ids())
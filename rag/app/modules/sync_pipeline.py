@@ -0,0 +1,292 @@
+'''
+Streaming Sync Pipeline
+
+Runs the sync as three concurrent stages connected by bounded queues:
+
+    read (sheet pages) -> embed (new chunks) -> upsert (Pinecone)
+
+The reader chunks each page as it arrives (see chunking) and only forwards
+chunks whose id isn't stored yet, so unchanged rows are dropped immediately
+and the queues cap how much is held in memory at once. A new chunk whose
+text is already stored under another id (its rows moved, e.g. after a row
+was inserted above them) reuses that vector's embedding from Pinecone
+instead of calling the embedding model. While one batch is
+being embedded the next page is already being read and the previous batch
+upserted. Deletions and the manifest update happen once every stage is done;
+until then only each changed row's new manifest entry (hash and ids) is kept,
+and the local index export, when enabled, is patched every flush_vectors
+vectors rather than holding every upserted vector.
+
+Before any of that, the spreadsheet's Drive revision is compared with the one
+recorded at the last sync; if it hasn't moved, the sync stops after that one
+metadata call. Otherwise, when the inventory reconciles, the manifest is
+checked against the ids stored in Pinecone (see inventory).
+'''
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Set
+
+import httpx
+import numpy as np
+from python_utils.logging.logging import init_logger
+
+from app.modules.chunking import Chunk, IndexedRow, RowChunker, chunking_fingerprint, row_chunk_ids
+from app.modules.embedding import EMBEDDING_TIMEOUT, embed_texts
+from app.modules.google_integration import SPREADSHEET_ID, get_revision, iter_sheet_rows
+from app.modules.io_pool import pinecone_io
+from app.modules.pinecone import PineconeManager
+from app.modules.sync_manifest import SyncManifest, content_hash, row_key
+from app.schemas.config import ChunkingConfig, SyncConfig
+from app.schemas.sync import ManifestEntry, SyncProgress
+
+# Initialize logger
+logger = init_logger()
+
+async def _read(
+    manifest: SyncManifest,
+    sync_config: SyncConfig,
+    chunker: RowChunker,
+    force: bool,
+    missing_ids: Set[str],
+    seen: Set[str],
+    updated: Dict[str, ManifestEntry],
+    sources: Dict[str, str],
+    to_embed: asyncio.Queue,
+    progress: SyncProgress
+):
+    start = time.perf_counter()
+    position = 0
+    # Ids already stored; chunks of untouched rows come out with the same id and are skipped,
+    # unless reconciling found their vector missing from the index
+    known_ids = manifest.vector_ids() - missing_ids
+    ids_by_content = manifest.ids_by_content()
+    batch: List[Chunk] = []
+
+    async for page in iter_sheet_rows(sync_config.page_rows):
+        indexed_rows: List[IndexedRow] = []
+        for row in page:
+            seen.add(row_key(row))
+            status = manifest.classify(row, force)
+            if status == "added":
+                progress.rows_added += 1
+            elif status == "changed":
+                progress.rows_changed += 1
+            else:
+                progress.rows_unchanged += 1
+
+            indexed_rows.append((position, row))
+            position += 1
+
+        # Chunk whole pages so merged tiny rows get re-chunked together when one of them changes
+        chunks = chunker.chunk_page(indexed_rows)
+        chunk_ids = row_chunk_ids(chunks)
+        for _, row in indexed_rows:
+            row_vector_ids = chunk_ids.get(row_key(row), [])
+            if manifest.needs_update(row, row_vector_ids):
+                updated[row_key(row)] = ManifestEntry(content_hash=content_hash(row.content), vector_ids=row_vector_ids)
+
+        rows_by_number = {row.row_number: row for _, row in indexed_rows}
+        for chunk in chunks:
+            if force or chunk.vector_id not in known_ids:
+                # A moved row's content is stored under its old ids, remember the one this part may match
+                first_row = rows_by_number[chunk.row_numbers[0]]
+                stored_ids = ids_by_content.get((chunk.sheet_name, content_hash(first_row.content)), [])
+                if not force and chunk.part <= len(stored_ids) and stored_ids[chunk.part - 1] in known_ids:
+                    sources[chunk.vector_id] = stored_ids[chunk.part - 1]
+                batch.append(chunk)
+                if len(batch) >= sync_config.embed_batch_rows:
+                    await to_embed.put(batch)
+                    batch = []
+
+        progress.rows_read += len(page)
+        progress.read_seconds = time.perf_counter() - start
+
+    if batch:
+        await to_embed.put(batch)
+    await to_embed.put(None)
+
+def _rows_in(batch: List[Chunk]) -> int:
+    # Parts after the first belong to a row already counted
+    return sum(len(chunk.row_numbers) for chunk in batch if chunk.part == 1)
+
+async def _stored_embeddings(pinecone_manager: PineconeManager, batch: List[Chunk], sources: Dict[str, str]) -> Dict[int, List[float]]:
+    '''
+    Description: Embeddings of chunks in batch whose exact text is already stored under another id, by position
+    '''
+    candidates = {i: sources.pop(chunk.vector_id) for i, chunk in enumerate(batch) if chunk.vector_id in sources}
+    if not candidates:
+        return {}
+
+    stored = await pinecone_io.run(pinecone_manager.fetch_vectors, sorted(set(candidates.values())))
+    reused = {}
+    for i, source_id in candidates.items():
+        vector = stored.get(source_id)
+        # Same content hash of the same text means the embedding would come out the same
+        if vector is not None and (vector.metadata or {}).get("content_hash") == content_hash(batch[i].text):
+            reused[i] = vector.values
+    return reused
+
+async def _embed(
+    pinecone_manager: PineconeManager,
+    sources: Dict[str, str],
+    to_embed: asyncio.Queue,
+    to_upsert: asyncio.Queue,
+    progress: SyncProgress
+):
+    async with httpx.AsyncClient(timeout=EMBEDDING_TIMEOUT) as client:
+        while True:
+            batch = await to_embed.get()
+            if batch is None:
+                await to_upsert.put(None)
+                return
+
+            start = time.perf_counter()
+            vectors = await _stored_embeddings(pinecone_manager, batch, sources)
+            fresh = [i for i in range(len(batch)) if i not in vectors]
+            if fresh:
+                vectors.update(zip(fresh, await embed_texts(client, [batch[i].text for i in fresh])))
+            embeddings = np.asarray([vectors[i] for i in range(len(batch))], dtype=np.float32)
+            progress.embed_seconds += time.perf_counter() - start
+            progress.rows_embedded += _rows_in(batch)
+            progress.chunks_embedded += len(fresh)
+            progress.chunks_reused += len(batch) - len(fresh)
+
+            await to_upsert.put((batch, embeddings))
+
+async def _upsert(
+    pinecone_manager: PineconeManager,
+    to_upsert: asyncio.Queue,
+    local_pending: List[dict],
+    keep_vectors: bool,
+    progress: SyncProgress
+):
+    while True:
+        item = await to_upsert.get()
+        if item is None:
+            return
+
+        batch, embeddings = item
+        vectors_to_upsert = await asyncio.to_thread(pinecone_manager.prepare_chunk_vectors, batch, embeddings)
+
+        start = time.perf_counter()
+        # The batch upserts run on pinecone_io; this thread only waits for them, so it must not be one of its workers
+        report = await asyncio.to_thread(pinecone_manager.upload_vectors, vectors_to_upsert)
+        progress.upsert_seconds += time.perf_counter() - start
+        progress.rows_upserted += _rows_in(batch)
+        progress.chunks_upserted += len(batch)
+        progress.upsert_batches += report.batches
+        progress.upsert_retries += report.retries
+
+        # Only the local index needs the vectors after upload, patch it in bounded steps
+        if keep_vectors:
+            local_pending.extend(vectors_to_upsert)
+            if len(local_pending) >= pinecone_manager.local_index.flush_vectors:
+                await asyncio.to_thread(pinecone_manager.update_local_index, local_pending, [])
+                local_pending.clear()
+
+async def run_sync(
+    pinecone_manager: PineconeManager,
+    manifest: SyncManifest,
+    sync_config: SyncConfig,
+    chunking_config: Optional[ChunkingConfig] = None,
+    force: bool = False,
+    progress: Optional[SyncProgress] = None
+) -> SyncProgress:
+    '''
+    Description: Stream the spreadsheet through read -> embed -> upsert, then delete removed rows and save the manifest
+
+    Args:
+        pinecone_manager (PineconeManager): target index
+        manifest (SyncManifest): loaded manifest of the last successful sync
+        sync_config (SyncConfig): page, batch and queue sizes
+        chunking_config (ChunkingConfig): how rows become embedded texts, one text per row when disabled or None
+        force (bool): re-embed every chunk, e.g. to rebuild a lost local index
+        progress (SyncProgress): updated in place as stages advance, so callers can poll it
+
+    Returns:
+        progress (SyncProgress): final counts and per-stage timings
+    '''
+    progress = progress if progress is not None else SyncProgress()
+    chunking_config = chunking_config or ChunkingConfig()
+    chunking = chunking_fingerprint(chunking_config)
+
+    revision = None
+    if sync_config.check_revision:
+        # Taken before reading, so edits made during the read show up as a new version next time
+        revision = await get_revision()
+        if not force and manifest.is_current(revision, chunking):
+            progress.revision_unchanged = True
+            logger.info(f"Spreadsheet unchanged since the last sync (version {revision.version}, modified {revision.modified_time})")
+            return progress
+
+    inventory = pinecone_manager.inventory
+    missing_ids: Set[str] = set()
+    if inventory.reconciles:
+        index_ids = await pinecone_io.run(inventory.ids)
+        missing_ids = manifest.vector_ids() - index_ids
+        progress.vectors_missing = len(missing_ids)
+        if missing_ids:
+            logger.warning(f"{len(missing_ids)} vectors in the manifest are missing from the index, re-embedding them")
+
+    chunker = RowChunker(chunking_config, SPREADSHEET_ID)
+    seen: Set[str] = set()
+    # Row key -> new manifest entry, applied once the upserts are done
+    updated: Dict[str, ManifestEntry] = {}
+    # New chunk id -> stored id with the same text, filled by the reader for the embed stage
+    sources: Dict[str, str] = {}
+    # Upserted vectors not yet written to the local index
+    local_pending: List[dict] = []
+    keep_vectors = bool(pinecone_manager.local_index and pinecone_manager.local_index.enabled)
+
+    to_embed: asyncio.Queue = asyncio.Queue(maxsize=sync_config.queue_size)
+    to_upsert: asyncio.Queue = asyncio.Queue(maxsize=sync_config.queue_size)
+
+    tasks = [
+        asyncio.create_task(_read(manifest, sync_config, chunker, force, missing_ids, seen, updated, sources, to_embed, progress)),
+        asyncio.create_task(_embed(pinecone_manager, sources, to_embed, to_upsert, progress)),
+        asyncio.create_task(_upsert(pinecone_manager, to_upsert, local_pending, keep_vectors, progress))
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # A failed stage would leave the others blocked on a queue
+        for task in tasks:
+            task.cancel()
+        raise
+
+    deleted = manifest.deleted_keys(seen)
+    progress.rows_deleted = len(deleted)
+
+    changed = bool(updated or deleted or progress.chunks_upserted)
+    if changed:
+        stale_ids = manifest.apply_entries(updated, deleted)
+        if stale_ids:
+            await pinecone_io.run(pinecone_manager.delete_vectors, stale_ids)
+        progress.vectors_deleted = len(stale_ids)
+
+        if keep_vectors:
+            await asyncio.to_thread(pinecone_manager.update_local_index, local_pending, stale_ids)
+    else:
+        logger.info(f"Nothing changed since the last sync ({progress.rows_unchanged} rows unchanged)")
+
+    # Only record the sync once Pinecone has it, so a failed sync is retried next time. Also saved
+    # when no row changed (e.g. an edit was reverted) so the new revision short-circuits next time.
+    if changed or manifest.revision != revision or manifest.chunking != chunking:
+        manifest.revision = revision
+        manifest.chunking = chunking
+        await asyncio.to_thread(manifest.save)
+
+    if inventory.reconciles:
+        # After the save, so a failed cleanup never leaves the manifest behind the index. The listing is
+        # the one cached above, kept current by this sync's upserts and deletes, and only holds our prefixes
+        orphan_ids = sorted(await pinecone_io.run(inventory.ids) - manifest.vector_ids())
+        if orphan_ids:
+            logger.warning(f"Deleting {len(orphan_ids)} vectors no row references")
+            await pinecone_io.run(pinecone_manager.delete_vectors, orphan_ids)
+            if keep_vectors:
+                await asyncio.to_thread(pinecone_manager.update_local_index, [], orphan_ids)
+        progress.vectors_orphaned = len(orphan_ids)
+
+    logger.info(f"Sync finished: {progress.model_dump()}")
+    return progress
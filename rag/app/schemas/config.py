@@ -1,6 +1,7 @@
 ''' RAG Engine Configurations '''
 
 import yaml
+from typing import Literal, Optional
 from pydantic import BaseModel
 
 class GoogleSheetConfig(BaseModel):
@@ -9,10 +10,63 @@ class GoogleSheetConfig(BaseModel):
 class EmbeddingConfig(BaseModel):
     model_gateway: str
     model_name: str
+    timeout: float = 60.0
+
+class LocalIndexConfig(BaseModel):
+    enabled: bool = False
+    path: str = "data/local_index"
+    ivf: bool = False
+    ivf_lists: Optional[int] = None
+    flush_vectors: int = 1000
+
+class SyncConfig(BaseModel):
+    manifest_path: str = "data/sync_manifest.json"
+    check_revision: bool = True
+    page_rows: int = 500
+    embed_batch_rows: int = 256
+    queue_size: int = 4
+
+class ChunkingConfig(BaseModel):
+    enabled: bool = False
+    header_row: bool = True
+    max_tokens: int = 256
+    overlap_tokens: int = 32
+    min_tokens: int = 48
+    context_columns: int = 1
+    chars_per_token: float = 4.0
+
+class SyncJobsConfig(BaseModel):
+    schedule_seconds: Optional[float] = None
+    history: int = 50
+
+class InventoryConfig(BaseModel):
+    source: Literal["manifest", "pinecone"] = "pinecone"
+    ttl_seconds: float = 3600.0
+    page_size: int = 100
+    reconcile: bool = False
+
+class UploadConfig(BaseModel):
+    max_batch_bytes: int = 1_500_000
+    max_batch_vectors: int = 1000
+    max_concurrency: int = 4
+    max_retries: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 20.0
+
+class IOConfig(BaseModel):
+    google_threads: int = 2
+    pinecone_threads: int = 4
 
 class ServiceConfig(BaseModel):
     google_sheets: GoogleSheetConfig
     embedding: EmbeddingConfig
+    local_index: LocalIndexConfig = LocalIndexConfig()
+    sync: SyncConfig = SyncConfig()
+    chunking: ChunkingConfig = ChunkingConfig()
+    sync_jobs: SyncJobsConfig = SyncJobsConfig()
+    inventory: InventoryConfig = InventoryConfig()
+    upload: UploadConfig = UploadConfig()
+    io: IOConfig = IOConfig()
 
     @classmethod
     def from_yaml(cls, file: str) -> "ServiceConfig":
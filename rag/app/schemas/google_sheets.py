@@ -1,6 +1,6 @@
 ''' Google Sheets Schemas '''
 
-from typing import List, Dict
+from typing import List, Dict, NamedTuple, Tuple
 from pydantic import BaseModel
 
 class RowMetadata(BaseModel):
@@ -18,4 +18,11 @@ class RowData(BaseModel):
 class GoogleSheetResponse(BaseModel):
     spreadsheet_title: str
     spreadsheet_id: str
-    sheet_data: List[RowData]
\ No newline at end of file
+    sheet_data: List[RowData]
+
+class SheetRow(NamedTuple):
+    ''' Lightweight row record for streaming reads, same fields the sync needs from RowData '''
+    sheet_name: str
+    row_number: int
+    content: str
+    cells: Tuple[str, ...] = ()
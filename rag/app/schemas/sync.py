@@ -0,0 +1,84 @@
+''' Sync Manifest Schemas '''
+
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, model_validator
+
+class ManifestEntry(BaseModel):
+    content_hash: str
+    # Chunks the row appears in, one id per part (empty for the header row and empty rows)
+    vector_ids: List[str] = []
+
+    @model_validator(mode="before")
+    @classmethod
+    def upgrade_single_id(cls, data):
+        # Manifests written before chunking stored one vector_id per row
+        if isinstance(data, dict) and "vector_id" in data:
+            data = {**data, "vector_ids": [data["vector_id"]]}
+            data.pop("vector_id")
+        return data
+
+class SourceRevision(BaseModel):
+    version: str
+    modified_time: str
+
+class SyncManifestData(BaseModel):
+    entries: Dict[str, ManifestEntry] = {}
+    revision: Optional[SourceRevision] = None
+    # chunking_fingerprint of the config the stored chunks were built with
+    chunking: Optional[str] = None
+
+class SyncDiff(BaseModel):
+    added: List[int] = []
+    changed: List[int] = []
+    deleted: List[str] = []
+    unchanged: int = 0
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.deleted)
+
+class UploadReport(BaseModel):
+    vectors: int
+    batches: int
+    failed_batches: int
+    retries: int
+    estimated_bytes: int
+    elapsed_seconds: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_max_ms: float
+
+class SyncProgress(BaseModel):
+    revision_unchanged: bool = False
+    rows_read: int = 0
+    rows_added: int = 0
+    rows_changed: int = 0
+    rows_unchanged: int = 0
+    rows_deleted: int = 0
+    rows_embedded: int = 0
+    rows_upserted: int = 0
+    chunks_embedded: int = 0
+    # Chunks of moved rows whose stored embedding was reused instead of re-embedded
+    chunks_reused: int = 0
+    chunks_upserted: int = 0
+    vectors_deleted: int = 0
+    vectors_missing: int = 0
+    vectors_orphaned: int = 0
+    upsert_batches: int = 0
+    upsert_retries: int = 0
+    read_seconds: float = 0.0
+    embed_seconds: float = 0.0
+    upsert_seconds: float = 0.0
+
+class SyncJob(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "succeeded", "failed"] = "queued"
+    trigger: Literal["api", "schedule"] = "api"
+    force: bool = False
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    message: Optional[str] = None
+    error: Optional[str] = None
+    progress: SyncProgress = SyncProgress()
@@ -0,0 +1,101 @@
+'''
+Vector ID Migration
+
+One-time move from the old per-process hash() ids ("content_<n>") to stable
+row ids (see sync_manifest.vector_id), deduplicating the index on the way:
+
+1. Reads every sheet row and computes its stable id.
+2. Lists every id currently in the Pinecone index and fetches the vectors.
+3. Reuses an existing embedding whenever a stored vector has the row's
+   content, so only rows never embedded before go to the gateway.
+4. Upserts one vector per row under its stable id, deletes every other id
+   (legacy ids and duplicates), and writes a fresh sync manifest and local
+   index so the next /sync is incremental.
+
+Dry run by default; pass --apply to change the index.
+
+Usage (from the rag directory):
+    python -m app.tools.migrate_vector_ids            # show the plan
+    python -m app.tools.migrate_vector_ids --apply    # migrate
+'''
+
+import argparse
+import asyncio
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from app.modules.embedding import EMBEDDING_TIMEOUT, embed_texts
+from app.modules.google_integration import read_google_sheets
+from app.modules.local_index import write_local_index
+from app.modules.pinecone import PineconeManager
+from app.modules.sync_manifest import SyncManifest, vector_id
+from app.paths import SERVICE_CONFIG_PATH
+from app.schemas.config import ServiceConfig
+
+async def migrate(apply: bool):
+    service_config = ServiceConfig.from_yaml(SERVICE_CONFIG_PATH)
+    pinecone_manager = PineconeManager(upload=service_config.upload)
+
+    google_sheets_data = await read_google_sheets()
+    rows = google_sheets_data.sheet_data
+    target_ids = [vector_id(google_sheets_data.spreadsheet_id, row) for row in rows]
+
+    existing_ids = list(pinecone_manager.list_vector_ids())
+    existing = pinecone_manager.fetch_vectors(existing_ids)
+
+    # content -> stored embedding, so rows keep the vector they already had
+    by_content: Dict[str, List[float]] = {}
+    for vector in existing.values():
+        content = (vector.metadata or {}).get("content")
+        if content is not None:
+            by_content.setdefault(content, vector.values)
+
+    missing = sorted({row.content for row in rows if row.content not in by_content})
+    stale_ids = sorted(set(existing_ids) - set(target_ids))
+
+    print(f"Rows in sheets:           {len(rows)}")
+    print(f"Vectors in index:         {len(existing_ids)}")
+    print(f"Distinct stored contents: {len(by_content)}")
+    print(f"Rows to embed:            {len(missing)}")
+    print(f"Vectors to upsert:        {len(target_ids)}")
+    print(f"Vectors to delete:        {len(stale_ids)}")
+
+    if not apply:
+        print("Dry run, pass --apply to migrate")
+        return
+
+    if missing:
+        async with httpx.AsyncClient(timeout=EMBEDDING_TIMEOUT) as client:
+            embedded = await embed_texts(client, missing)
+        by_content.update({content: vector for content, vector in zip(missing, embedded)})
+
+    embeddings = np.asarray([by_content[row.content] for row in rows], dtype=np.float32)
+    vectors_to_upsert, _, _ = pinecone_manager.prepare_vectors(
+        rows, embeddings, spreadsheet_id=google_sheets_data.spreadsheet_id, existing_vectors={}
+    )
+
+    # Upsert before deleting so the index is never missing a row
+    pinecone_manager.upload_vectors(vectors_to_upsert)
+    pinecone_manager.delete_vectors(stale_ids)
+
+    manifest = SyncManifest(service_config.sync.manifest_path)
+    manifest.apply(rows, [[vector["id"]] for vector in vectors_to_upsert], deleted=[])
+    manifest.save()
+
+    local_index = service_config.local_index
+    if local_index.enabled:
+        write_local_index(vectors_to_upsert, local_index.path, ivf=local_index.ivf, ivf_lists=local_index.ivf_lists)
+
+    print(f"Migrated {len(vectors_to_upsert)} vectors, deleted {len(stale_ids)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Move Pinecone vectors to stable row ids and dedupe the index")
+    parser.add_argument("--apply", action="store_true", help="change the index, default is a dry run")
+    args = parser.parse_args()
+
+    asyncio.run(migrate(args.apply))
+
+if __name__ == "__main__":
+    main()
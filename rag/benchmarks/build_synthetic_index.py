@@ -0,0 +1,59 @@
+'''
+Write a synthetic local index (optionally with IVF lists) for retrieval benchmarks
+
+Vectors are drawn around random topic centers so they cluster the way real
+embeddings do; uniformly random vectors have no structure for IVF to exploit.
+Queries are written alongside as queries.npy.
+
+Usage (from the rag directory):
+    PYTHONPATH=. python benchmarks/build_synthetic_index.py /tmp/ann_index --vectors 100000 --ivf
+'''
+
+import argparse
+import time
+
+import numpy as np
+
+from app.modules.local_index import write_local_index
+
+SHEETS = ["Itinerary", "Packing", "Reservations", "Meals"]
+
+def clustered(rng: np.random.Generator, centers: np.ndarray, n: int, spread: float) -> np.ndarray:
+    topics = rng.integers(0, centers.shape[0], n)
+    return (centers[topics] + spread * rng.standard_normal((n, centers.shape[1]), dtype=np.float32)).astype(np.float32)
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a synthetic local index')
+    parser.add_argument('index_path')
+    parser.add_argument('--vectors', type=int, default=100000)
+    parser.add_argument('--dimensions', type=int, default=1536)
+    parser.add_argument('--topics', type=int, default=2000)
+    parser.add_argument('--spread', type=float, default=1.25)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--ivf', action='store_true')
+    parser.add_argument('--ivf-lists', type=int, default=None)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((args.topics, args.dimensions), dtype=np.float32) / np.sqrt(args.dimensions)
+    vectors = clustered(rng, centers, args.vectors, args.spread / np.sqrt(args.dimensions))
+
+    # Same shape as PineconeManager.prepare_vectors output
+    vectors_to_upsert = [
+        {
+            "id": f"vec_{i}",
+            "values": vector,
+            "metadata": {"content": f"row {i}", "sheet": SHEETS[i % len(SHEETS)], "row_index": i}
+        }
+        for i, vector in enumerate(vectors)
+    ]
+
+    start = time.perf_counter()
+    write_local_index(vectors_to_upsert, args.index_path, ivf=args.ivf, ivf_lists=args.ivf_lists)
+    print(f'wrote {args.vectors} vectors (ivf={args.ivf}) in {time.perf_counter() - start:.1f}s')
+
+    queries = clustered(rng, centers, args.queries, args.spread / np.sqrt(args.dimensions))
+    np.save(f'{args.index_path}/queries.npy', queries)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+'''
+Retrieval precision vs. prompt tokens: whole rows vs. row-aware chunks
+
+Builds a synthetic travel spreadsheet: a "Trips" sheet whose rows carry a long
+itinerary and packing list, and a "Tips" sheet of one-line tips. Every
+itinerary day, packing item and tip is a fact. Each query asks for one fact,
+and a retrieved text counts as relevant when it contains that fact verbatim.
+The script indexes the sheet as:
+1. rows: one vector per row, cells joined with " | " (the pre-chunking behaviour)
+2. chunks: RowChunker at max_tokens 128, 256 (the default) and 512, overlap max_tokens / 8
+
+For top-k in 1, 3 and 5 it reports:
+- hit@k: share of queries with a relevant text in the top k
+- precision@k: share of retrieved texts that are relevant
+- prompt tokens: mean tokens of the k retrieved texts, what generation would pay
+
+By default texts are embedded offline with a hashed bag-of-words stand-in,
+which shows the dilution effect but not absolute model quality. Pass
+--gateway to embed through the model gateway configured in config.yaml.
+
+Usage (from the rag directory):
+    PYTHONPATH=. python benchmarks/chunking_precision.py --trips 200
+'''
+
+import argparse
+import asyncio
+import re
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+
+from app.modules.chunking import RowChunker, estimate_tokens
+from app.schemas.config import ChunkingConfig
+from app.schemas.google_sheets import SheetRow
+
+ACTIVITIES = [
+    "kayak tour", "food market walk", "museum visit", "sunset cruise", "wine tasting", "hike to the ridge",
+    "cooking class", "bike ride", "old town walk", "beach afternoon", "cathedral visit", "night market",
+    "hot springs soak", "street art tour", "boat to the islands", "castle visit", "jazz bar evening"
+]
+ITEMS = [
+    "rain jacket", "hiking boots", "sunscreen", "power adapter", "swimsuit", "warm fleece", "sandals",
+    "day backpack", "water bottle", "travel pillow", "first aid kit", "headlamp", "umbrella", "sun hat",
+    "walking shoes", "scarf", "insect repellent", "dry bag", "binoculars", "reading book"
+]
+FILLER = [
+    "Breakfast at the hotel, then meet the guide in the lobby.",
+    "Free time after lunch to rest or explore nearby streets.",
+    "Dinner at a family run restaurant close to the main square.",
+    "Transfers are included, bring comfortable clothes for the day.",
+    "Evening at leisure with optional drinks on the terrace."
+]
+STOPWORDS = {"the", "a", "an", "in", "on", "to", "of", "and", "for", "we", "do", "what", "which", "is", "at", "with", "day", "when"}
+
+def pseudo_word(rng: np.random.Generator) -> str:
+    return "".join(rng.choice(list("bcdfghklmnprstvz")) + rng.choice(list("aeiou")) for _ in range(3)).capitalize()
+
+def build_sheet(n_trips: int, n_tips: int, days: int, rng: np.random.Generator) -> Tuple[List[SheetRow], List[Tuple[str, str]]]:
+    '''
+    Description: Synthetic sheet rows and (query, fact) pairs
+    '''
+    rows = [SheetRow("Trips", 1, "", ("Destination", "Itinerary", "Packing list", "Price", "Season"))]
+    queries: List[Tuple[str, str]] = []
+
+    for trip in range(n_trips):
+        destination = pseudo_word(rng)
+        places = [pseudo_word(rng) for _ in range(days)]
+        itinerary = []
+        for day, place in enumerate(places, start=1):
+            activity = ACTIVITIES[rng.integers(len(ACTIVITIES))]
+            fact = f"Day {day}: {activity} in {place}."
+            itinerary.append(f"{fact} {FILLER[rng.integers(len(FILLER))]}")
+            queries.append((f"Which day is the {activity} in {place}?", fact))
+
+        packing = []
+        for item in rng.choice(ITEMS, size=12, replace=False):
+            fact = f"{item} for {destination}"
+            packing.append(fact)
+            queries.append((f"Do we pack a {item} for {destination}?", fact))
+
+        cells = (destination, " ".join(itinerary), "; ".join(packing), f"{rng.integers(500, 5000)} EUR", "Spring")
+        rows.append(SheetRow("Trips", trip + 2, " | ".join(cells), cells))
+
+    rows.append(SheetRow("Tips", 1, "", ("Tip", "Topic")))
+    for tip in range(n_tips):
+        place = pseudo_word(rng)
+        fact = f"tip {place} bring cash to the {ACTIVITIES[tip % len(ACTIVITIES)]}"
+        cells = (fact, "Money")
+        rows.append(SheetRow("Tips", tip + 2, " | ".join(cells), cells))
+        queries.append((f"Any tip about cash at {place}?", fact))
+
+    return rows, queries
+
+def hashed_embeddings(texts: List[str], dimensions: int = 4096) -> np.ndarray:
+    '''
+    Description: Sublinear bag-of-words hashed into a fixed width, L2 normalized
+    '''
+    matrix = np.zeros((len(texts), dimensions), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = [word for word in re.findall(r"\w+", text.lower()) if word not in STOPWORDS]
+        for word in words:
+            matrix[row, zlib.crc32(word.encode()) % dimensions] += 1.0
+    matrix = np.log1p(matrix)
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    return matrix
+
+def embed(texts: List[str], gateway: bool) -> np.ndarray:
+    if not gateway:
+        return hashed_embeddings(texts)
+
+    import httpx
+    from app.modules.embedding import embed_texts
+
+    async def run():
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            batches = [await embed_texts(client, texts[i:i + 256]) for i in range(0, len(texts), 256)]
+        matrix = np.vstack(batches).astype(np.float32)
+        return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    return asyncio.run(run())
+
+def row_texts(rows: List[SheetRow]) -> List[str]:
+    return [row.content for row in rows if row.content]
+
+def chunk_texts(rows: List[SheetRow], chunking_config: ChunkingConfig) -> List[str]:
+    chunker = RowChunker(chunking_config, "benchmark")
+    texts = []
+    for sheet_name in dict.fromkeys(row.sheet_name for row in rows):
+        sheet_rows = [row for row in rows if row.sheet_name == sheet_name]
+        texts.extend(chunk.text for chunk in chunker.chunk_page(list(enumerate(sheet_rows))))
+    return texts
+
+def evaluate(name: str, texts: List[str], queries: List[Tuple[str, str]], query_vectors: np.ndarray, gateway: bool):
+    vectors = embed(texts, gateway)
+    tokens = np.asarray([estimate_tokens(text, 4.0) for text in texts])
+    ranked = np.argsort(-(query_vectors @ vectors.T), axis=1)[:, :5]
+
+    print(f"{name:<22} {len(texts):6d} texts  mean {tokens.mean():6.0f} tokens")
+    for k in (1, 3, 5):
+        relevant = np.asarray([[fact in texts[i] for i in ranked[q, :k]] for q, (_, fact) in enumerate(queries)])
+        prompt_tokens = tokens[ranked[:, :k]].sum(axis=1).mean()
+        print(f"    k={k}  hit@k {relevant.any(axis=1).mean():.3f}  precision@k {relevant.mean():.3f}  prompt tokens {prompt_tokens:7.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieval precision vs. prompt tokens for row chunking")
+    parser.add_argument("--trips", type=int, default=200)
+    parser.add_argument("--tips", type=int, default=300)
+    parser.add_argument("--days", type=int, default=21)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--gateway", action="store_true", help="embed with the model gateway instead of the offline stand-in")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows, queries = build_sheet(args.trips, args.tips, args.days, rng)
+    queries = [queries[i] for i in rng.choice(len(queries), size=min(args.queries, len(queries)), replace=False)]
+    query_vectors = embed([query for query, _ in queries], args.gateway)
+
+    evaluate("rows", row_texts(rows), queries, query_vectors, args.gateway)
+    for max_tokens in (128, 256, 512):
+        chunking_config = ChunkingConfig(enabled=True, max_tokens=max_tokens, overlap_tokens=max_tokens // 8)
+        evaluate(f"chunks max_tokens={max_tokens}", chunk_texts(rows, chunking_config), queries, query_vectors, args.gateway)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+'''
+Local stand-in for a Pinecone index data plane
+
+Serves upsert, delete and paginated id listing from memory with configurable
+latency and injected 429/503 failures, so uploads can be benchmarked offline
+with the real Pinecone client pointed at it:
+
+    Pinecone(api_key="fake").Index(host=f"http://127.0.0.1:{port}")
+
+Usage (standalone):
+    python benchmarks/fake_index_server.py --port 5081 --latency 0.05 --failure-rate 0.05 --seed 1
+
+Failures are drawn from a per-server RNG, seeded for reproducible runs or
+from system entropy when no seed is given.
+'''
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+class FakeIndexState:
+    def __init__(self, latency: float, per_mb_latency: float, failure_rate: float, seed: Optional[int] = None):
+        self.latency = latency
+        self.per_mb_latency = per_mb_latency
+        self.failure_rate = failure_rate
+        self.vectors: Dict[str, Dict] = {}
+        self.requests = 0
+        self.failures = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+class FakeIndexHandler(BaseHTTPRequestHandler):
+    state: FakeIndexState = None
+
+    def _send(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _simulate(self, size: int) -> bool:
+        state = self.state
+        with state._lock:
+            state.requests += 1
+            state._in_flight += 1
+            state.max_in_flight = max(state.max_in_flight, state._in_flight)
+            fail = state._rng.random() < state.failure_rate
+
+        try:
+            time.sleep(state.latency + state.per_mb_latency * size / 1e6)
+        finally:
+            with state._lock:
+                state._in_flight -= 1
+
+        if fail:
+            with state._lock:
+                state.failures += 1
+            self._send(self.state._rng.choice([429, 503]), {"code": 14, "message": "injected failure"})
+        return not fail
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self._simulate(len(body)):
+            return
+
+        request = json.loads(body or b"{}")
+        path = urlparse(self.path).path
+        if path == "/vectors/upsert":
+            with self.state._lock:
+                for vector in request["vectors"]:
+                    self.state.vectors[vector["id"]] = vector
+            self._send(200, {"upsertedCount": len(request["vectors"])})
+        elif path == "/vectors/delete":
+            with self.state._lock:
+                for vector_id in request.get("ids", []):
+                    self.state.vectors.pop(vector_id, None)
+            self._send(200, {})
+        else:
+            self._send(404, {"message": f"unknown path {path}"})
+
+    def do_GET(self):
+        if not self._simulate(0):
+            return
+
+        url = urlparse(self.path)
+        if url.path != "/vectors/list":
+            self._send(404, {"message": f"unknown path {url.path}"})
+            return
+
+        query = parse_qs(url.query)
+        limit = int(query.get("limit", ["100"])[0])
+        start = int(query.get("paginationToken", ["0"])[0])
+
+        with self.state._lock:
+            ids = sorted(self.state.vectors)
+        page = ids[start:start + limit]
+
+        payload = {"vectors": [{"id": vector_id} for vector_id in page], "namespace": ""}
+        if start + limit < len(ids):
+            payload["pagination"] = {"next": str(start + limit)}
+        self._send(200, payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_fake_index(
+    latency: float = 0.05,
+    per_mb_latency: float = 0.05,
+    failure_rate: float = 0.0,
+    port: int = 0,
+    seed: Optional[int] = None
+) -> Tuple[ThreadingHTTPServer, FakeIndexState]:
+    '''
+    Description: Start the fake index on a background thread
+
+    Args:
+        seed (Optional[int]): seed for the failure RNG, None draws a fresh one
+
+    Returns:
+        (server, state): server.server_port is the bound port, state holds the stored vectors and counters
+    '''
+    state = FakeIndexState(latency, per_mb_latency, failure_rate, seed)
+    handler = type("BoundFakeIndexHandler", (FakeIndexHandler,), {"state": state})
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Pinecone index data plane")
+    parser.add_argument("--port", type=int, default=5081)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--per-mb-latency", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server, _ = start_fake_index(args.latency, args.per_mb_latency, args.failure_rate, args.port, args.seed)
+    print(f"Fake index listening on http://127.0.0.1:{server.server_port}")
+    threading.Event().wait()
@@ -0,0 +1,137 @@
+'''
+/ready latency during a simulated sync
+
+Serves a /ready endpoint on the same event loop as a simulated sync. A probe
+thread, standing in for the kubelet, sends a request every few milliseconds
+and times it from the moment it was sent, so time spent waiting for a busy
+loop counts. The sync reads sheet pages through a stand-in for
+googleapiclient's blocking request.execute() and upserts through the real
+Pinecone client into benchmarks/fake_index_server.py.
+It runs twice:
+1. blocking: execute() and the upload called straight from the coroutine, as before
+2. pooled: the same calls on the bounded Google / Pinecone I/O pools
+
+Usage (from the rag directory):
+    PYTHONPATH=. python benchmarks/ready_latency.py --pages 20
+'''
+
+import argparse
+import asyncio
+import threading
+import time
+from typing import List
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from pinecone import Pinecone
+
+from app.modules.io_pool import IOPool
+from app.modules.uploader import PipelinedUploader
+from app.schemas.config import UploadConfig
+from benchmarks.fake_index_server import start_fake_index
+
+class FakeSheetsRequest:
+    '''
+    Description: Blocks like HttpRequest.execute() does while the Sheets API answers
+    '''
+    def __init__(self, latency: float, rows: int):
+        self.latency = latency
+        self.rows = rows
+
+    def execute(self, http=None):
+        time.sleep(self.latency)
+        return {"values": [[f"cell {row}", "x" * 200] for row in range(self.rows)]}
+
+def prepare(page: int, values: List[List[str]], embeddings: np.ndarray) -> List[dict]:
+    return [
+        {
+            "id": f"row_{page:04d}_{row:04d}",
+            "values": embedding.tolist(),
+            "metadata": {"content": " | ".join(cells)}
+        }
+        for row, (cells, embedding) in enumerate(zip(values, embeddings))
+    ]
+
+async def simulated_sync(args, index, pooled: bool):
+    google_io = IOPool("google", 2)
+    pinecone_io = IOPool("pinecone", 4)
+    uploader = PipelinedUploader(index, UploadConfig(max_concurrency=4), pinecone_io.executor if pooled else None)
+    rng = np.random.default_rng(0)
+
+    for page in range(args.pages):
+        request = FakeSheetsRequest(args.google_latency, args.page_rows)
+        response = await google_io.run(request.execute) if pooled else request.execute()
+
+        # The embedding gateway is already called with an async client
+        await asyncio.sleep(args.embed_latency)
+        embeddings = rng.standard_normal((len(response["values"]), args.dimensions), dtype=np.float32)
+
+        if pooled:
+            # Like prepare_vectors in the sync pipeline, building the payload moves off the loop too
+            vectors = await asyncio.to_thread(prepare, page, response["values"], embeddings)
+            await asyncio.to_thread(uploader.upload, vectors)
+        else:
+            uploader.upload(prepare(page, response["values"], embeddings))
+
+    google_io.shutdown()
+    pinecone_io.shutdown()
+
+def probe(loop, client: httpx.AsyncClient, interval: float, latencies: List[float], stop: threading.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        asyncio.run_coroutine_threadsafe(client.get("/ready"), loop).result().raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        time.sleep(interval)
+
+async def run(name: str, args, pooled: bool):
+    app = FastAPI()
+
+    @app.get("/ready")
+    async def ready():
+        return {"Ready": True}
+
+    server, state = start_fake_index(latency=args.pinecone_latency)
+    index = Pinecone(api_key="fake").Index(host=f"http://127.0.0.1:{server.server_port}")
+
+    latencies: List[float] = []
+    stop = threading.Event()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://rag") as client:
+        prober = threading.Thread(
+            target=probe,
+            args=(asyncio.get_running_loop(), client, args.probe_interval, latencies, stop)
+        )
+        prober.start()
+
+        start = time.perf_counter()
+        await simulated_sync(args, index, pooled)
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        # Let the last probe finish on the loop before the client closes
+        while prober.is_alive():
+            await asyncio.sleep(args.probe_interval)
+
+    server.shutdown()
+    ms = np.asarray(latencies) * 1000
+    print(
+        f"{name:<10} sync {elapsed:6.2f}s  stored {len(state.vectors):5d}  /ready probes {len(ms):4d}  "
+        f"p50 {np.percentile(ms, 50):7.1f} ms  p95 {np.percentile(ms, 95):7.1f} ms  max {ms.max():7.1f} ms"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="/ready latency while a sync runs")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--page-rows", type=int, default=200)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--google-latency", type=float, default=0.3)
+    parser.add_argument("--embed-latency", type=float, default=0.1)
+    parser.add_argument("--pinecone-latency", type=float, default=0.05)
+    parser.add_argument("--probe-interval", type=float, default=0.02)
+    args = parser.parse_args()
+
+    asyncio.run(run("blocking", args, pooled=False))
+    asyncio.run(run("pooled", args, pooled=True))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+'''
+Sequential vs. pipelined Pinecone upserts against the fake index server
+
+Runs the real Pinecone client against benchmarks/fake_index_server.py:
+1. the old behaviour, fixed 100-vector batches one at a time, no retries
+2. the pipelined uploader with byte-sized batches, concurrency and retries,
+   with and without injected 429/503 failures
+
+Each run gets its own fake index with a failure RNG seeded from --seed and
+the run number, so runs differ from each other but repeat exactly for the
+same seed.
+
+Usage (from the rag directory):
+    PYTHONPATH=. python benchmarks/upsert_throughput.py --vectors 3000 --seed 1
+'''
+
+import argparse
+import time
+
+import numpy as np
+from pinecone import Pinecone
+
+from app.modules.uploader import PipelinedUploader, UploadError
+from app.schemas.config import UploadConfig
+from benchmarks.fake_index_server import start_fake_index
+
+def make_vectors(n: int, dimensions: int, content_chars: int, rng: np.random.Generator):
+    return [
+        {
+            "id": f"row_{i:032x}",
+            "values": rng.standard_normal(dimensions, dtype=np.float32).tolist(),
+            "metadata": {"content": "x" * int(rng.integers(content_chars // 4, content_chars)), "row_index": i}
+        }
+        for i in range(n)
+    ]
+
+def run(name: str, vectors, upload_config: UploadConfig, latency: float, failure_rate: float, seed: int):
+    server, state = start_fake_index(latency=latency, failure_rate=failure_rate, seed=seed)
+    index = Pinecone(api_key="fake").Index(host=f"http://127.0.0.1:{server.server_port}")
+
+    start = time.perf_counter()
+    try:
+        report = PipelinedUploader(index, upload_config).upload(vectors)
+        outcome = f"p50 {report.latency_p50_ms:6.0f} ms  p95 {report.latency_p95_ms:6.0f} ms  retries {report.retries}"
+        batches = report.batches
+    except UploadError as e:
+        outcome = f"FAILED: {e}"
+        batches = e.report.batches
+    elapsed = time.perf_counter() - start
+
+    print(f"{name:<28} {elapsed:6.2f}s  {len(vectors) / elapsed:7.0f} vec/s  batches {batches:4d}  stored {len(state.vectors):5d}  in-flight {state.max_in_flight}  injected {state.failures:3d}  {outcome}")
+    server.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Upsert throughput against a fake index")
+    parser.add_argument("--vectors", type=int, default=3000)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--content-chars", type=int, default=4000)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--failure-rate", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors = make_vectors(args.vectors, args.dimensions, args.content_chars, np.random.default_rng(0))
+
+    sequential = UploadConfig(max_batch_bytes=10 ** 12, max_batch_vectors=100, max_concurrency=1, max_retries=0)
+    pipelined = UploadConfig(max_concurrency=args.concurrency, backoff_base=0.05, backoff_max=1.0)
+
+    run("sequential, 100/batch", vectors, sequential, args.latency, 0.0, args.seed)
+    run("sequential, with failures", vectors, sequential, args.latency, args.failure_rate, args.seed + 1)
+    run("pipelined", vectors, pipelined, args.latency, 0.0, args.seed + 2)
+    run("pipelined, with failures", vectors, pipelined, args.latency, args.failure_rate, args.seed + 3)
+
+if __name__ == "__main__":
+    main()